@@ -19,6 +19,7 @@ class APIConfig:
     CERTIFICADOS = f"{BASE_URL}:8007"
     
     TIMEOUT = 6
+    TIMEOUT_LOTE = 30
 
 # Keys
 class APIKeys:
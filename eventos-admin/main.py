@@ -66,7 +66,8 @@ def init_database():
             id INTEGER PRIMARY KEY CHECK (id = 1),
             token TEXT,
             email TEXT,
-            saved_at TEXT
+            saved_at TEXT,
+            refresh_token TEXT
         )
     """)
     
@@ -80,6 +81,11 @@ def init_database():
     except sqlite3.OperationalError:
         pass
 
+    try:
+        cursor.execute("ALTER TABLE auth_cache ADD COLUMN refresh_token TEXT")
+    except sqlite3.OperationalError:
+        pass
+
     try:
         cursor.execute("ALTER TABLE inscritos ADD COLUMN status TEXT DEFAULT 'ativa'")
         print("[DB] Coluna 'status' adicionada à tabela inscritos")
@@ -6,23 +6,34 @@ class AuthCacheRepository(BaseRepository):
     def __init__(self):
         super().__init__("auth_cache")
     
-    def save_token(self, token: str, email: str) -> bool:
+    def save_token(self, token: str, email: str, refresh_token: Optional[str] = None) -> bool:
         """
-        Salva token no cache.
+        Salva token (e refresh token) no cache.
         """
         query = """
-            INSERT OR REPLACE INTO auth_cache (id, token, email, saved_at)
-            VALUES (1, ?, ?, ?)
+            INSERT OR REPLACE INTO auth_cache (id, token, email, saved_at, refresh_token)
+            VALUES (1, ?, ?, ?, ?)
         """
-        self._execute(query, (token, email, datetime.utcnow().isoformat()))
+        self._execute(query, (token, email, datetime.utcnow().isoformat(), refresh_token))
         print(f"[REPO] Token salvo no cache para {email}")
         return True
     
+    def update_tokens(self, token: str, refresh_token: str) -> bool:
+        """
+        Substitui o par de tokens após uma renovação (mantém o email).
+        """
+        query = """
+            UPDATE auth_cache SET token = ?, refresh_token = ?, saved_at = ?
+            WHERE id = 1
+        """
+        self._execute(query, (token, refresh_token, datetime.utcnow().isoformat()))
+        return True
+    
     def get_token(self) -> Optional[Dict]:
         """
         Recupera token do cache.
         """
-        query = "SELECT token, email, saved_at FROM auth_cache WHERE id = 1"
+        query = "SELECT token, email, saved_at, refresh_token FROM auth_cache WHERE id = 1"
         row = self._fetch_one(query)
         
         if not row:
@@ -31,7 +42,8 @@ class AuthCacheRepository(BaseRepository):
         return {
             "token": row[0],
             "email": row[1],
-            "saved_at": row[2]
+            "saved_at": row[2],
+            "refresh_token": row[3]
         }
     
     def clear_token(self) -> bool:
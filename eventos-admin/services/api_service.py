@@ -1,7 +1,11 @@
 import requests
+import threading
 from typing import Optional, Dict
 from config.settings import APIConfig, APIKeys
 
+# Renovações serializadas: as instâncias compartilham o refresh token do cache
+_renovacao_lock = threading.Lock()
+
 class APIService:
     """
     Gerencia comunicação com API externa.
@@ -32,15 +36,15 @@ class APIService:
         except Exception as e:
             print(f"[API] Erro ao carregar token do cache: {e}")
     
-    def set_token(cls, token: str, email: str = ""):
-        """Define token de autenticação e salva no cache"""
+    def set_token(cls, token: str, email: str = "", refresh_token: Optional[str] = None):
+        """Define token de autenticação (e refresh token) e salva no cache"""
         cls._token = token
         
         # Salva no cache
         try:
             from repositories.auth_cache_repository import AuthCacheRepository
             cache_repo = AuthCacheRepository()
-            cache_repo.save_token(token, email)
+            cache_repo.save_token(token, email, refresh_token)
             print(f"[API] Token definido e salvo no cache")
         except Exception as e:
             print(f"[API] Erro ao salvar token no cache: {e}")
@@ -75,14 +79,75 @@ class APIService:
             "Content-Type": "application/json"
         }
     
+    def requisitar(self, method: str, url: str, api_key: str, **kwargs) -> requests.Response:
+        """
+        Faz uma requisição autenticada. O token de acesso tem validade curta:
+        em 401, renova o token (/refresh) e repete a requisição. São até duas
+        renovações: o token adotado de outra instância pode ter expirado também.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        
+        def enviar():
+            headers = self.get_auth_headers()
+            headers["x-api-key"] = api_key
+            return requests.request(method, url, headers=headers, **kwargs)
+        
+        response = enviar()
+        for _ in range(2):
+            if response.status_code != 401 or not self.renovar_token():
+                break
+            response = enviar()
+        
+        return response
+    
+    def renovar_token(self) -> bool:
+        """
+        Troca o refresh token por um novo par de tokens. O cache é a fonte:
+        se outra instância já renovou, apenas adota o token dela (reapresentar
+        um refresh token já trocado revoga a sessão no servidor).
+        """
+        from repositories.auth_cache_repository import AuthCacheRepository
+        cache_repo = AuthCacheRepository()
+        
+        with _renovacao_lock:
+            cached = cache_repo.get_token()
+            if not cached or not cached['refresh_token']:
+                return False
+            
+            if cached['token'] != self._token:
+                self._token = cached['token']
+                return True
+            
+            try:
+                response = requests.post(
+                    f"{APIConfig.AUTH}/refresh",
+                    headers={"x-api-key": APIKeys.AUTH},
+                    json={"refresh_token": cached['refresh_token']},
+                    timeout=self.timeout
+                )
+            except Exception as e:
+                print(f"[API] Erro ao renovar token: {e}")
+                return False
+            
+            if response.status_code == 401:
+                print("[API] Sessão expirada ou revogada. Faça login novamente")
+                self.clear_token()
+                return False
+            if response.status_code != 200:
+                print(f"[API] Erro ao renovar token: {response.status_code}")
+                return False
+            
+            data = response.json()
+            self._token = data["access_token"]
+            cache_repo.update_tokens(self._token, data["refresh_token"])
+            print("[API] Token renovado")
+            return True
+    
     def is_online(self) -> bool:
         """Testa conectividade com API"""
         try:
-            headers = self.get_auth_headers()
-            headers["x-api-key"] = APIKeys.EVENTOS
-            
             url = f"{APIConfig.EVENTOS}/eventos/publicos/ativos"
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.EVENTOS)
             
             print(f"[API] Teste de conexão: {response.status_code}")
             return response.status_code == 200
@@ -111,7 +176,7 @@ class APIService:
             token = data.get("access_token")
             
             if token:
-                self.set_token(token)
+                self.set_token(token, email, data.get("refresh_token"))
                 print("[API] Login realizado com sucesso")
             
             return token
@@ -128,11 +193,8 @@ class APIService:
     def listar_eventos_publicos(self) -> Optional[list]:
         """Lista eventos públicos ativos"""
         url = f"{APIConfig.EVENTOS}/eventos/publicos/ativos"
-        headers = self.get_auth_headers()
-        headers["x-api-key"] = APIKeys.EVENTOS
-        
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.EVENTOS)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -142,11 +204,8 @@ class APIService:
     def buscar_evento(self, evento_id: str) -> Optional[Dict]:
         """Busca evento por ID"""
         url = f"{APIConfig.EVENTOS}/{evento_id}"
-        headers = self.get_auth_headers()
-        headers["x-api-key"] = APIKeys.EVENTOS
-        
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.EVENTOS)
             response.raise_for_status()
             return response.json()
         except Exception as e:
@@ -170,11 +229,8 @@ class APIService:
         if incluir_canceladas:
             url += "?incluir_canceladas=true"
         
-        headers = self.get_auth_headers()
-        headers["x-api-key"] = APIKeys.INSCRICOES
-        
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.INSCRICOES)
             response.raise_for_status()
             return response.json()
         except requests.HTTPError as e:
@@ -184,16 +240,38 @@ class APIService:
             print(f"[API] Erro: {e}")
             return None
     
+    # CHECKINS
+    
+    def registrar_checkins_lote(self, itens: list) -> Optional[Dict]:
+        """
+        Envia vários check-ins em uma única requisição (POST /batch).
+        Retorna o resultado por item, ou None se a requisição falhar.
+        """
+        url = f"{APIConfig.CHECKINS}/batch"
+        try:
+            response = self.requisitar(
+                "POST",
+                url,
+                APIKeys.CHECKINS,
+                json=itens,
+                timeout=APIConfig.TIMEOUT_LOTE
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.HTTPError as e:
+            print(f"[API] Erro HTTP {e.response.status_code} no lote de check-ins: {e.response.text}")
+            return None
+        except Exception as e:
+            print(f"[API] Erro ao enviar lote de check-ins: {e}")
+            return None
+    
     # INGRESSOS
     
     def buscar_ingresso(self, inscricao_id: str) -> Optional[Dict]:
         """Busca ingresso por inscrição"""
         url = f"{APIConfig.INGRESSOS}/inscricao/{inscricao_id}/ingresso"
-        headers = self.get_auth_headers()
-        headers["x-api-key"] = APIKeys.INGRESSOS
-        
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.INGRESSOS)
             response.raise_for_status()
             return response.json()
         except requests.HTTPError as e:
@@ -208,11 +286,8 @@ class APIService:
     def buscar_usuario_por_email(self, email: str) -> Optional[Dict]:
         """Busca usuário por email"""
         url = f"{APIConfig.USUARIOS}/email/{email}"
-        headers = self.get_auth_headers()
-        headers["x-api-key"] = APIKeys.USUARIOS
-        
         try:
-            response = requests.get(url, headers=headers, timeout=self.timeout)
+            response = self.requisitar("GET", url, APIKeys.USUARIOS)
             response.raise_for_status()
             return response.json()
         except requests.HTTPError as e:
@@ -1,12 +1,13 @@
 import requests
 import json
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
 from repositories.evento_repository import EventoRepository
 from repositories.inscrito_repository import InscritoRepository
 from repositories.pending_repository import PendingRepository
 from repositories.checkin_repository import CheckinRepository
 from services.api_service import APIService
-from config.settings import APIKeys
+from config.settings import APIConfig, APIKeys
 
 class SyncService:
     """
@@ -106,22 +107,28 @@ class SyncService:
         
         print(f"[SYNC] Processando {len(pendentes)} requisições pendentes...")
         
-        sucesso = 0
-        falhas = 0
-        ja_feito = 0
-        removidos = 0
+        contagem = {"sucesso": 0, "ja_feito": 0, "removido": 0, "falha": 0}
         
-        for pendente in pendentes:
-            resultado = self._processar_pendente(pendente)
-            
-            if resultado == "sucesso":
-                sucesso += 1
-            elif resultado == "ja_feito":
-                ja_feito += 1
-            elif resultado == "removido":
-                removidos += 1
-            else:
-                falhas += 1
+        # Check-ins vão todos em uma única requisição; o resto, um a um
+        checkins, outros = self._separar_checkins(pendentes)
+        
+        for pendente in outros:
+            contagem[self._processar_pendente(pendente)] += 1
+        
+        if checkins:
+            resultados = self._processar_checkins_lote(checkins)
+            
+            if resultados is None:
+                # Lote falhou (ex.: servidor sem /batch): tenta individualmente
+                resultados = [self._processar_pendente(p) for p, _ in checkins]
+            
+            for resultado in resultados:
+                contagem[resultado] += 1
+        
+        sucesso = contagem["sucesso"]
+        falhas = contagem["falha"]
+        ja_feito = contagem["ja_feito"]
+        removidos = contagem["removido"]
         
         # Conta quantos ainda restam
         total_pendentes = self.pending_repo.count()
@@ -137,6 +144,84 @@ class SyncService:
             "total_pendentes": total_pendentes
         }
     
+    def _separar_checkins(self, pendentes: List[Dict]) -> Tuple[List[Tuple[Dict, Dict]], List[Dict]]:
+        """
+        Separa os pendentes de check-in (convertidos em itens do lote)
+        dos demais pendentes.
+        """
+        checkins = []
+        outros = []
+        
+        for pendente in pendentes:
+            item = self._item_lote_checkin(pendente)
+            if item:
+                checkins.append((pendente, item))
+            else:
+                outros.append(pendente)
+        
+        return checkins, outros
+    
+    def _item_lote_checkin(self, pendente: Dict) -> Optional[Dict]:
+        """Converte um POST de check-in pendente em item do /batch"""
+        if pendente["method"] != "POST" or not pendente["url"].startswith(APIConfig.CHECKINS):
+            return None
+        
+        url = urlparse(pendente["url"])
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        
+        if url.path in ("", "/"):
+            return {
+                "tipo": "normal",
+                "inscricao_id": params.get("inscricao_id"),
+                "ingresso_id": params.get("ingresso_id"),
+                "usuario_id": params.get("usuario_id")
+            }
+        
+        if url.path == "/rapido":
+            return {
+                "tipo": "rapido",
+                "evento_id": params.get("evento_id"),
+                "nome": params.get("nome"),
+                "cpf": params.get("cpf"),
+                "email": params.get("email")
+            }
+        
+        return None
+    
+    def _processar_checkins_lote(self, checkins: List[Tuple[Dict, Dict]]) -> Optional[List[str]]:
+        """
+        Envia os check-ins pendentes em lote.
+        Retorna o resultado de cada pendente ('sucesso', 'ja_feito', 'removido'),
+        ou None se o lote não pôde ser processado.
+        """
+        print(f"[SYNC] Enviando {len(checkins)} check-ins em lote...")
+        
+        resposta = self.api_service.registrar_checkins_lote([item for _, item in checkins])
+        if not resposta:
+            return None
+        
+        resultados = []
+        for r in resposta.get("resultados", []):
+            pendente = checkins[r["indice"]][0]
+            
+            if r["status"] in ("criado", "ja_registrado"):
+                if pendente.get('related_inscricao_id'):
+                    self.checkin_repo.mark_as_synced(pendente['related_inscricao_id'])
+                resultados.append("sucesso" if r["status"] == "criado" else "ja_feito")
+            else:
+                # nao_encontrado / invalido: mesmo tratamento dos 4xx
+                print(f"[SYNC] Check-in {r['status']} ({r.get('detalhe')}) - REMOVENDO")
+                resultados.append("removido")
+            
+            self.pending_repo.delete(pendente["id"])
+        
+        print(f"[SYNC] Lote: {resposta.get('criados', 0)} criados, "
+              f"{resposta.get('ja_registrados', 0)} já registrados, "
+              f"{resposta.get('nao_encontrados', 0)} não encontrados, "
+              f"{resposta.get('invalidos', 0)} inválidos")
+        
+        return resultados
+    
     def _processar_pendente(self, pendente: Dict) -> str:
         """
         Processa uma requisição pendente.
@@ -154,12 +239,12 @@ class SyncService:
             
             print(f"[SYNC] Processando: {pendente['method']} {pendente['url']}")
             
-            # Faz requisição
-            response = requests.request(
+            # Faz requisição com o token atual (o salvo na pendência pode ter expirado)
+            response = self.api_service.requisitar(
                 pendente["method"],
                 pendente["url"],
+                headers.get("x-api-key"),
                 json=body,
-                headers=headers,
                 timeout=6
             )
             
@@ -172,6 +257,12 @@ class SyncService:
                     self.checkin_repo.mark_as_synced(pendente['related_inscricao_id'])
                 
                 self.pending_repo.delete(pendente["id"])
+
+                # Check-in idempotente: servidor devolve o existente com ja_registrado
+                if self._resposta_ja_registrada(response):
+                    print("[SYNC] ℹ Check-in já realizado")
+                    return "ja_feito"
+
                 print(f"[SYNC] ✓ Sucesso")
                 return "sucesso"
             
@@ -197,13 +288,21 @@ class SyncService:
             print(f"[SYNC] ✗ Erro inesperado: {e}")
             return "falha"
     
+    def _resposta_ja_registrada(self, response) -> bool:
+        """Verifica se a resposta 2xx indica check-in já existente no servidor"""
+        try:
+            data = response.json()
+        except ValueError:
+            return False
+        return isinstance(data, dict) and bool(data.get("ja_registrado"))
+
     def _handle_4xx_error(self, response, pendente: Dict) -> str:
         """Trata erros 4xx"""
         response_text = response.text.lower()
         
         # Check-in já realizado
         if "já foi realizado" in response_text or "já registrado" in response_text:
-            print(f"[SYNC] ℹCheck-in já realizado - REMOVENDO")
+            print("[SYNC] ℹ Check-in já realizado - REMOVENDO")
             if pendente.get('related_inscricao_id'):
                 self.checkin_repo.mark_as_synced(pendente['related_inscricao_id'])
             self.pending_repo.delete(pendente["id"])
@@ -211,7 +310,7 @@ class SyncService:
         
         # Inscrição já existe
         if "já inscrito" in response_text:
-            print(f"[SYNC] ℹInscrição já existe - REMOVENDO")
+            print("[SYNC] ℹ Inscrição já existe - REMOVENDO")
             self.pending_repo.delete(pendente["id"])
             return "ja_feito"
         
@@ -2,35 +2,72 @@
 Microsserviço de Autenticação
 Porta: 8001
 """
-from fastapi import FastAPI, Depends, HTTPException, status, Header
+from fastapi import FastAPI, Depends, HTTPException, Request, Response, status, Header
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from datetime import datetime, timedelta
 from jose import jwt, JWTError
-from passlib.context import CryptContext
 from typing import Optional
-from uuid import UUID
+from uuid import UUID, uuid4
+import logging
+import os
 
 from app.shared.core.database import get_db
 from app.shared.models.usuario import Usuario
+from app.shared.models.refresh_token import RefreshToken
 from app.shared.core.config import settings
 from app.shared import schemas
 from app.shared.middlewares.add import add_common_middlewares
-from app.shared.core.security import require_service_api_key
+from app.shared.core.security import (
+    CADASTRO_ACEITA_SEM_TOKEN,
+    chave_derivada,
+    gerar_token_cadastro,
+    require_jwt_and_service_key,
+    require_service_api_key,
+    verificar_token_cadastro,
+    verificar_token_middleware
+)
+from app.shared.helpers.revogacao_helper import (
+    filtro_revogacao,
+    limpar_revogacoes_expiradas,
+    revogar_token,
+    revogar_usuario
+)
+from app.shared.helpers.email_helper import enviar_email_sync
+from app.shared.helpers.perfil_helper import (
+    VersoesPerfil,
+    claims_perfil,
+    perfil,
+    perfil_dos_claims,
+    versao_com_cpf,
+    versao_perfil
+)
+from app.shared.helpers.senha_helper import servico_senhas
+from app.shared.helpers.transicao_helper import USUARIO_CADASTRAR, transicionar
+
+logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Auth Service", version="1.0.0")
 add_common_middlewares(app, audit=True)
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
-ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 45
+# Token de acesso curto (revogável, ver revogacao_helper) + refresh token
+# rotativo: o frontend (proxy) e o eventos-admin (APIService) renovam a
+# sessão em /refresh quando o token de acesso expira.
+ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "15"))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
+_CHAVE_REFRESH = chave_derivada("refresh")
+# Perfil (nome, email, cpf + versão) no token de acesso: /me responde sem banco
+TOKEN_CLAIMS_PERFIL = os.getenv("AUTH_TOKEN_CLAIMS_PERFIL", "true").lower() in ("1", "true")
+
+versoes_perfil = VersoesPerfil(janela=timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
 
 def criar_token(dados: dict, exp_min: int = ACCESS_TOKEN_EXPIRE_MINUTES):
     to_encode = dados.copy()
-    expire = datetime.utcnow() + timedelta(minutes=exp_min)
-    to_encode.update({"exp": expire})
+    agora = datetime.utcnow()
+    to_encode.update({"exp": agora + timedelta(minutes=exp_min), "iat": agora, "jti": str(uuid4())})
     token = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return token
 
@@ -38,12 +75,50 @@ def criar_token(dados: dict, exp_min: int = ACCESS_TOKEN_EXPIRE_MINUTES):
 def verificar_token(token: str):
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido"
         )
+    
+    if filtro_revogacao.revogado(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado"
+        )
+    
+    return payload
+
+
+def criar_refresh_token(db: Session, usuario_id, familia=None) -> str:
+    """Registra e assina um refresh token (familia: a do token trocado, ou uma nova). Não faz commit."""
+    jti, expira = uuid4(), datetime.utcnow() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(id=jti, usuario_id=usuario_id, familia=familia or uuid4(), expira_em=expira))
+    return jwt.encode({"sub": str(usuario_id), "jti": str(jti), "exp": expira}, _CHAVE_REFRESH, algorithm=ALGORITHM)
+
+
+def emitir_tokens(db: Session, usuario, familia=None) -> dict:
+    """
+    Par token de acesso + refresh token (resposta de login e refresh).
+    usuario: Usuario ou linha com id, nome, email, papel. Não faz commit.
+    """
+    dados = {"sub": str(usuario.id), "role": usuario.papel or "participante"}
+    if TOKEN_CLAIMS_PERFIL:
+        dados.update(claims_perfil(usuario))
+    return {
+        "access_token": criar_token(dados),
+        "refresh_token": criar_refresh_token(db, usuario.id, familia),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_EXPIRE_MINUTES * 60
+    }
+
+
+def revogar_familia(db: Session, familia) -> int:
+    """Revoga os refresh tokens ainda ativos de uma família. Não faz commit."""
+    return db.query(RefreshToken).filter(
+        RefreshToken.familia == familia,
+        RefreshToken.revogado_em.is_(None)
+    ).update({"revogado_em": datetime.utcnow()}, synchronize_session=False)
 
 
 def get_current_user(authorization: Optional[str] = Header(None), db: Session = Depends(get_db)):
@@ -100,18 +175,125 @@ def login(
             detail="Este é um usuário rápido. Por favor, cadastre uma nova senha para acessar o sistema."
         )
     
-    if not pwd.verify(data.senha, user.senha_hash):
+    if not user.senha_hash or not servico_senhas.verificar(data.senha, user.senha_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Credenciais inválidas"
         )
     
-    token = criar_token({
-        "sub": str(user.id),
-        "role": user.papel or "participante"
-    })
+    tokens = emitir_tokens(db, user)
+    db.commit()
+    
+    return tokens
+
+
+@app.post("/refresh", response_model=schemas.Token)
+def refresh(
+    data: schemas.RefreshIn,
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("auth"))
+):
+    """
+    Troca um refresh token por um novo par de tokens (rotação: o token
+    usado deixa de valer). Reapresentar um refresh token já trocado indica
+    vazamento: a família inteira é revogada; o mesmo vale para o token de
+    um usuário que não existe mais.
+    
+    REQUER: API Key (sem JWT - o token de acesso pode já ter expirado)
+    """
+    try:
+        dados = jwt.decode(data.refresh_token, _CHAVE_REFRESH, algorithms=[ALGORITHM])
+        jti = UUID(dados["jti"])
+    except (JWTError, KeyError, ValueError):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
+    
+    agora = datetime.utcnow()
+    t = transicionar(
+        db, RefreshToken.usado_em, ((None,), agora),
+        RefreshToken.id == jti,
+        RefreshToken.revogado_em.is_(None),
+        RefreshToken.expira_em > agora,
+        retornar=(RefreshToken.usuario_id, RefreshToken.familia)
+    )
+    
+    if not t.aplicada:
+        if t.existe and t.estado is not None:
+            familia = db.query(RefreshToken.familia).filter(RefreshToken.id == jti).scalar()
+            revogar_familia(db, familia)
+            db.commit()
+            logger.warning(f"Refresh token reutilizado; família {familia} revogada")
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
+    
+    usuario = db.query(
+        Usuario.id, Usuario.nome, Usuario.email, Usuario.papel
+    ).filter(Usuario.id == t.linha.usuario_id).first()
+    if not usuario:
+        revogar_familia(db, t.linha.familia)
+        db.commit()
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Refresh token inválido")
+    tokens = emitir_tokens(db, usuario, t.linha.familia)
+    db.commit()
+    
+    return tokens
+
+
+@app.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    data: Optional[schemas.RefreshIn] = None,
+    authorization: str = Header(...),
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("auth"))
+):
+    """
+    Revoga o token de acesso atual e, se informado, a família do refresh
+    token (logout só deste dispositivo).
+    
+    REQUER: API Key + JWT
+    """
+    payload = verificar_token_middleware(authorization)
+    
+    if payload.get("jti"):
+        revogar_token(db, payload["jti"], datetime.utcfromtimestamp(payload["exp"]))
+    
+    if data:
+        try:
+            dados = jwt.decode(data.refresh_token, _CHAVE_REFRESH, algorithms=[ALGORITHM])
+        except JWTError:
+            dados = {}
+        if dados.get("sub") == payload.get("sub") and dados.get("jti"):
+            familia = db.query(RefreshToken.familia).filter(RefreshToken.id == UUID(dados["jti"])).scalar()
+            if familia:
+                revogar_familia(db, familia)
+    
+    limpar_revogacoes_expiradas(db)
+    db.commit()
+
+
+@app.post("/usuarios/{usuario_id}/revogar-tokens")
+def revogar_tokens_usuario(
+    usuario_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("auth", "administrador"))
+):
+    """
+    Encerra todas as sessões de um usuário: revoga os refresh tokens e os
+    tokens de acesso já emitidos (ex.: troca de papel, conta comprometida).
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    if not db.query(Usuario.id).filter(Usuario.id == usuario_id).first():
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuário não encontrado")
+    
+    refresh_revogados = db.query(RefreshToken).filter(
+        RefreshToken.usuario_id == usuario_id,
+        RefreshToken.revogado_em.is_(None),
+        RefreshToken.usado_em.is_(None)
+    ).update({"revogado_em": datetime.utcnow()}, synchronize_session=False)
+    revogar_usuario(db, usuario_id, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    limpar_revogacoes_expiradas(db)
+    db.commit()
     
-    return {"access_token": token, "token_type": "bearer"}
+    return {"usuario_id": str(usuario_id), "refresh_tokens_revogados": refresh_revogados}
 
 
 @app.post("/registrar", status_code=status.HTTP_201_CREATED)
@@ -144,7 +326,7 @@ def registrar(
         nome=data.nome,
         email=data.email,
         cpf=data.cpf,
-        senha_hash=pwd.hash(data.senha),
+        senha_hash=servico_senhas.hash(data.senha),
         papel="participante",  # Novos registros sempre começam como participante
         email_verificado=False
     )
@@ -208,7 +390,7 @@ def completar_cadastro(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="A senha deve ter no mínimo 6 caracteres"
             )
-        current_user.senha_hash = pwd.hash(data.senha)
+        current_user.senha_hash = servico_senhas.hash(data.senha)
     
     # Mudar papel para participante (sai de "rapido")
     current_user.papel = "participante"
@@ -248,12 +430,21 @@ def validar_token(
 @app.get("/me")
 def me(
     token: str,
+    request: Request,
+    incluir_cpf: bool = False,
     db: Session = Depends(get_db),
     api_key: None = Depends(require_service_api_key("auth"))
 ):
     """
     Retorna dados do usuário autenticado baseado no token.
     
+    Se o token traz os claims de perfil e eles são os atuais (ver
+    perfil_helper), responde sem consultar o banco. O ETag é a versão do
+    perfil: If-None-Match igual devolve 304.
+    
+    Query params:
+    - incluir_cpf: inclui o CPF (lido do banco: não está no token)
+    
     REQUER: API Key + token como query param
     """
     payload = verificar_token(token)
@@ -265,21 +456,30 @@ def me(
             detail="Token inválido"
         )
     
-    user = db.query(Usuario).filter(Usuario.id == user_id).first()
+    if not incluir_cpf and versoes_perfil.atual(payload):
+        dados, versao = perfil_dos_claims(payload), payload["pv"]
+    else:
+        user = db.query(
+            Usuario.id, Usuario.nome, Usuario.email, Usuario.papel, Usuario.cpf
+        ).filter(Usuario.id == user_id).first()
+        
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Usuário não encontrado"
+            )
+        dados, versao = perfil(user), versao_perfil(user.id, user.nome, user.email, user.papel)
+        if incluir_cpf:
+            dados["cpf"] = user.cpf
+            versao = versao_com_cpf(versao, user.cpf)
     
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Usuário não encontrado"
-        )
+    etag = f'"{versao}"'
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
     
-    return {
-        "id": str(user.id),
-        "nome": user.nome,
-        "email": user.email,
-        "cpf": user.cpf,
-        "papel": user.papel
-    }
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    return JSONResponse(content=dados, headers=cache_headers)
 
 
 @app.get("/verificar-usuario-rapido")
@@ -318,6 +518,33 @@ def verificar_usuario_rapido(
     }
 
 
+@app.post("/solicitar-cadastro-rapido", status_code=status.HTTP_202_ACCEPTED)
+def solicitar_cadastro_rapido(
+    email: str,
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("auth"))
+):
+    """
+    Envia ao email de um usuário rápido um novo token de cadastro.
+    A resposta é a mesma exista ou não o usuário.
+    
+    REQUER: API Key
+    """
+    user = db.query(Usuario.id, Usuario.nome, Usuario.papel).filter(Usuario.email == email).first()
+    
+    if user and user.papel == "rapido" and "@" in email:
+        try:
+            enviar_email_sync(
+                to=email,
+                template="cadastro_rapido",
+                data={"nome": user.nome, "token_cadastro": gerar_token_cadastro(user.id)}
+            )
+        except Exception as email_error:
+            logger.warning(f"Erro ao enviar email de cadastro: {email_error}")
+    
+    return {"message": "Se o email pertencer a um usuário rápido, o token de cadastro foi enviado"}
+
+
 @app.post("/cadastrar-senha-rapido")
 def cadastrar_senha_rapido(
     data: schemas.CadastrarSenhaRapidoIn,
@@ -326,13 +553,29 @@ def cadastrar_senha_rapido(
 ):
     """
     Permite que um usuário rápido cadastre uma senha e complete seu cadastro.
+    Exige o token de cadastro (enviado no check-in/inscrição rápida ou por
+    /solicitar-cadastro-rapido). O token só vale uma vez: o usuário deixa
+    de ser rápido na mesma instrução que grava a senha.
+    
+    Com CADASTRO_RAPIDO_ACEITA_SEM_TOKEN, o pedido sem token ainda é aceito
+    (fluxo antigo, só pelo email), durante a transição dos clientes.
     
     REQUER: API Key
     """
+    if data.token:
+        usuario_id = verificar_token_cadastro(data.token)
+    elif CADASTRO_ACEITA_SEM_TOKEN:
+        usuario_id = None
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de cadastro obrigatório"
+        )
+    
     # Buscar usuário pelo email
-    user = db.query(Usuario).filter(Usuario.email == data.email).first()
+    user = db.query(Usuario.id, Usuario.papel).filter(Usuario.email == data.email).first()
     
-    if not user:
+    if not user or (usuario_id is not None and str(user.id) != usuario_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Usuário não encontrado"
@@ -345,12 +588,9 @@ def cadastrar_senha_rapido(
             detail="Este endpoint é apenas para usuários rápidos"
         )
     
-    # Atualizar dados
-    user.nome = data.nome.strip()
-    
     if data.cpf:
         # Verificar se CPF já existe em outro usuário
-        cpf_existente = db.query(Usuario).filter(
+        cpf_existente = db.query(Usuario.id).filter(
             Usuario.cpf == data.cpf,
             Usuario.id != user.id
         ).first()
@@ -360,35 +600,67 @@ def cadastrar_senha_rapido(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="CPF já cadastrado para outro usuário"
             )
-        
-        user.cpf = data.cpf
     
-    # Atualizar senha
+    # Validar senha
     if len(data.senha) < 6:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="A senha deve ter no mínimo 6 caracteres"
         )
     
-    user.senha_hash = pwd.hash(data.senha)
+    valores = {
+        "nome": data.nome.strip(),
+        "senha_hash": servico_senhas.hash(data.senha),
+        "email_verificado": True
+    }
+    if data.cpf:
+        valores["cpf"] = data.cpf
     
-    # Mudar papel para participante
-    user.papel = "participante"
-    user.email_verificado = True
+    # Mudar papel para participante (rapido -> participante, condicional)
+    t = transicionar(
+        db, Usuario.papel, USUARIO_CADASTRAR, Usuario.id == user.id,
+        valores=valores,
+        retornar=(Usuario.id, Usuario.nome, Usuario.email, Usuario.cpf, Usuario.papel)
+    )
+    
+    if not t.aplicada:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Este endpoint é apenas para usuários rápidos"
+        )
     
     db.commit()
-    db.refresh(user)
+    cadastrado = t.linha
     
     return {
-        "id": str(user.id),
-        "nome": user.nome,
-        "email": user.email,
-        "cpf": user.cpf,
-        "papel": user.papel,
+        "id": str(cadastrado.id),
+        "nome": cadastrado.nome,
+        "email": cadastrado.email,
+        "cpf": cadastrado.cpf,
+        "papel": cadastrado.papel,
         "message": "Senha cadastrada e cadastro completado com sucesso!"
     }
 
 
+@app.get("/senhas/metricas")
+def metricas_senhas(
+    current_user: dict = Depends(require_jwt_and_service_key("auth", "administrador"))
+):
+    """
+    Estado do pool de hash de senhas deste processo: operações em
+    andamento, recusas por saturação (503) e latência.
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    return servico_senhas.metricas()
+
+
+@app.on_event("shutdown")
+def encerrar_recursos():
+    servico_senhas.encerrar()
+    versoes_perfil.parar()
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8001)
\ No newline at end of file
@@ -2,13 +2,19 @@
 Microsserviço de Certificados
 Porta: 8007
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy import text, update
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 from uuid import UUID
 import datetime
+import logging
+import os
 import secrets
+from typing import Iterator, Optional
 
-from app.shared.core.database import get_db
+from app.shared.core.database import get_db, SessionLocal
 from app.shared.models.certificado import Certificado
 from app.shared.models.inscricao import Inscricao
 from app.shared.models.checkin import Checkin
@@ -21,9 +27,93 @@ from app.shared.core.security import (
     get_current_user_from_token
 )
 from app.shared.models.evento import Evento
+from app.shared.helpers.certificado_pdf_helper import (
+    caminho_absoluto,
+    etag_pdf,
+    get_pdf_executor,
+    salvar_certificado_pdf
+)
+from app.shared.helpers.zip_stream_helper import stream_zip
+from app.shared.helpers.cache_helper import AUSENTE, CacheTTL
+from app.shared.helpers.log_helper import get_logger_amostrado
+from app.shared.helpers.transicao_helper import CERTIFICADO_REVOGAR, transicionar, transicionar_varios
+from app.shared.helpers.json_helper import colunas, resposta_lista
+from app.shared.helpers.tarefa_helper import TarefasPorChave
+
+logger = logging.getLogger(__name__)
+
+CAMINHO_PDF = "/codigo/{codigo}/pdf"
 
 app = FastAPI(title="Certificados Service", version="1.0.0")
-add_common_middlewares(app, audit=True)
+# Download do PDF: fora da auditoria, para o FileResponse enviar o arquivo
+# direto do disco (o middleware reencaminha a resposta por um stream interno)
+add_common_middlewares(app, audit=True, audit_ignorar=[CAMINHO_PDF])
+
+
+def _dados_pdf(db: Session, *filtros, limite: Optional[int] = None) -> list[dict]:
+    """
+    Dados para renderizar os PDFs dos certificados filtrados (uma consulta),
+    ordenados por id. Inclui o caminho_pdf atual.
+    """
+    linhas = (
+        db.query(
+            Certificado.id,
+            Certificado.codigo_certificado,
+            Certificado.caminho_pdf,
+            Certificado.emitido_em,
+            Evento.titulo,
+            Evento.inicio_em,
+            Evento.fim_em,
+            Inscricao.inscricao_rapida,
+            Inscricao.nome_rapido,
+            Usuario.nome
+        )
+        .join(Evento, Evento.id == Certificado.evento_id)
+        .join(Inscricao, Inscricao.id == Certificado.inscricao_id)
+        .outerjoin(Usuario, Usuario.id == Inscricao.usuario_id)
+        .filter(*filtros)
+        .order_by(Certificado.id)
+        .limit(limite)
+        .all()
+    )
+    
+    return [
+        {
+            "id": l.id,
+            "codigo": l.codigo_certificado,
+            "caminho_pdf": l.caminho_pdf,
+            "participante": l.nome_rapido if l.inscricao_rapida else l.nome,
+            "evento": l.titulo,
+            "inicio_em": l.inicio_em,
+            "fim_em": l.fim_em,
+            "emitido_em": l.emitido_em
+        }
+        for l in linhas
+    ]
+
+
+def _gerar_pdfs(db: Session, dados: list[dict]) -> dict:
+    """
+    Renderiza os PDFs no pool de processos e grava os caminhos
+    em Certificado.caminho_pdf (UPDATE em lote). Não faz commit.
+    Retorna {certificado_id: caminho_pdf}.
+    """
+    if not dados:
+        return {}
+    
+    caminhos = get_pdf_executor().map(salvar_certificado_pdf, dados, chunksize=16)
+    gerados = {d["id"]: caminho for d, caminho in zip(dados, caminhos)}
+    
+    db.execute(
+        update(Certificado),
+        [{"id": cert_id, "caminho_pdf": caminho} for cert_id, caminho in gerados.items()]
+    )
+    return gerados
+
+
+def _viola_inscricao_unica(e: IntegrityError) -> bool:
+    """A falha foi a restrição de um certificado por inscrição (migração 0002)?"""
+    return getattr(getattr(e.orig, "diag", None), "constraint_name", None) == "uq_certificados_inscricao_id"
 
 
 @app.post("/emitir", response_model=schemas.CertificadoOut, status_code=status.HTTP_201_CREATED)
@@ -69,7 +159,14 @@ def emitir_certificado(
     )
     
     db.add(cert)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        # Outra emissão para a mesma inscrição passou pela verificação acima
+        db.rollback()
+        if _viola_inscricao_unica(e):
+            raise HTTPException(status_code=400, detail="Certificado já foi emitido para esta inscrição")
+        raise
     db.refresh(cert)
     
     return cert
@@ -116,7 +213,14 @@ def emitir_certificado_automatico(
     )
     
     db.add(cert)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        if not _viola_inscricao_unica(e):
+            raise
+        # Emitido em paralelo (ex.: check-in repetido): retorna o existente
+        return db.query(Certificado).filter(Certificado.inscricao_id == inscricao_id).one()
     db.refresh(cert)
     
     return {
@@ -158,6 +262,75 @@ def obter_certificado_por_inscricao(
     }
 
 
+# VERIFICAÇÃO PÚBLICA (/codigo/{codigo})
+
+VERIFICACAO_CACHE_TTL = float(os.getenv("CERTIFICADOS_CACHE_TTL", "60"))
+VERIFICACAO_CACHE_TTL_NEGATIVO = float(os.getenv("CERTIFICADOS_CACHE_TTL_NEGATIVO", "10"))
+VERIFICACAO_CACHE_MAX = int(os.getenv("CERTIFICADOS_CACHE_MAX", "10000"))
+
+# Resposta da verificação por código; None = código inexistente (cache negativo,
+# curto, para absorver tentativas de enumeração)
+_cache_verificacao = CacheTTL(VERIFICACAO_CACHE_TTL, VERIFICACAO_CACHE_MAX)
+
+log_verificacao = get_logger_amostrado(
+    f"{__name__}.verificacao",
+    float(os.getenv("CERTIFICADOS_LOG_AMOSTRAGEM", "0.01"))
+)
+
+
+def _consultar_verificacao(db: Session, codigo: str) -> Optional[dict]:
+    """Projeção usada na verificação pública, em uma única consulta"""
+    linha = (
+        db.query(
+            Certificado.id,
+            Certificado.codigo_certificado,
+            Certificado.emitido_em,
+            Certificado.revogado,
+            Evento.id.label("evento_id"),
+            Evento.titulo,
+            Evento.inicio_em,
+            Inscricao.id.label("inscricao_id"),
+            Inscricao.inscricao_rapida,
+            Inscricao.nome_rapido,
+            Usuario.nome
+        )
+        .outerjoin(Evento, Evento.id == Certificado.evento_id)
+        .outerjoin(Inscricao, Inscricao.id == Certificado.inscricao_id)
+        .outerjoin(Usuario, Usuario.id == Inscricao.usuario_id)
+        .filter(Certificado.codigo_certificado == codigo)
+        .first()
+    )
+    
+    if not linha:
+        return None
+    
+    participante = None
+    if linha.inscricao_id:
+        if linha.inscricao_rapida:
+            participante = {"nome": linha.nome_rapido}
+        elif linha.nome is not None:
+            participante = {"nome": linha.nome}
+    
+    return {
+        "id": str(linha.id),
+        "codigo_certificado": linha.codigo_certificado,
+        "emitido_em": linha.emitido_em.isoformat() if linha.emitido_em else None,
+        "revogado": linha.revogado,
+        "evento": {
+            "id": str(linha.evento_id),
+            "titulo": linha.titulo,
+            "inicio_em": linha.inicio_em.isoformat() if linha.inicio_em else None
+        } if linha.evento_id else None,
+        "participante": participante,
+        "valido": not linha.revogado
+    }
+
+
+def _invalidar_verificacao(*codigos: str):
+    """Remove códigos do cache de verificação (após revogação)"""
+    _cache_verificacao.invalidar(*codigos)
+
+
 @app.get("/codigo/{codigo}")
 def obter_por_codigo(
     codigo: str,
@@ -166,68 +339,75 @@ def obter_por_codigo(
 ):
     """
     Endpoint para validação de certificados.
+    
+    Uma única consulta (certificado + evento + inscrição + usuário), com
+    cache por código neste processo. Revogações feitas neste processo
+    invalidam o cache na hora; nos demais, valem após o TTL.
     """
-    print(f"=== BUSCANDO CERTIFICADO POR CÓDIGO ===")
-    print(f"Código recebido: {codigo}")
+    resposta = _cache_verificacao.obter(codigo)
     
-    try:
-        cert = db.query(Certificado).filter(Certificado.codigo_certificado == codigo).first()
+    if resposta is AUSENTE:
+        try:
+            resposta = _consultar_verificacao(db, codigo)
+        except Exception as e:
+            log_verificacao.exception("Erro ao verificar certificado %s", codigo)
+            raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
         
-        print(f"Certificado encontrado: {cert is not None}")
-        
-        if not cert:
-            raise HTTPException(status_code=404, detail="Certificado não encontrado")
-        
-        print(f"Certificado ID: {cert.id}")
-        print(f"Evento ID: {cert.evento_id}")
-        print(f"Inscrição ID: {cert.inscricao_id}")
-        
-        # Buscar dados do evento
-        evento = db.query(Evento).filter(Evento.id == cert.evento_id).first()
-        print(f"Evento encontrado: {evento is not None}")
-        
-        # Buscar dados da inscrição
-        inscricao = db.query(Inscricao).filter(Inscricao.id == cert.inscricao_id).first()
-        print(f"Inscrição encontrada: {inscricao is not None}")
-        
-        # Buscar dados do participante
-        usuario = None
-        if inscricao:
-            print(f"Inscrição rápida: {inscricao.inscricao_rapida}")
-            if inscricao.inscricao_rapida:
-                usuario = {"nome": inscricao.nome_rapido}
-                print(f"Nome rápido: {inscricao.nome_rapido}")
-            else:
-                user = db.query(Usuario).filter(Usuario.id == inscricao.usuario_id).first()
-                print(f"Usuário encontrado: {user is not None}")
-                if user:
-                    usuario = {"nome": user.nome}
-                    print(f"Nome usuário: {user.nome}")
-        
-        response = {
-            "id": str(cert.id),
-            "codigo_certificado": cert.codigo_certificado,
-            "emitido_em": cert.emitido_em.isoformat() if cert.emitido_em else None,
-            "revogado": cert.revogado,
-            "evento": {
-                "id": str(evento.id) if evento else None,
-                "titulo": evento.titulo if evento else None,
-                "inicio_em": evento.inicio_em.isoformat() if evento and evento.inicio_em else None
-            } if evento else None,
-            "participante": usuario,
-            "valido": not cert.revogado
-        }
-        
-        print(f"✅ Resposta montada com sucesso")
-        return response
+        ttl = None if resposta else VERIFICACAO_CACHE_TTL_NEGATIVO
+        _cache_verificacao.guardar(codigo, resposta, ttl=ttl)
+        log_verificacao.debug("Certificado %s consultado no banco (encontrado=%s)", codigo, resposta is not None)
+    else:
+        log_verificacao.debug("Certificado %s servido do cache", codigo)
+    
+    if resposta is None:
+        log_verificacao.info("Código de certificado inexistente: %s", codigo)
+        raise HTTPException(status_code=404, detail="Certificado não encontrado")
+    
+    return resposta
+
+
+@app.get(CAMINHO_PDF)
+def baixar_certificado_pdf(
+    codigo: str,
+    request: Request,
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("certificados"))
+):
+    """
+    Download do PDF do certificado.
+    
+    O PDF é gerado na primeira requisição (no pool de processos) e reaproveitado
+    depois. O arquivo é servido direto do disco; o ETag é o hash do conteúdo,
+    então If-None-Match devolve 304 sem reenviar o arquivo.
+    """
+    cert = db.query(Certificado).filter(Certificado.codigo_certificado == codigo).first()
+    
+    if not cert:
+        raise HTTPException(status_code=404, detail="Certificado não encontrado")
+    
+    if cert.revogado:
+        raise HTTPException(status_code=410, detail="Certificado revogado")
+    
+    if not cert.caminho_pdf or not os.path.exists(caminho_absoluto(cert.caminho_pdf)):
+        dados = _dados_pdf(db, Certificado.id == cert.id)
+        if not dados:
+            raise HTTPException(status_code=404, detail="Dados do certificado incompletos")
         
-    except HTTPException:
-        raise
-    except Exception as e:
-        print(f"❌ ERRO: {str(e)}")
-        import traceback
-        traceback.print_exc()
-        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+        cert.caminho_pdf = get_pdf_executor().submit(salvar_certificado_pdf, dados[0]).result()
+        db.commit()
+    
+    etag = etag_pdf(cert.caminho_pdf)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    return FileResponse(
+        caminho_absoluto(cert.caminho_pdf),
+        media_type="application/pdf",
+        filename=f"certificado-{codigo}.pdf",
+        headers=cache_headers
+    )
 
 
 @app.get("/meus", response_model=list[schemas.CertificadoOut])
@@ -240,12 +420,11 @@ def listar_meus_certificados(
     Lista todos os certificados do usuário autenticado.
     """
     certs = (
-        db.query(Certificado)
+        db.query(*colunas(schemas.CertificadoOut, Certificado))
         .join(Inscricao, Inscricao.id == Certificado.inscricao_id)
         .filter(Inscricao.usuario_id == current_user.id)
-        .all()
     )
-    return certs
+    return resposta_lista(schemas.CertificadoOut, certs)
 
 
 @app.get("/evento/{evento_id}", response_model=list[schemas.CertificadoOut])
@@ -257,7 +436,99 @@ def listar_certificados_por_evento(
     """
     Lista todos os certificados emitidos para um evento.
     """
-    return db.query(Certificado).filter(Certificado.evento_id == evento_id).all()
+    return resposta_lista(
+        schemas.CertificadoOut,
+        db.query(*colunas(schemas.CertificadoOut, Certificado)).filter(Certificado.evento_id == evento_id)
+    )
+
+
+ZIP_PAGINA = int(os.getenv("CERTIFICADOS_ZIP_PAGINA", "200"))
+
+
+def _pdf_disponivel(caminho_pdf: Optional[str]) -> bool:
+    return bool(caminho_pdf) and os.path.exists(caminho_absoluto(caminho_pdf))
+
+
+def _entradas_zip_evento(evento_id: UUID) -> Iterator[tuple[str, str]]:
+    """
+    Entradas do ZIP de certificados do evento: (nome, caminho do PDF).
+
+    Percorre os certificados não revogados em páginas (keyset por id), com
+    sessão própria, pois roda enquanto a resposta é enviada. Os PDFs que
+    faltam em cada página são enviados ao pool assim que a página é lida e
+    consumidos na ordem pelo ZIP; os caminhos gerados são gravados ao fim
+    da página.
+    """
+    db = SessionLocal()
+    executor = get_pdf_executor()
+    ultimo_id = None
+
+    try:
+        while True:
+            filtros = [Certificado.evento_id == evento_id, Certificado.revogado.isnot(True)]
+            if ultimo_id:
+                filtros.append(Certificado.id > ultimo_id)
+
+            pagina = _dados_pdf(db, *filtros, limite=ZIP_PAGINA)
+            db.commit()  # não mantém transação aberta durante o envio
+
+            pendentes = {
+                d["id"]: executor.submit(salvar_certificado_pdf, d)
+                for d in pagina
+                if not _pdf_disponivel(d["caminho_pdf"])
+            }
+            gerados = {}
+
+            for d in pagina:
+                caminho = d["caminho_pdf"]
+                if d["id"] in pendentes:
+                    caminho = gerados[d["id"]] = pendentes[d["id"]].result()
+                yield f"certificado-{d['codigo']}.pdf", caminho_absoluto(caminho)
+
+            if gerados:
+                db.execute(
+                    update(Certificado),
+                    [{"id": cert_id, "caminho_pdf": caminho} for cert_id, caminho in gerados.items()]
+                )
+                db.commit()
+
+            if len(pagina) < ZIP_PAGINA:
+                break
+            ultimo_id = pagina[-1]["id"]
+    except Exception as e:
+        # A resposta já começou: só resta interromper o ZIP
+        db.rollback()
+        logger.error(f"Erro ao gerar ZIP de certificados do evento {evento_id}: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@app.get("/evento/{evento_id}/zip")
+def baixar_certificados_evento_zip(
+    evento_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("certificados", "atendente", "administrador"))
+):
+    """
+    Download de todos os certificados (não revogados) do evento em um ZIP.
+
+    O ZIP é montado e enviado em streaming, sem ser criado em memória ou
+    em disco: a memória usada é constante, independente do tamanho do evento.
+    PDFs ainda não gerados são renderizados no pool de processos conforme
+    o envio avança.
+
+    REQUER: API Key + JWT + Role (atendente ou administrador)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+
+    return StreamingResponse(
+        stream_zip(_entradas_zip_evento(evento_id)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="certificados-{evento_id}.zip"'}
+    )
 
 
 @app.post("/revogar/{codigo}")
@@ -269,20 +540,196 @@ def revogar_certificado(
     """
     Revoga um certificado (torna-o inválido).
     """
-    cert = db.query(Certificado).filter(Certificado.codigo_certificado == codigo).first()
+    t = transicionar(db, Certificado.revogado, CERTIFICADO_REVOGAR, Certificado.codigo_certificado == codigo)
     
-    if not cert:
+    if not t.existe:
         raise HTTPException(status_code=404, detail="Certificado não encontrado")
     
-    if cert.revogado:
+    if not t.aplicada:
         raise HTTPException(status_code=400, detail="Certificado já estava revogado")
     
-    cert.revogado = True
     db.commit()
+    _invalidar_verificacao(codigo)
     
     return {"message": "Certificado revogado com sucesso", "codigo": codigo}
 
 
+# EMISSÃO E REVOGAÇÃO EM MASSA
+
+EMISSAO_TAMANHO_LOTE = int(os.getenv("CERTIFICADOS_EMISSAO_LOTE", "1000"))
+
+_emissoes = TarefasPorChave("emissão em massa de certificados do evento")
+
+# Anti-join: inscrições do evento com check-in e sem certificado.
+# O código tem o mesmo alfabeto de secrets.token_urlsafe (base64 url-safe),
+# gerado a partir de gen_random_uuid() para não depender de pgcrypto.
+SQL_EMITIR_LOTE = text("""
+    INSERT INTO certificados (id, inscricao_id, evento_id, codigo_certificado, emitido_em, caminho_pdf, revogado)
+    SELECT gen_random_uuid(), i.id, i.evento_id,
+           translate(rtrim(encode(decode(replace(gen_random_uuid()::text, '-', ''), 'hex'), 'base64'), '='), '+/', '-_'),
+           now() AT TIME ZONE 'utc', NULL, false
+    FROM inscricoes i
+    WHERE i.evento_id = :evento_id
+      AND EXISTS (SELECT 1 FROM checkins c WHERE c.inscricao_id = i.id)
+      AND NOT EXISTS (SELECT 1 FROM certificados x WHERE x.inscricao_id = i.id)
+    ORDER BY i.id
+    LIMIT :limite
+    ON CONFLICT (inscricao_id) DO NOTHING
+    RETURNING id
+""")
+
+
+def _progresso_emissao(db: Session, evento_id: UUID) -> dict:
+    """Conta inscrições com check-in do evento, com e sem certificado (uma consulta)"""
+    total, com_certificado = db.execute(text("""
+        SELECT COUNT(*),
+               COUNT(*) FILTER (WHERE EXISTS (SELECT 1 FROM certificados x WHERE x.inscricao_id = i.id))
+        FROM inscricoes i
+        WHERE i.evento_id = :evento_id
+          AND EXISTS (SELECT 1 FROM checkins c WHERE c.inscricao_id = i.id)
+    """), {"evento_id": evento_id}).one()
+    
+    return {
+        "total_com_checkin": total,
+        "com_certificado": com_certificado,
+        "faltantes": total - com_certificado
+    }
+
+
+def _executar_emissao_em_massa(estado: dict, evento_id: UUID, tamanho_lote: int, gerar_pdf: bool):
+    """
+    Emite os certificados faltantes do evento, lote a lote (em background).
+    Se gerar_pdf, já renderiza os PDFs de cada lote no pool de processos.
+    """
+    db = SessionLocal()
+    
+    try:
+        while True:
+            emitidos = db.execute(SQL_EMITIR_LOTE, {"evento_id": evento_id, "limite": tamanho_lote}).scalars().all()
+            db.commit()
+            
+            if not emitidos:
+                break
+            
+            estado["emitidos"] += len(emitidos)
+            estado["lotes"] += 1
+            
+            if gerar_pdf:
+                gerados = _gerar_pdfs(db, _dados_pdf(db, Certificado.id.in_(emitidos)))
+                db.commit()
+                estado["pdfs_gerados"] += len(gerados)
+    finally:
+        db.close()
+
+
+@app.post("/evento/{evento_id}/emitir-todos", status_code=status.HTTP_202_ACCEPTED)
+def emitir_certificados_evento(
+    evento_id: UUID,
+    background_tasks: BackgroundTasks,
+    tamanho_lote: int = Query(EMISSAO_TAMANHO_LOTE, ge=1, le=10000),
+    gerar_pdf: bool = True,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("certificados", "administrador"))
+):
+    """
+    Emite certificados para todas as inscrições do evento que têm check-in
+    e ainda não têm certificado.
+    
+    Roda em background, em lotes: cada lote é um único INSERT ... SELECT
+    (anti-join), com commit a cada lote. Pode ser executado de novo sem
+    risco: só emite o que falta. Se já houver uma emissão em andamento para
+    o evento, apenas retorna o progresso dela.
+    
+    Query params:
+    - gerar_pdf: se True (padrão), já renderiza os PDFs de cada lote
+    
+    Acompanhe pelo GET no mesmo caminho.
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    estado = _emissoes.iniciar(
+        evento_id, background_tasks, _executar_emissao_em_massa, evento_id, tamanho_lote, gerar_pdf,
+        emitidos=0, pdfs_gerados=0, lotes=0, tamanho_lote=tamanho_lote
+    )
+    
+    return {"evento_id": str(evento_id), "execucao": estado, **_progresso_emissao(db, evento_id)}
+
+
+@app.get("/evento/{evento_id}/emitir-todos")
+def progresso_emissao_certificados(
+    evento_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("certificados", "atendente", "administrador"))
+):
+    """
+    Progresso da emissão em massa de certificados do evento.
+    """
+    return {
+        "evento_id": str(evento_id),
+        "execucao": _emissoes.estado(evento_id),
+        **_progresso_emissao(db, evento_id)
+    }
+
+
+@app.post("/evento/{evento_id}/revogar-todos")
+def revogar_certificados_evento(
+    evento_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("certificados", "administrador"))
+):
+    """
+    Revoga todos os certificados de um evento em um único UPDATE.
+    Certificados já revogados não são alterados.
+    """
+    revogados = [c for (c,) in transicionar_varios(
+        db, Certificado.revogado, CERTIFICADO_REVOGAR, Certificado.evento_id == evento_id,
+        retornar=(Certificado.codigo_certificado,)
+    )]
+    db.commit()
+    _invalidar_verificacao(*revogados)
+    
+    return {"evento_id": str(evento_id), "revogados": len(revogados)}
+
+
+@app.post("/revogar-lote")
+def revogar_certificados_lote(
+    payload: schemas.CertificadoRevogacaoLoteIn,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("certificados", "administrador"))
+):
+    """
+    Revoga uma lista de certificados pelo código, em um único UPDATE.
+    Informa quais códigos já estavam revogados e quais não existem.
+    """
+    codigos = set(payload.codigos)
+    if not codigos:
+        return {"revogados": [], "ja_revogados": [], "nao_encontrados": []}
+    
+    revogados = [c for (c,) in transicionar_varios(
+        db, Certificado.revogado, CERTIFICADO_REVOGAR, Certificado.codigo_certificado.in_(codigos),
+        retornar=(Certificado.codigo_certificado,)
+    )]
+    
+    restantes = codigos - set(revogados)
+    ja_revogados = db.query(Certificado.codigo_certificado).filter(
+        Certificado.codigo_certificado.in_(restantes)
+    ).all() if restantes else []
+    ja_revogados = [c for (c,) in ja_revogados]
+    
+    db.commit()
+    _invalidar_verificacao(*revogados)
+    
+    return {
+        "revogados": sorted(revogados),
+        "ja_revogados": sorted(ja_revogados),
+        "nao_encontrados": sorted(restantes - set(ja_revogados))
+    }
+
+
 @app.get("/{certificado_id}", response_model=schemas.CertificadoOut)
 def obter_certificado(
     certificado_id: UUID,
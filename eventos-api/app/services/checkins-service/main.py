@@ -2,33 +2,53 @@
 CHECKINS SERVICE - Porta: 8006
 Atualizado: emite certificado automaticamente após check-in
 """
-import hashlib
+import asyncio
+import json
 import logging
 import httpx
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Response, WebSocket, WebSocketDisconnect, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import case, literal_column, select, text, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from typing import Any, NamedTuple
 from uuid import UUID, uuid4
-from passlib.context import CryptContext
 import datetime
-import secrets
 import os
+import threading
 
-from app.shared.core.database import get_db
+from app.shared.core.database import get_db, SessionLocal
 from app.shared.models.checkin import Checkin
 from app.shared.models.inscricao import Inscricao
 from app.shared.models.evento import Evento
 from app.shared.models.usuario import Usuario
+from app.shared import schemas
 from app.shared.middlewares.add import add_common_middlewares
-from app.shared.core.security import require_jwt_and_service_key, require_service_api_key
+from app.shared.core.security import (
+    autenticar_jwt_e_service_key,
+    gerar_token_cadastro,
+    require_jwt_and_service_key,
+    require_service_api_key
+)
 from app.shared.models.ingresso import Ingresso
 from app.shared.helpers.email_helper import enviar_email_sync
+from app.shared.helpers.notificacao_helper import EscutaNotificacoes
+from app.shared.helpers.portaria_helper import CANAL as CANAL_PORTARIA
+from app.shared.helpers.transicao_helper import INSCRICAO_ATIVOS
+from app.shared.helpers.ingresso_helper import (
+    TokenIngressoExpirado,
+    TokenIngressoInvalido,
+    dados_novo_ingresso,
+    token_assinado,
+    verificar_token_assinado
+)
 
 logger = logging.getLogger(__name__)
 
 app = FastAPI(title="Checkins Service", version="1.0.0")
 add_common_middlewares(app, audit=True)
 
-pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 # URLs dos outros serviços
 CERTIFICADOS_URL = os.getenv("CERTIFICADOS_URL", "http://localhost:8007")
@@ -54,95 +74,193 @@ async def emitir_certificado_automatico(inscricao_id: UUID):
     return None
 
 
+def inserir_checkin(db: Session, inscricao_id: UUID, ingresso_id: UUID | None, usuario_id: UUID | None):
+    """
+    Registra o check-in em um único comando atômico:
+    INSERT ... ON CONFLICT (inscricao_id) DO UPDATE ... RETURNING.
+
+    - Se a inscrição ainda não tem check-in, insere e marca a inscrição
+      como não sincronizada (no mesmo comando, via CTE).
+    - Se já tem, retorna o check-in existente com criado=False.
+
+    A unicidade é garantida pela constraint uq_checkins_inscricao_id, então
+    duas estações lendo o mesmo ingresso ao mesmo tempo não geram duplicidade.
+    Inscrição/ingresso inexistentes violam a FK e viram 404.
+    Não faz commit.
+    """
+    stmt = insert(Checkin).values(
+        id=uuid4(),
+        inscricao_id=inscricao_id,
+        ingresso_id=ingresso_id,
+        usuario_id=usuario_id,
+        ocorrido_em=datetime.datetime.utcnow()
+    )
+    # DO UPDATE (e não DO NOTHING) para o RETURNING trazer também a linha existente.
+    # xmax = 0 só é verdadeiro para a linha recém-inserida.
+    inserido = stmt.on_conflict_do_update(
+        index_elements=[Checkin.inscricao_id],
+        set_={"inscricao_id": stmt.excluded.inscricao_id}
+    ).returning(
+        Checkin.id,
+        Checkin.inscricao_id,
+        Checkin.ingresso_id,
+        Checkin.usuario_id,
+        Checkin.ocorrido_em,
+        literal_column("xmax = 0").label("criado")
+    ).cte("inserido")
+
+    marcar_nao_sincronizada = (
+        update(Inscricao)
+        .where(Inscricao.id == inserido.c.inscricao_id, inserido.c.criado)
+        .values(sincronizado=False)
+        .cte("marcar_nao_sincronizada")
+    )
+
+    try:
+        return db.execute(select(inserido).add_cte(marcar_nao_sincronizada)).one()
+    except IntegrityError as e:
+        db.rollback()
+        constraint = getattr(getattr(e.orig, "diag", None), "constraint_name", "") or ""
+        if "inscricao_id" in constraint:
+            raise HTTPException(status_code=404, detail="Inscrição não encontrada")
+        if "ingresso_id" in constraint:
+            raise HTTPException(status_code=404, detail="Ingresso não encontrado")
+        if "usuario_id" in constraint:
+            raise HTTPException(status_code=404, detail="Usuário não encontrado")
+        raise
+
+
 @app.post("/", status_code=status.HTTP_201_CREATED)
 async def registrar_checkin(
     inscricao_id: UUID,
     ingresso_id: UUID,
     usuario_id: UUID,
+    response: Response,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_jwt_and_service_key("checkins", "atendente", "administrador"))
 ):
-    """Registra check-in e emite certificado automaticamente"""
-    inscr = db.query(Inscricao).filter(Inscricao.id == inscricao_id).first()
-    if not inscr:
-        raise HTTPException(status_code=404, detail="Inscrição não encontrada")
-    
-    existente = db.query(Checkin).filter(
-        Checkin.inscricao_id == inscricao_id,
-        Checkin.ingresso_id == ingresso_id
-    ).first()
-    
-    if existente:
-        raise HTTPException(status_code=400, detail="Check-in já registrado para este ingresso")
-    
+    """
+    Registra check-in e emite certificado automaticamente.
+    Idempotente: se a inscrição já tem check-in, retorna o existente
+    com ja_registrado=True (HTTP 200) em vez de erro.
+    """
     try:
-        check = Checkin(
-            inscricao_id=inscricao_id,
-            ingresso_id=ingresso_id,
-            usuario_id=usuario_id,
-            ocorrido_em=datetime.datetime.utcnow()
-        )
-        db.add(check)
-        inscr.sincronizado = False
+        check = inserir_checkin(db, inscricao_id, ingresso_id, usuario_id)
         db.commit()
-        
-        # Emitir certificado automaticamente
-        certificado = await emitir_certificado_automatico(inscricao_id)
-        
-        # Enviar email
-        try:
-            evento = db.query(Evento).filter(Evento.id == inscr.evento_id).first()
-            usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
-            
-            if usuario and evento and usuario.email and "@" in usuario.email:
-                enviar_email_sync(
-                    to=usuario.email,
-                    template="checkin",
-                    data={"nome": usuario.nome, "evento": evento.titulo}
-                )
-        except Exception as e:
-            logger.warning(f"Erro ao enviar email: {e}")
-        
+    except HTTPException:
+        raise
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro ao registrar check-in: {e}")
+
+    if not check.criado:
+        response.status_code = status.HTTP_200_OK
+        return {
+            "id": str(check.id),
+            "ocorrido_em": check.ocorrido_em,
+            "ja_registrado": True,
+            "certificado_emitido": False,
+            "message": "Check-in já registrado para esta inscrição"
+        }
+
+    # Emitir certificado automaticamente
+    certificado = await emitir_certificado_automatico(inscricao_id)
+    
+    # Enviar email
+    try:
+        evento = db.query(Evento).join(Inscricao, Inscricao.evento_id == Evento.id).filter(Inscricao.id == inscricao_id).first()
+        usuario = db.query(Usuario).filter(Usuario.id == usuario_id).first()
+        
+        if usuario and evento and usuario.email and "@" in usuario.email:
+            enviar_email_sync(
+                to=usuario.email,
+                template="checkin",
+                data={"nome": usuario.nome, "evento": evento.titulo}
+            )
+    except Exception as e:
+        logger.warning(f"Erro ao enviar email: {e}")
     
     return {
         "id": str(check.id),
         "ocorrido_em": check.ocorrido_em,
+        "ja_registrado": False,
         "certificado_emitido": certificado is not None,
         "message": "Check-in registrado com sucesso"
     }
 
 
+def resolver_token_ingresso(db: Session, token_qr: str, evento_id: UUID) -> UUID:
+    """
+    ID do ingresso a partir do token QR, nos dois formatos: o assinado tem a
+    assinatura verificada e é buscado pelo id; o hash é buscado pelo token.
+    
+    Como no scan, o token precisa ser o atual do ingresso (um ingresso
+    reemitido tem token novo e o antigo, mesmo com assinatura válida, deixa
+    de ser aceito) e o ingresso não pode estar cancelado.
+    """
+    if token_assinado(token_qr):
+        try:
+            token = verificar_token_assinado(token_qr)
+        except TokenIngressoExpirado:
+            raise HTTPException(status_code=400, detail="Ingresso expirado")
+        except TokenIngressoInvalido:
+            raise HTTPException(status_code=404, detail="Ingresso inválido ou não encontrado")
+        filtros = (Ingresso.id == token.ingresso_id, Ingresso.token_qr == token_qr)
+    else:
+        filtros = (Ingresso.token_qr == token_qr,)
+    
+    ingresso = db.query(Ingresso.id, Ingresso.evento_id, Ingresso.status).filter(*filtros).first()
+    if not ingresso:
+        raise HTTPException(status_code=404, detail="Ingresso inválido ou não encontrado")
+    if ingresso.evento_id != evento_id:
+        raise HTTPException(status_code=400, detail="Ingresso não pertence a este evento")
+    if ingresso.status == "cancelado":
+        raise HTTPException(status_code=400, detail="Ingresso cancelado")
+    return ingresso.id
+
+
 @app.post("/rapido", status_code=status.HTTP_201_CREATED)
 async def checkin_rapido(
     evento_id: UUID,
     nome: str,
     cpf: str,
     email: str,
+    response: Response,
     ingresso_id: UUID | None = None,
+    token_qr: str | None = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_jwt_and_service_key("checkins", "atendente", "administrador"))
 ):
-    """Check-in rápido com emissão automática de certificado"""
+    """
+    Check-in rápido com emissão automática de certificado.
+    Idempotente: se a inscrição já tem check-in, retorna o existente
+    com ja_registrado=True (HTTP 200).
+    
+    O ingresso pode ser informado pelo id ou pelo token QR lido
+    (hash ou assinado).
+    
+    Usuários novos são criados sem senha (nada de bcrypt na portaria). O
+    link de cadastro da senha vai só no email da própria conta, nunca na
+    resposta: quem faz o check-in não pode definir a senha de outra pessoa.
+    """
     evento = db.query(Evento).filter(Evento.id == evento_id).first()
     if not evento:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
     
+    if token_qr:
+        ingresso_id = resolver_token_ingresso(db, token_qr, evento_id)
+    
     try:
         user = db.query(Usuario).filter(Usuario.email == email).first()
-        senha_temp = None
         
         if not user:
-            senha_temp = "temp_" + secrets.token_hex(4)
-            user = Usuario(
-                nome=nome, email=email, cpf=cpf,
-                senha_hash=pwd.hash(senha_temp), papel="rapido"
-            )
+            # Sem senha: o participante a define depois com o token de cadastro
+            user = Usuario(nome=nome, email=email, cpf=cpf, senha_hash=None, papel="rapido")
             db.add(user)
             db.flush()
         
+        token_cadastro = gerar_token_cadastro(user.id) if user.papel == "rapido" else None
+        
         inscr = db.query(Inscricao).filter(
             Inscricao.evento_id == evento_id,
             Inscricao.usuario_id == user.id
@@ -161,36 +279,23 @@ async def checkin_rapido(
             ingresso = db.query(Ingresso).filter(Ingresso.inscricao_id == inscr.id).first()
             
             if not ingresso:
-                codigo = f"ING-{uuid4().hex[:8].upper()}"
-                token_qr = hashlib.sha256(f"{codigo}-{inscr.id}".encode()).hexdigest()
-                ingresso = Ingresso(
-                    inscricao_id=inscr.id, evento_id=evento_id, codigo_ingresso=codigo,
-                    token_qr=token_qr, status="emitido", emitido_em=datetime.datetime.utcnow()
-                )
+                ingresso = Ingresso(**dados_novo_ingresso(inscr.id, evento_id, evento.fim_em))
                 db.add(ingresso)
                 db.flush()
             ingresso_id = ingresso.id
         
-        check_existente = db.query(Checkin).filter(Checkin.inscricao_id == inscr.id).first()
-        if check_existente:
-            raise HTTPException(status_code=400, detail="Check-in já foi realizado")
-        
-        check = Checkin(
-            inscricao_id=inscr.id, ingresso_id=ingresso_id,
-            usuario_id=user.id, ocorrido_em=datetime.datetime.utcnow()
-        )
-        db.add(check)
+        check = inserir_checkin(db, inscr.id, ingresso_id, user.id)
         db.commit()
         
-        # Emitir certificado automaticamente
-        certificado = await emitir_certificado_automatico(inscr.id)
+        # Emitir certificado automaticamente (apenas para check-in novo)
+        certificado = await emitir_certificado_automatico(inscr.id) if check.criado else None
         
         # Enviar email
         try:
-            if email and "@" in email:
+            if check.criado and user.email and "@" in user.email:
                 enviar_email_sync(
-                    to=email, template="checkin",
-                    data={"nome": nome, "evento": evento.titulo}
+                    to=user.email, template="checkin",
+                    data={"nome": nome, "evento": evento.titulo, "token_cadastro": token_cadastro}
                 )
         except Exception as e:
             logger.warning(f"Erro ao enviar email: {e}")
@@ -201,17 +306,804 @@ async def checkin_rapido(
         db.rollback()
         raise HTTPException(status_code=500, detail=f"Erro: {e}")
     
+    if not check.criado:
+        response.status_code = status.HTTP_200_OK
+    
     return {
         "inscricao_id": str(inscr.id),
         "checkin_id": str(check.id),
         "usuario_id": str(user.id),
         "usuario_email": user.email,
-        "senha_temporaria": senha_temp,
+        "ja_registrado": not check.criado,
         "certificado_emitido": certificado is not None,
-        "message": "Check-in rápido realizado com sucesso"
+        "message": "Check-in rápido realizado com sucesso" if check.criado else "Check-in já foi realizado"
+    }
+
+
+LOTE_MAX_ITENS = int(os.getenv("CHECKIN_LOTE_MAX_ITENS", "2000"))
+
+
+def _validar_item_lote(item: schemas.CheckinLoteItem) -> str | None:
+    """Retorna a mensagem de erro do item, ou None se for válido"""
+    if item.tipo == "normal":
+        if not item.inscricao_id:
+            return "inscricao_id é obrigatório para check-in normal"
+        return None
+    
+    if not item.evento_id:
+        return "evento_id é obrigatório para check-in rápido"
+    if not item.nome or not item.nome.strip():
+        return "nome é obrigatório para check-in rápido"
+    if not item.email or "@" not in item.email:
+        return "email inválido para check-in rápido"
+    return None
+
+
+def _preparar_rapidos(db: Session, itens: dict[int, schemas.CheckinLoteItem], resultados: dict) -> dict[int, dict]:
+    """
+    Resolve usuário, inscrição e ingresso dos check-ins rápidos do lote
+    com consultas e inserts em conjunto (uma ida ao banco por etapa).
+    
+    Retorna {indice: linha_do_checkin}. Itens com problema são gravados
+    diretamente em `resultados`.
+    """
+    if not itens:
+        return {}
+    
+    # 1. Eventos e ingressos informados
+    eventos_ids = {item.evento_id for item in itens.values()}
+    eventos_existentes = {
+        e.id: e.fim_em for e in db.query(Evento.id, Evento.fim_em).filter(Evento.id.in_(eventos_ids)).all()
+    }
+    # Ingressos informados: precisam existir e ser do evento do item
+    ingressos_ids = {item.ingresso_id for item in itens.values() if item.ingresso_id}
+    eventos_dos_ingressos = dict(
+        db.query(Ingresso.id, Ingresso.evento_id).filter(Ingresso.id.in_(ingressos_ids)).all()
+    ) if ingressos_ids else {}
+    
+    for indice, item in list(itens.items()):
+        if item.evento_id not in eventos_existentes:
+            resultados[indice] = {"status": "nao_encontrado", "detalhe": "Evento não encontrado"}
+            del itens[indice]
+        elif item.ingresso_id and item.ingresso_id not in eventos_dos_ingressos:
+            resultados[indice] = {"status": "nao_encontrado", "detalhe": "Ingresso não encontrado"}
+            del itens[indice]
+        elif item.ingresso_id and eventos_dos_ingressos[item.ingresso_id] != item.evento_id:
+            resultados[indice] = {"status": "invalido", "detalhe": "Ingresso não pertence ao evento"}
+            del itens[indice]
+    
+    if not itens:
+        return {}
+    
+    # 2. Usuários: reaproveita pelo email, cria os que faltam
+    emails = {item.email for item in itens.values()}
+    usuarios = {
+        u.email: u.id for u in db.query(Usuario.id, Usuario.email).filter(Usuario.email.in_(emails)).all()
+    }
+    
+    novos_usuarios = {}
+    for item in itens.values():
+        if item.email not in usuarios and item.email not in novos_usuarios:
+            novos_usuarios[item.email] = {
+                "id": uuid4(),
+                "nome": item.nome.strip(),
+                "email": item.email,
+                "cpf": item.cpf or None,
+                "senha_hash": None,  # usuário rápido não faz login (ver token de cadastro)
+                "papel": "rapido",
+                "email_verificado": False
+            }
+    
+    if novos_usuarios:
+        # DO NOTHING cobre email/CPF já usados por outra requisição ou usuário
+        criados = db.execute(
+            insert(Usuario)
+            .values(list(novos_usuarios.values()))
+            .on_conflict_do_nothing()
+            .returning(Usuario.id, Usuario.email)
+        ).all()
+        usuarios.update({u.email: u.id for u in criados})
+        
+        faltantes = set(novos_usuarios) - set(usuarios)
+        if faltantes:
+            usuarios.update({
+                u.email: u.id
+                for u in db.query(Usuario.id, Usuario.email).filter(Usuario.email.in_(faltantes)).all()
+            })
+    
+    for indice, item in list(itens.items()):
+        if item.email not in usuarios:
+            resultados[indice] = {"status": "invalido", "detalhe": "CPF já cadastrado para outro usuário"}
+            del itens[indice]
+    
+    if not itens:
+        return {}
+    
+    # 3. Inscrições (evento, usuário)
+    pares = {(item.evento_id, usuarios[item.email]) for item in itens.values()}
+    inscricoes = {
+        (i.evento_id, i.usuario_id): i.id
+        for i in db.query(Inscricao.id, Inscricao.evento_id, Inscricao.usuario_id)
+        .filter(tuple_(Inscricao.evento_id, Inscricao.usuario_id).in_(pares))
+        .all()
+    }
+    
+    novas_inscricoes = {}
+    for item in itens.values():
+        par = (item.evento_id, usuarios[item.email])
+        if par not in inscricoes and par not in novas_inscricoes:
+            novas_inscricoes[par] = {
+                "id": uuid4(),
+                "evento_id": item.evento_id,
+                "usuario_id": par[1],
+                "inscricao_rapida": True,
+                "nome_rapido": item.nome.strip(),
+                "cpf_rapido": item.cpf,
+                "email_rapido": item.email,
+                "status": "ativa",
+                "sincronizado": False
+            }
+    
+    if novas_inscricoes:
+        db.execute(insert(Inscricao).values(list(novas_inscricoes.values())))
+        inscricoes.update({par: dados["id"] for par, dados in novas_inscricoes.items()})
+    
+    # 4. Ingressos: cria os que faltam e busca todos de uma vez
+    inscricao_evento = {inscricoes[par]: par[0] for par in pares}
+    sem_ingresso_informado = {
+        inscricoes[(item.evento_id, usuarios[item.email])]
+        for item in itens.values() if not item.ingresso_id
+    }
+    
+    ingressos = {}
+    if sem_ingresso_informado:
+        db.execute(
+            insert(Ingresso)
+            .values([
+                dados_novo_ingresso(i, inscricao_evento[i], eventos_existentes[inscricao_evento[i]])
+                for i in sem_ingresso_informado
+            ])
+            .on_conflict_do_nothing(index_elements=[Ingresso.inscricao_id])
+        )
+        ingressos = {
+            i.inscricao_id: i.id
+            for i in db.query(Ingresso.id, Ingresso.inscricao_id)
+            .filter(Ingresso.inscricao_id.in_(sem_ingresso_informado))
+            .all()
+        }
+    
+    linhas = {}
+    for indice, item in itens.items():
+        usuario_id = usuarios[item.email]
+        inscricao_id = inscricoes[(item.evento_id, usuario_id)]
+        linhas[indice] = {
+            "inscricao_id": inscricao_id,
+            "ingresso_id": item.ingresso_id or ingressos.get(inscricao_id),
+            "usuario_id": usuario_id,
+            "email": item.email,
+            "nome": item.nome.strip()
+        }
+    return linhas
+
+
+def _preparar_normais(db: Session, itens: dict[int, schemas.CheckinLoteItem], resultados: dict) -> dict[int, dict]:
+    """
+    Confere em conjunto se inscrições, ingressos e usuários informados existem.
+    Retorna {indice: linha_do_checkin} apenas dos itens válidos.
+    """
+    if not itens:
+        return {}
+    
+    inscricoes_ids = {item.inscricao_id for item in itens.values()}
+    ingressos_ids = {item.ingresso_id for item in itens.values() if item.ingresso_id}
+    usuarios_ids = {item.usuario_id for item in itens.values() if item.usuario_id}
+    
+    inscricoes = {i.id for i in db.query(Inscricao.id).filter(Inscricao.id.in_(inscricoes_ids)).all()}
+    ingressos = {
+        i.id for i in db.query(Ingresso.id).filter(Ingresso.id.in_(ingressos_ids)).all()
+    } if ingressos_ids else set()
+    usuarios = {
+        u.id: (u.email, u.nome)
+        for u in db.query(Usuario.id, Usuario.email, Usuario.nome).filter(Usuario.id.in_(usuarios_ids)).all()
+    } if usuarios_ids else {}
+    
+    linhas = {}
+    for indice, item in itens.items():
+        if item.inscricao_id not in inscricoes:
+            resultados[indice] = {"status": "nao_encontrado", "detalhe": "Inscrição não encontrada"}
+        elif item.ingresso_id and item.ingresso_id not in ingressos:
+            resultados[indice] = {"status": "nao_encontrado", "detalhe": "Ingresso não encontrado"}
+        elif item.usuario_id and item.usuario_id not in usuarios:
+            resultados[indice] = {"status": "nao_encontrado", "detalhe": "Usuário não encontrado"}
+        else:
+            email, nome = usuarios.get(item.usuario_id, (None, None))
+            linhas[indice] = {
+                "inscricao_id": item.inscricao_id,
+                "ingresso_id": item.ingresso_id,
+                "usuario_id": item.usuario_id,
+                "email": email,
+                "nome": nome
+            }
+    return linhas
+
+
+async def _emitir_certificados_lote(inscricoes_ids: list[UUID]):
+    """Emite os certificados dos check-ins criados no lote (após a resposta)"""
+    for inscricao_id in inscricoes_ids:
+        await emitir_certificado_automatico(inscricao_id)
+
+
+def _enviar_emails_lote(destinatarios: list[tuple[str, str, str]]):
+    """Envia os emails de check-in do lote (após a resposta)"""
+    for email, nome, evento in destinatarios:
+        try:
+            enviar_email_sync(to=email, template="checkin", data={"nome": nome, "evento": evento})
+        except Exception as e:
+            logger.warning(f"Erro ao enviar email: {e}")
+
+
+@app.post("/batch", response_model=schemas.CheckinLoteOut)
+def registrar_checkins_lote(
+    itens: list[schemas.CheckinLoteItem],
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("checkins", "atendente", "administrador"))
+):
+    """
+    Registra vários check-ins (normais e rápidos) em uma única transação.
+    Usado pelo app de portaria para esvaziar a fila offline em uma só requisição.
+    
+    Cada item recebe um resultado: criado, ja_registrado, nao_encontrado ou invalido.
+    Certificados e emails dos check-ins criados são processados após a resposta.
+    
+    REQUER: API Key + JWT + Role (atendente OU administrador)
+    """
+    if len(itens) > LOTE_MAX_ITENS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Lote muito grande: máximo de {LOTE_MAX_ITENS} itens por requisição"
+        )
+    
+    resultados: dict[int, dict] = {}
+    normais, rapidos = {}, {}
+    
+    for indice, item in enumerate(itens):
+        erro = _validar_item_lote(item)
+        if erro:
+            resultados[indice] = {"status": "invalido", "detalhe": erro}
+        elif item.tipo == "normal":
+            normais[indice] = item
+        else:
+            if item.cpf is not None:
+                item.cpf = item.cpf.strip() or None
+            rapidos[indice] = item
+    
+    try:
+        linhas = _preparar_normais(db, normais, resultados)
+        linhas.update(_preparar_rapidos(db, rapidos, resultados))
+        
+        # Um check-in por inscrição: repetições dentro do lote viram ja_registrado
+        primeiro_por_inscricao = {}
+        for indice in sorted(linhas):
+            primeiro_por_inscricao.setdefault(linhas[indice]["inscricao_id"], indice)
+        
+        agora = datetime.datetime.utcnow()
+        criados = {}
+        if primeiro_por_inscricao:
+            criados = {
+                c.inscricao_id: c.id
+                for c in db.execute(
+                    insert(Checkin)
+                    .values([
+                        {
+                            "id": uuid4(),
+                            "inscricao_id": linhas[indice]["inscricao_id"],
+                            "ingresso_id": linhas[indice]["ingresso_id"],
+                            "usuario_id": linhas[indice]["usuario_id"],
+                            "ocorrido_em": agora
+                        }
+                        for indice in primeiro_por_inscricao.values()
+                    ])
+                    .on_conflict_do_nothing(index_elements=[Checkin.inscricao_id])
+                    .returning(Checkin.id, Checkin.inscricao_id)
+                ).all()
+            }
+        
+        if criados:
+            db.query(Inscricao).filter(Inscricao.id.in_(criados)).update(
+                {Inscricao.sincronizado: False}, synchronize_session=False
+            )
+        
+        ja_existentes = set(primeiro_por_inscricao) - set(criados)
+        existentes = {
+            c.inscricao_id: c.id
+            for c in db.query(Checkin.id, Checkin.inscricao_id).filter(Checkin.inscricao_id.in_(ja_existentes)).all()
+        } if ja_existentes else {}
+        
+        db.commit()
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao registrar check-ins em lote: {e}")
+    
+    for indice, linha in linhas.items():
+        inscricao_id = linha["inscricao_id"]
+        if primeiro_por_inscricao[inscricao_id] == indice and inscricao_id in criados:
+            resultados[indice] = {"status": "criado", "inscricao_id": inscricao_id, "checkin_id": criados[inscricao_id]}
+        else:
+            resultados[indice] = {
+                "status": "ja_registrado",
+                "inscricao_id": inscricao_id,
+                "checkin_id": criados.get(inscricao_id) or existentes.get(inscricao_id)
+            }
+    
+    if criados:
+        background_tasks.add_task(_emitir_certificados_lote, list(criados))
+        
+        eventos = dict(
+            db.query(Inscricao.id, Evento.titulo)
+            .join(Evento, Evento.id == Inscricao.evento_id)
+            .filter(Inscricao.id.in_(criados))
+            .all()
+        )
+        destinatarios = [
+            (linha["email"], linha["nome"], eventos.get(linha["inscricao_id"]))
+            for indice, linha in linhas.items()
+            if resultados[indice]["status"] == "criado" and linha["email"] and "@" in linha["email"]
+        ]
+        if destinatarios:
+            background_tasks.add_task(_enviar_emails_lote, destinatarios)
+    
+    contagem = {"criado": 0, "ja_registrado": 0, "nao_encontrado": 0, "invalido": 0}
+    for r in resultados.values():
+        contagem[r["status"]] += 1
+    
+    return {
+        "total": len(itens),
+        "criados": contagem["criado"],
+        "ja_registrados": contagem["ja_registrado"],
+        "nao_encontrados": contagem["nao_encontrado"],
+        "invalidos": contagem["invalido"],
+        "resultados": [{"indice": i, **resultados[i]} for i in range(len(itens))]
+    }
+
+
+# SCAN NA PORTARIA
+
+# Um único comando por etapa, na mesma transação:
+# 1. UPDATE condicional (emitido -> usado) com RETURNING dos dados da tela;
+#    em leituras simultâneas, só uma encontra status = 'emitido'
+# 2. inserir_checkin (INSERT ... ON CONFLICT)
+# {filtro}: por id (token assinado, já verificado) ou por token_qr (hash).
+# O assinado também confere o token_qr: um ingresso reemitido tem token novo
+# e o antigo, mesmo com assinatura válida, deixa de ser aceito.
+_SQL_SCAN_USAR = """
+    UPDATE ingressos g
+    SET status = 'usado'
+    FROM inscricoes i
+    JOIN eventos e ON e.id = i.evento_id
+    LEFT JOIN usuarios u ON u.id = i.usuario_id
+    WHERE {filtro}
+      AND i.id = g.inscricao_id
+      AND g.status = 'emitido'
+      AND i.status IN ({ativos})
+      AND (CAST(:evento_id AS uuid) IS NULL OR g.evento_id = :evento_id)
+    RETURNING g.id AS ingresso_id, g.codigo_ingresso, g.status, g.inscricao_id, g.evento_id,
+              e.titulo AS evento_titulo, i.usuario_id, i.status AS inscricao_status,
+              CASE WHEN i.inscricao_rapida THEN i.nome_rapido ELSE u.nome END AS nome,
+              CASE WHEN i.inscricao_rapida THEN i.email_rapido ELSE u.email END AS email
+"""
+
+# Leitura usada quando o UPDATE não afeta linha nenhuma, para explicar o motivo
+_SQL_SCAN_SITUACAO = """
+    SELECT g.id AS ingresso_id, g.codigo_ingresso, g.status, g.inscricao_id, g.evento_id,
+           e.titulo AS evento_titulo, i.usuario_id, i.status AS inscricao_status,
+           CASE WHEN i.inscricao_rapida THEN i.nome_rapido ELSE u.nome END AS nome,
+           CASE WHEN i.inscricao_rapida THEN i.email_rapido ELSE u.email END AS email,
+           c.id AS checkin_id, c.ocorrido_em AS checkin_em
+    FROM ingressos g
+    JOIN inscricoes i ON i.id = g.inscricao_id
+    JOIN eventos e ON e.id = i.evento_id
+    LEFT JOIN usuarios u ON u.id = i.usuario_id
+    LEFT JOIN checkins c ON c.inscricao_id = g.inscricao_id
+    WHERE {filtro}
+"""
+
+_ATIVOS_SQL = ", ".join(f"'{s}'" for s in INSCRICAO_ATIVOS)
+
+SQL_SCAN_USAR_POR_ID = text(_SQL_SCAN_USAR.format(
+    filtro="g.id = :ingresso_id AND g.token_qr = :token_qr", ativos=_ATIVOS_SQL
+))
+SQL_SCAN_USAR_POR_TOKEN = text(_SQL_SCAN_USAR.format(filtro="g.token_qr = :token_qr", ativos=_ATIVOS_SQL))
+SQL_SCAN_SITUACAO_POR_ID = text(_SQL_SCAN_SITUACAO.format(filtro="g.id = :ingresso_id AND g.token_qr = :token_qr"))
+SQL_SCAN_SITUACAO_POR_TOKEN = text(_SQL_SCAN_SITUACAO.format(filtro="g.token_qr = :token_qr"))
+
+
+class ResultadoScan(NamedTuple):
+    # liberado | ja_utilizado | invalido | expirado | cancelado | inscricao_cancelada | outro_evento
+    resultado: str
+    linha: Any = None
+    checkin_id: UUID | None = None
+    checkin_em: datetime.datetime | None = None
+
+
+# Resultados de recusa -> (status HTTP, mensagem)
+_RECUSAS_SCAN = {
+    "invalido": (404, "Ingresso inválido ou não encontrado"),
+    "expirado": (400, "Ingresso expirado"),
+    "cancelado": (400, "Ingresso cancelado"),
+    "inscricao_cancelada": (400, "Inscrição cancelada"),
+    "outro_evento": (400, "Ingresso não pertence a este evento"),
+}
+
+
+def executar_scan(db: Session, token_qr: str, evento_id: UUID | None) -> ResultadoScan:
+    """
+    Valida o ingresso, marca como usado e registra o check-in (ver SQL acima).
+    Faz commit quando libera a entrada e rollback nos demais casos.
+    """
+    if token_assinado(token_qr):
+        try:
+            token = verificar_token_assinado(token_qr)
+        except TokenIngressoExpirado:
+            return ResultadoScan("expirado")
+        except TokenIngressoInvalido:
+            return ResultadoScan("invalido")
+        sql_usar, sql_situacao = SQL_SCAN_USAR_POR_ID, SQL_SCAN_SITUACAO_POR_ID
+        params = {"ingresso_id": token.ingresso_id, "token_qr": token_qr}
+    else:
+        sql_usar, sql_situacao = SQL_SCAN_USAR_POR_TOKEN, SQL_SCAN_SITUACAO_POR_TOKEN
+        params = {"token_qr": token_qr}
+    
+    usado = db.execute(sql_usar, {**params, "evento_id": evento_id}).first()
+    
+    if usado:
+        check = inserir_checkin(db, usado.inscricao_id, usado.ingresso_id, usado.usuario_id)
+        db.commit()
+        # criado=False: check-in feito antes por outro caminho (ex.: manual, sem ingresso)
+        return ResultadoScan("liberado" if check.criado else "ja_utilizado", usado, check.id, check.ocorrido_em)
+    
+    situacao = db.execute(sql_situacao, params).first()
+    db.rollback()
+    
+    if not situacao:
+        return ResultadoScan("invalido")
+    if evento_id and situacao.evento_id != evento_id:
+        return ResultadoScan("outro_evento", situacao)
+    if situacao.status == "cancelado":
+        return ResultadoScan("cancelado", situacao)
+    if situacao.inscricao_status not in INSCRICAO_ATIVOS:
+        return ResultadoScan("inscricao_cancelada", situacao)
+    
+    # status == 'usado'
+    return ResultadoScan("ja_utilizado", situacao, situacao.checkin_id, situacao.checkin_em)
+
+
+def _resposta_scan(r: ResultadoScan) -> dict:
+    """Tudo o que a tela da portaria mostra"""
+    liberado = r.resultado == "liberado"
+    return {
+        "liberado": liberado,
+        "ja_registrado": not liberado,
+        "message": "Entrada liberada" if liberado else "Ingresso já foi utilizado",
+        "ingresso_id": str(r.linha.ingresso_id),
+        "codigo_ingresso": r.linha.codigo_ingresso,
+        "inscricao_id": str(r.linha.inscricao_id),
+        "evento_id": str(r.linha.evento_id),
+        "evento_titulo": r.linha.evento_titulo,
+        "participante": {"nome": r.linha.nome, "email": r.linha.email},
+        "checkin_id": str(r.checkin_id) if r.checkin_id else None,
+        "checkin_em": r.checkin_em
+    }
+
+
+@app.post("/scan/{token_qr}", status_code=status.HTTP_201_CREATED)
+def scan_ingresso(
+    token_qr: str,
+    response: Response,
+    background_tasks: BackgroundTasks,
+    evento_id: UUID | None = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("checkins", "atendente", "administrador"))
+):
+    """
+    Leitura do QR na portaria: valida o ingresso, marca como usado e
+    registra o check-in em uma única transação (substitui validar + usar
+    + registrar check-in).
+    
+    A marcação é um UPDATE condicional (status = 'emitido'), então duas
+    leituras simultâneas do mesmo ingresso não liberam duas entradas.
+    Aceita token assinado (verificado sem consulta) ou hash.
+    
+    - 201: entrada liberada (check-in criado)
+    - 200 com ja_registrado=True: ingresso já utilizado (com horário do check-in)
+    - 400: ingresso cancelado/expirado, inscrição cancelada ou de outro evento
+    - 404: ingresso inválido
+    
+    Query params:
+    - evento_id: evento da portaria (recusa ingressos de outros eventos)
+    
+    Certificado e email são enviados após a resposta.
+    """
+    try:
+        r = executar_scan(db, token_qr, evento_id)
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao registrar check-in: {e}")
+    
+    if r.resultado in _RECUSAS_SCAN:
+        status_code, detail = _RECUSAS_SCAN[r.resultado]
+        raise HTTPException(status_code=status_code, detail=detail)
+    
+    if r.resultado == "liberado":
+        background_tasks.add_task(_emitir_certificados_lote, [r.linha.inscricao_id])
+        if r.linha.email and "@" in r.linha.email:
+            background_tasks.add_task(_enviar_emails_lote, [(r.linha.email, r.linha.nome, r.linha.evento_titulo)])
+    else:
+        response.status_code = status.HTTP_200_OK
+    
+    return _resposta_scan(r)
+
+
+# CANAL WEBSOCKET DA PORTARIA
+
+WS_TIMEOUT_AUTENTICACAO = float(os.getenv("CHECKINS_WS_TIMEOUT_AUTH", "10"))
+
+
+def _linhas_roster(db: Session, *filtros) -> list:
+    """Inscrições (id, evento, status, nome, horário do check-in) para os scanners"""
+    return (
+        db.query(
+            Inscricao.id,
+            Inscricao.evento_id,
+            Inscricao.status,
+            case((Inscricao.inscricao_rapida.is_(True), Inscricao.nome_rapido), else_=Usuario.nome).label("nome"),
+            Checkin.ocorrido_em
+        )
+        .outerjoin(Usuario, Usuario.id == Inscricao.usuario_id)
+        .outerjoin(Checkin, Checkin.inscricao_id == Inscricao.id)
+        .filter(*filtros)
+        .all()
+    )
+
+
+def _mensagem_roster(linha) -> dict:
+    return {
+        "t": "upd",
+        "i": str(linha.id),
+        "nome": linha.nome,
+        "st": linha.status,
+        "em": linha.ocorrido_em.isoformat() if linha.ocorrido_em else None
     }
 
 
+class CanalPortaria:
+    """
+    Scanners conectados por evento. Recebem as atualizações do roster:
+    na hora, para check-ins feitos pelo próprio canal, e pelo canal
+    "portaria" do banco (LISTEN/NOTIFY) para alterações feitas por outras
+    instâncias/serviços em eventos no modo portaria.
+    
+    _conexoes é alterado no loop e lido na thread da escuta: todo acesso
+    passa pelo _lock, e quem percorre as conexões usa uma cópia.
+    """
+    
+    def __init__(self):
+        self._conexoes: dict[UUID, set[WebSocket]] = {}
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._escuta = EscutaNotificacoes(CANAL_PORTARIA, self._ao_notificar)
+    
+    def iniciar(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._escuta.iniciar()
+    
+    def parar(self):
+        self._escuta.parar()
+    
+    def registrar(self, evento_id: UUID, ws: WebSocket):
+        with self._lock:
+            self._conexoes.setdefault(evento_id, set()).add(ws)
+    
+    def remover(self, evento_id: UUID, ws: WebSocket):
+        with self._lock:
+            conexoes = self._conexoes.get(evento_id)
+            if conexoes:
+                conexoes.discard(ws)
+                if not conexoes:
+                    del self._conexoes[evento_id]
+    
+    async def publicar(self, evento_id: UUID, mensagem: dict, exceto: WebSocket | None = None):
+        with self._lock:
+            conexoes = list(self._conexoes.get(evento_id, ()))
+        for ws in conexoes:
+            if ws is exceto:
+                continue
+            try:
+                await ws.send_json(mensagem)
+            except Exception:
+                self.remover(evento_id, ws)
+    
+    def _ao_notificar(self, payloads: set[str]):
+        """Roda na thread da escuta: relê as inscrições e publica no loop"""
+        with self._lock:
+            eventos = set(self._conexoes)
+        inscricoes = [UUID(p[2:]) for p in payloads if p.startswith("i:")]
+        if not eventos or not inscricoes or not self._loop:
+            return
+        
+        db = SessionLocal()
+        try:
+            linhas = _linhas_roster(db, Inscricao.id.in_(inscricoes), Inscricao.evento_id.in_(eventos))
+        finally:
+            db.close()
+        
+        for linha in linhas:
+            asyncio.run_coroutine_threadsafe(self.publicar(linha.evento_id, _mensagem_roster(linha)), self._loop)
+
+
+canal_portaria = CanalPortaria()
+_tarefas_ws: set[asyncio.Task] = set()
+
+
+@app.on_event("startup")
+async def iniciar_canal_portaria():
+    canal_portaria.iniciar(asyncio.get_running_loop())
+
+
+@app.on_event("shutdown")
+def parar_canal_portaria():
+    canal_portaria.parar()
+
+
+def _em_segundo_plano(coro):
+    """Agenda uma tarefa sem bloquear o canal (guarda a referência até terminar)"""
+    tarefa = asyncio.create_task(coro)
+    _tarefas_ws.add(tarefa)
+    tarefa.add_done_callback(_tarefas_ws.discard)
+
+
+def _scan_ws(token_qr: str, evento_id: UUID) -> ResultadoScan:
+    db = SessionLocal()
+    try:
+        return executar_scan(db, token_qr, evento_id)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Erro no scan pelo canal da portaria: {e}")
+        return ResultadoScan("erro")
+    finally:
+        db.close()
+
+
+def _roster_evento(evento_id: UUID) -> list:
+    db = SessionLocal()
+    try:
+        linhas = _linhas_roster(db, Inscricao.evento_id == evento_id, Inscricao.status.in_(INSCRICAO_ATIVOS))
+    finally:
+        db.close()
+    return [[str(l.id), l.nome, l.ocorrido_em.isoformat() if l.ocorrido_em else None] for l in linhas]
+
+
+async def _autenticar_ws(ws: WebSocket) -> UUID | None:
+    """
+    Autentica pelos headers do handshake (x-api-key/authorization +
+    ?evento_id=) ou, se ausentes, pela primeira mensagem
+    {"t": "auth", "api_key", "token", "evento_id"}.
+    """
+    api_key = ws.headers.get("x-api-key")
+    authorization = ws.headers.get("authorization")
+    evento_id = ws.query_params.get("evento_id")
+    
+    if not (api_key and authorization):
+        msg = await asyncio.wait_for(ws.receive_json(), WS_TIMEOUT_AUTENTICACAO)
+        if msg.get("t") != "auth":
+            raise HTTPException(status_code=401, detail="Autenticação necessária")
+        api_key = msg.get("api_key", "")
+        authorization = f"Bearer {msg.get('token', '')}"
+        evento_id = msg.get("evento_id")
+    
+    autenticar_jwt_e_service_key("checkins", api_key, authorization, "atendente", "administrador")
+    
+    evento_id = UUID(evento_id)
+    existe = await run_in_threadpool(_evento_existe, evento_id)
+    if not existe:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    return evento_id
+
+
+def _evento_existe(evento_id: UUID) -> bool:
+    db = SessionLocal()
+    try:
+        return db.query(Evento.id).filter(Evento.id == evento_id).first() is not None
+    finally:
+        db.close()
+
+
+@app.websocket("/ws/portaria")
+async def canal_scanner(ws: WebSocket):
+    """
+    Canal persistente dos leitores da portaria: autentica uma vez e depois
+    cada leitura é uma mensagem (sem headers, JWT, API key e auditoria por
+    leitura).
+    
+    Cliente -> servidor:
+    - {"t": "auth", "api_key", "token", "evento_id"}  (se não vier nos headers)
+    - {"t": "scan", "id": <n>, "qr": <token_qr>}
+    - {"t": "roster"}  /  {"t": "ping"}
+    
+    Servidor -> cliente:
+    - {"t": "ok", "evento_id"}  após autenticar
+    - {"t": "r", "id": <n>, "r": <resultado>, "nome", "em"}  resultado do scan
+      (liberado, ja_utilizado, invalido, expirado, cancelado,
+      inscricao_cancelada, outro_evento, erro)
+    - {"t": "roster", "inscritos": [[inscricao_id, nome, checkin_em], ...]}
+    - {"t": "upd", "i", "nome", "st", "em"}  atualização do roster (push)
+    - {"t": "pong"}
+    
+    O scan é o mesmo do POST /scan/{token_qr}.
+    
+    REQUER: API Key + JWT + Role (atendente ou administrador), uma vez
+    """
+    await ws.accept()
+    
+    try:
+        evento_id = await _autenticar_ws(ws)
+    except HTTPException as e:
+        await ws.close(code=4000 + e.status_code, reason=str(e.detail))
+        return
+    except (asyncio.TimeoutError, ValueError, TypeError, KeyError):
+        await ws.close(code=4401, reason="Autenticação inválida")
+        return
+    except WebSocketDisconnect:
+        return
+    
+    canal_portaria.registrar(evento_id, ws)
+    await ws.send_json({"t": "ok", "evento_id": str(evento_id)})
+    
+    try:
+        while True:
+            try:
+                msg = json.loads(await ws.receive_text())
+                tipo = msg.get("t")
+            except (ValueError, AttributeError):
+                await ws.send_json({"t": "erro", "detail": "Mensagem inválida"})
+                continue
+            
+            if tipo == "scan":
+                r = await run_in_threadpool(_scan_ws, str(msg.get("qr", "")), evento_id)
+                await ws.send_json({
+                    "t": "r",
+                    "id": msg.get("id"),
+                    "r": r.resultado,
+                    "nome": r.linha.nome if r.linha else None,
+                    "em": r.checkin_em.isoformat() if r.checkin_em else None
+                })
+                
+                if r.resultado == "liberado":
+                    await canal_portaria.publicar(evento_id, {
+                        "t": "upd", "i": str(r.linha.inscricao_id), "nome": r.linha.nome,
+                        "st": "ativa", "em": r.checkin_em.isoformat()
+                    }, exceto=ws)
+                    _em_segundo_plano(_emitir_certificados_lote([r.linha.inscricao_id]))
+                    if r.linha.email and "@" in r.linha.email:
+                        _em_segundo_plano(run_in_threadpool(
+                            _enviar_emails_lote, [(r.linha.email, r.linha.nome, r.linha.evento_titulo)]
+                        ))
+            
+            elif tipo == "roster":
+                await ws.send_json({"t": "roster", "inscritos": await run_in_threadpool(_roster_evento, evento_id)})
+            
+            elif tipo == "ping":
+                await ws.send_json({"t": "pong"})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        canal_portaria.remover(evento_id, ws)
+
+
 @app.get("/inscricao/{inscricao_id}")
 def verificar_checkin(
     inscricao_id: UUID,
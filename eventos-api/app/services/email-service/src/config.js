@@ -10,4 +10,6 @@ export const config = {
     pass: process.env.SMTP_PASS,
   },
   apiKey: process.env.SERVICE_API_KEY,
+  // Base dos links enviados nos emails (ex.: cadastro de senha)
+  frontendUrl: process.env.FRONTEND_URL || "http://localhost:3000",
 };
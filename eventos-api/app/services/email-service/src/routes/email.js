@@ -13,6 +13,15 @@ router.use((req, res, next) => {
   next();
 });
 
+// Link para o usuário rápido definir a senha (token de cadastro do auth-service)
+const linkCadastro = (to, token) =>
+  `${config.frontendUrl}/cadastrar-senha?email=${encodeURIComponent(to)}&token=${encodeURIComponent(token)}`;
+
+const blocoCadastro = (to, d) =>
+  d.token_cadastro
+    ? `<p>Para acessar sua conta, <a href="${linkCadastro(to, d.token_cadastro)}">cadastre sua senha</a>.</p>`
+    : "";
+
 router.post("/send", async (req, res) => {
   try {
     const { to, subject, template, data } = req.body;
@@ -24,6 +33,7 @@ router.post("/send", async (req, res) => {
       inscricao: (d) => `
         <h1>Inscrição confirmada</h1>
         <p>Olá ${d.nome}, sua inscrição no evento <b>${d.evento}</b> foi confirmada!</p>
+        ${blocoCadastro(to, d)}
       `,
       cancelamento: (d) => `
         <h1>Inscrição cancelada</h1>
@@ -32,6 +42,13 @@ router.post("/send", async (req, res) => {
       checkin: (d) => `
         <h1>Presença registrada</h1>
         <p>Você registrou presença no evento <b>${d.evento}</b>.</p>
+        ${blocoCadastro(to, d)}
+      `,
+      cadastro_rapido: (d) => `
+        <h1>Complete seu cadastro</h1>
+        <p>Olá ${d.nome}, use o link abaixo para cadastrar sua senha:</p>
+        <p><a href="${linkCadastro(to, d.token_cadastro)}">Cadastrar senha</a></p>
+        <p>Se você não pediu este link, ignore este email.</p>
       `,
     };
 
@@ -2,14 +2,20 @@
 Microsserviço de Eventos
 Porta: 8002
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import func, literal, or_
 from sqlalchemy.orm import Session
 from uuid import UUID
+import datetime
+from typing import Optional
 
 from app.shared.core.database import get_db
 from app.shared.models.evento import Evento
 from app.shared import schemas
 from app.shared.middlewares.add import add_common_middlewares
+from app.shared.helpers.json_helper import colunas, resposta_lista, serializador, RespostaJSON
+from app.shared.helpers.versao_helper import cabecalhos_versao, nao_modificado, resposta_304, versao_evento
+from app.shared.helpers.catalogo_helper import CatalogoPublico, escolher_codificacao
 from app.shared.core.security import (
     require_jwt_and_service_key,
     require_service_api_key
@@ -18,8 +24,25 @@ from app.shared.models.inscricao import Inscricao
 from app.shared.models.checkin import Checkin
 from app.shared.models.certificado import Certificado
 
+CAMINHO_CATALOGO = "/eventos/publicos/ativos"
+
 app = FastAPI(title="Eventos Service", version="1.0.0")
-add_common_middlewares(app, audit=True)
+# Catálogo público: uma linha de auditoria por acesso anônimo seria só ruído
+add_common_middlewares(app, audit=True, audit_ignorar=[CAMINHO_CATALOGO])
+
+# Catálogo público pré-renderizado em memória
+catalogo = CatalogoPublico()
+
+
+@app.on_event("startup")
+def iniciar_catalogo():
+    catalogo.iniciar()
+
+
+@app.on_event("shutdown")
+def parar_catalogo():
+    catalogo.parar()
+
 
 @app.get("/eventos", response_model=list[schemas.EventoOut])
 def listar_eventos(
@@ -31,44 +54,130 @@ def listar_eventos(
     
     REQUER: API Key (sem JWT - permite listagem para sistemas externos)
     """
-    return db.query(Evento).order_by(Evento.inicio_em).all()
+    return resposta_lista(
+        schemas.EventoOut,
+        db.query(*colunas(schemas.EventoOut, Evento)).order_by(Evento.inicio_em)
+    )
+
+
+@app.get("/eventos/buscar", response_model=schemas.EventoBuscaPagina)
+def buscar_eventos(
+    q: str = Query(..., min_length=2, max_length=200),
+    de: Optional[datetime.datetime] = None,
+    ate: Optional[datetime.datetime] = None,
+    pagina: int = Query(1, ge=1),
+    tamanho: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("eventos"))
+):
+    """
+    Busca eventos por título e descrição, ordenados por relevância.
+
+    Combina busca textual em português (q aceita a sintaxe de
+    websearch_to_tsquery: "frase exata", -excluir, or) com busca aproximada
+    por trigramas, que tolera erros de digitação e palavras parciais.
+    Acentos não são normalizados: "musica" só acha "música" se a
+    semelhança dos trigramas for suficiente.
+
+    Query params:
+    - de / ate: apenas eventos que acontecem (total ou parcialmente) no período
+    - pagina, tamanho: paginação (tamanho máximo 100)
+
+    REQUER: API Key (sem JWT - permite busca para sistemas externos)
+    """
+    consulta = func.websearch_to_tsquery("portuguese", q)
+    termo = literal(q)
+    relevancia = (
+        func.ts_rank_cd(Evento.busca, consulta) + func.word_similarity(termo, Evento.titulo)
+    ).label("relevancia")
+
+    query = db.query(
+        *colunas(schemas.EventoOut, Evento),
+        relevancia,
+        func.count().over().label("total")
+    ).filter(or_(
+        Evento.busca.op("@@")(consulta),
+        termo.op("<%")(Evento.titulo),
+        termo.op("<%")(Evento.descricao)
+    ))
+    if de is not None:
+        query = query.filter(Evento.fim_em >= de)
+    if ate is not None:
+        query = query.filter(Evento.inicio_em <= ate)
+
+    linhas = (
+        query.order_by(relevancia.desc(), Evento.inicio_em, Evento.id)
+        .limit(tamanho)
+        .offset((pagina - 1) * tamanho)
+        .all()
+    )
+
+    if linhas:
+        total = linhas[0].total
+    elif pagina > 1:
+        # Página além do fim: o total vem de uma contagem à parte
+        total = query.with_entities(func.count()).scalar()
+    else:
+        total = 0
+
+    return {
+        "total": total,
+        "pagina": pagina,
+        "tamanho": tamanho,
+        "resultados": [
+            {**serializador(schemas.EventoOut)(linha), "relevancia": linha.relevancia}
+            for linha in linhas
+        ]
+    }
 
 
 @app.get("/eventos/{evento_id}", response_model=schemas.EventoOut)
 def obter_evento(
     evento_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     api_key: None = Depends(require_service_api_key("eventos"))
 ):
     """
     Obtém detalhes de um evento específico pelo ID.
+    Envia ETag/Last-Modified; If-None-Match/If-Modified-Since atual devolve 304.
     
     REQUER: API Key (sem JWT - permite consulta para sistemas externos)
     """
-    e = db.query(Evento).filter(Evento.id == evento_id).first()
+    v = versao_evento(db, evento_id)
+    if v is None:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    cabecalhos = cabecalhos_versao(v)
+    if nao_modificado(request, v):
+        return resposta_304(cabecalhos)
+
+    e = db.query(*colunas(schemas.EventoOut, Evento)).filter(Evento.id == evento_id).first()
     if not e:
         raise HTTPException(status_code=404, detail="Evento não encontrado")
-    return e
+    return RespostaJSON(serializador(schemas.EventoOut)(e), headers=cabecalhos)
 
 
-@app.get("/eventos/publicos/ativos", response_model=list[schemas.EventoOut])
-def listar_eventos_publicos(db: Session = Depends(get_db)):
+@app.get(CAMINHO_CATALOGO, response_model=list[schemas.EventoOut])
+def listar_eventos_publicos(request: Request):
     """
     Lista eventos públicos e ativos (sem necessidade de autenticação).
     Endpoint PÚBLICO para páginas de divulgação.
+
+    Servido do catálogo pré-renderizado em memória (gzip/brotli conforme
+    Accept-Encoding), sem consultar o banco. Envia ETag/Last-Modified;
+    If-None-Match/If-Modified-Since atual devolve 304.
     
     REQUER: Nada (público para divulgação)
     """
-    from datetime import datetime
-    
-    # Retorna apenas eventos que ainda não acabaram
-    agora = datetime.utcnow()
-    return (
-        db.query(Evento)
-        .filter(Evento.fim_em >= agora)
-        .order_by(Evento.inicio_em)
-        .all()
-    )
+    snapshot = catalogo.atual()
+    cabecalhos = {**cabecalhos_versao(snapshot.versao, privado=False), "Vary": "Accept-Encoding"}
+    if nao_modificado(request, snapshot.versao):
+        return resposta_304(cabecalhos)
+
+    codificacao = escolher_codificacao(request.headers.get("accept-encoding", ""), snapshot.corpos)
+    if codificacao != "identity":
+        cabecalhos["Content-Encoding"] = codificacao
+    return Response(snapshot.corpos[codificacao], media_type="application/json", headers=cabecalhos)
 
 
 @app.get("/eventos/{evento_id}/estatisticas")
@@ -2,54 +2,123 @@
 Microsserviço de Ingressos
 Porta: 8005
 """
-from fastapi import FastAPI, Depends, HTTPException, status
+from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import exists, func
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
-from uuid import UUID, uuid4
-from typing import List
+from uuid import UUID
+from typing import Iterator, List, Literal, Optional
+import base64
 import datetime
-import hashlib
+import logging
+import os
 
-from app.shared.core.database import get_db
+from app.shared.core.database import get_db, SessionLocal
 from app.shared.models.ingresso import Ingresso
 from app.shared.models.inscricao import Inscricao
 from app.shared.models.evento import Evento
+from app.shared.models.checkin import Checkin
+from app.shared.models.ingresso_revogado import IngressoRevogado
 from app.shared.schemas import IngressoSchema
 from app.shared.middlewares.add import add_common_middlewares
+from app.shared.helpers.ingresso_helper import (
+    TokenIngressoExpirado,
+    TokenIngressoInvalido,
+    chave_evento,
+    codigo_ingresso_valido,
+    dados_novo_ingresso,
+    expiracao_token,
+    gerar_codigo_ingresso,
+    gerar_token_assinado,
+    gerar_token_qr,
+    ler_token_assinado,
+    normalizar_codigo_ingresso,
+    token_assinado,
+    verificar_token_assinado
+)
+from app.shared.helpers.portaria_helper import IndicePortaria
+from app.shared.helpers.transicao_helper import (
+    INGRESSO_CANCELAR,
+    INGRESSO_REEMITIR,
+    INGRESSO_USAR,
+    INSCRICAO_ATIVOS,
+    transicionar
+)
+from app.shared.helpers.cache_helper import AUSENTE, CacheTTL
+from app.shared.helpers.qr_helper import (
+    MEDIA_TYPES,
+    etag_qr,
+    get_qr_executor,
+    renderizar_qr,
+    renderizar_qr_png,
+    renderizar_qr_svg
+)
+from app.shared.helpers.zip_stream_helper import stream_zip
+from app.shared.helpers.json_helper import colunas, resposta_lista
+from app.shared.helpers.versao_helper import cabecalhos_versao, nao_modificado, resposta_304, versao_recurso_evento
+from app.shared.helpers.tarefa_helper import TarefasPorChave
 from app.shared.core.security import (
     require_jwt_and_service_key,
     require_service_api_key
 )
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(title="Ingressos Service", version="1.0.0")
 add_common_middlewares(app, audit=True)
 
+# Índice em memória dos ingressos de eventos em modo portaria
+indice_portaria = IndicePortaria()
+
+
+@app.on_event("startup")
+def iniciar_indice_portaria():
+    indice_portaria.iniciar()
+
+
+@app.on_event("shutdown")
+def parar_indice_portaria():
+    indice_portaria.parar()
+
 
 @app.get("/evento/{evento_id}", response_model=List[IngressoSchema])
 def listar_ingressos_por_evento(
     evento_id: UUID,
+    request: Request,
     db: Session = Depends(get_db),
     api_key: None = Depends(require_service_api_key("ingressos"))
 ):
     """
     Lista todos os ingressos de um evento específico.
     Útil para relatórios e gestão de ingressos.
+    Envia ETag; If-None-Match atual devolve 304.
     
     REQUER: API Key (sem JWT - permite consulta para sistemas de gestão)
     """
-    ingressos = db.query(Ingresso).filter(Ingresso.evento_id == evento_id).all()
+    sem_ingressos = HTTPException(
+        status_code=404,
+        detail="Nenhum ingresso encontrado para este evento"
+    )
+    v = versao_recurso_evento(db, evento_id, "ingressos")
+    if v is None:
+        raise sem_ingressos
+    cabecalhos = cabecalhos_versao(v)
+    if nao_modificado(request, v):
+        return resposta_304(cabecalhos)
+
+    ingressos = db.query(*colunas(IngressoSchema, Ingresso)).filter(Ingresso.evento_id == evento_id).all()
     
     if not ingressos:
-        raise HTTPException(
-            status_code=404,
-            detail="Nenhum ingresso encontrado para este evento"
-        )
+        raise sem_ingressos
     
-    return ingressos
+    return resposta_lista(IngressoSchema, ingressos, headers=cabecalhos)
 
 
 @app.post("/inscricao/{inscricao_id}", response_model=IngressoSchema, status_code=status.HTTP_201_CREATED)
 def criar_ingresso(
     inscricao_id: UUID,
+    assinado: Optional[bool] = None,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
 ):
@@ -57,7 +126,9 @@ def criar_ingresso(
     Cria um ingresso para uma inscrição existente.
     Gera automaticamente:
     - Código único do ingresso (formato: ING-XXXXXXXX)
-    - Token QR para validação (hash SHA256)
+    - Token QR para validação: hash SHA256 ou, com assinado=true, token
+      assinado com a chave do evento (verificável offline, expira após o
+      fim do evento). Padrão: INGRESSOS_TOKEN_ASSINADO
     
     REQUER: API Key + JWT + Role (administrador OU atendente)
     """
@@ -79,19 +150,8 @@ def criar_ingresso(
             detail="Já existe um ingresso para esta inscrição"
         )
     
-    codigo = f"ING-{uuid4().hex[:8].upper()}"
-    
-    # Gerar token QR único (hash SHA256)
-    token_qr = hashlib.sha256(f"{codigo}-{inscricao_id}".encode()).hexdigest()
-    
-    ingresso = Ingresso(
-        inscricao_id=inscricao_id,
-        evento_id=evento.id,
-        codigo_ingresso=codigo,
-        token_qr=token_qr,
-        status="emitido",
-        emitido_em=datetime.datetime.utcnow()
-    )
+    # Código único (ING-XXXXXXXX) e token QR (hash SHA256 ou assinado)
+    ingresso = Ingresso(**dados_novo_ingresso(inscricao_id, evento.id, evento.fim_em, assinado))
     
     db.add(ingresso)
     db.commit()
@@ -100,6 +160,185 @@ def criar_ingresso(
     return ingresso
 
 
+# EMISSÃO EM MASSA
+
+EMISSAO_TAMANHO_LOTE = int(os.getenv("INGRESSOS_EMISSAO_LOTE", "1000"))
+
+_emissoes = TarefasPorChave("emissão em massa de ingressos do evento")
+
+
+def _progresso_emissao(db: Session, evento_id: UUID) -> dict:
+    """Conta inscrições ativas do evento com e sem ingresso (uma consulta)"""
+    total, com_ingresso = db.query(
+        func.count(Inscricao.id),
+        func.count(Ingresso.id)
+    ).outerjoin(
+        Ingresso, Ingresso.inscricao_id == Inscricao.id
+    ).filter(
+        Inscricao.evento_id == evento_id,
+        Inscricao.status.in_(INSCRICAO_ATIVOS)
+    ).one()
+    
+    return {
+        "total_inscricoes_ativas": total,
+        "com_ingresso": com_ingresso,
+        "faltantes": total - com_ingresso
+    }
+
+
+def _emitir_lote(
+    db: Session,
+    evento_id: UUID,
+    tamanho_lote: int,
+    fim_evento: Optional[datetime.datetime]
+) -> tuple[int, int]:
+    """
+    Emite ingressos para o próximo lote de inscrições ativas sem ingresso.
+    Um SELECT (anti-join) + um INSERT multi-linha + commit.
+    
+    Retorna (inscricoes_no_lote, ingressos_emitidos).
+    """
+    sem_ingresso = db.query(Inscricao.id).filter(
+        Inscricao.evento_id == evento_id,
+        Inscricao.status.in_(INSCRICAO_ATIVOS),
+        ~exists().where(Ingresso.inscricao_id == Inscricao.id)
+    ).order_by(Inscricao.id).limit(tamanho_lote).all()
+    
+    if not sem_ingresso:
+        return 0, 0
+    
+    # ON CONFLICT DO NOTHING: inscrição que ganhou ingresso por outro caminho
+    # (ou colisão de código) fica para o próximo lote
+    emitidos = db.execute(
+        insert(Ingresso)
+        .values([dados_novo_ingresso(i.id, evento_id, fim_evento) for i in sem_ingresso])
+        .on_conflict_do_nothing()
+    ).rowcount
+    db.commit()
+    
+    return len(sem_ingresso), emitidos
+
+
+def _executar_emissao_em_massa(estado: dict, evento_id: UUID, tamanho_lote: int):
+    """Emite todos os ingressos faltantes do evento, lote a lote (em background)"""
+    db = SessionLocal()
+    
+    try:
+        fim_evento = db.query(Evento.fim_em).filter(Evento.id == evento_id).scalar()
+        
+        lotes_sem_progresso = 0
+        while lotes_sem_progresso < 3:
+            no_lote, emitidos = _emitir_lote(db, evento_id, tamanho_lote, fim_evento)
+            if no_lote == 0:
+                break
+            
+            estado["emitidos"] += emitidos
+            estado["lotes"] += 1
+            lotes_sem_progresso = lotes_sem_progresso + 1 if emitidos == 0 else 0
+    finally:
+        db.close()
+
+
+@app.post("/evento/{evento_id}/emitir-todos", status_code=status.HTTP_202_ACCEPTED)
+def emitir_ingressos_evento(
+    evento_id: UUID,
+    background_tasks: BackgroundTasks,
+    tamanho_lote: int = Query(EMISSAO_TAMANHO_LOTE, ge=1, le=10000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador"))
+):
+    """
+    Emite ingressos para todas as inscrições ativas do evento que ainda não têm.
+    
+    A emissão roda em background, em lotes (INSERT multi-linha por lote, com
+    commit a cada lote). É retomável: se for interrompida, basta chamar de
+    novo que continua das inscrições que faltam. Se já houver uma emissão em
+    andamento para o evento, apenas retorna o progresso dela.
+    
+    Acompanhe pelo GET no mesmo caminho.
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    estado = _emissoes.iniciar(
+        evento_id, background_tasks, _executar_emissao_em_massa, evento_id, tamanho_lote,
+        emitidos=0, lotes=0, tamanho_lote=tamanho_lote
+    )
+    
+    return {"evento_id": str(evento_id), "execucao": estado, **_progresso_emissao(db, evento_id)}
+
+
+@app.get("/evento/{evento_id}/emitir-todos")
+def progresso_emissao_ingressos(
+    evento_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
+):
+    """
+    Progresso da emissão em massa de ingressos do evento.
+    
+    REQUER: API Key + JWT + Role (administrador OU atendente)
+    """
+    return {
+        "evento_id": str(evento_id),
+        "execucao": _emissoes.estado(evento_id),
+        **_progresso_emissao(db, evento_id)
+    }
+
+
+# MODO PORTARIA
+
+@app.put("/evento/{evento_id}/portaria")
+def configurar_modo_portaria(
+    evento_id: UUID,
+    ativo: bool = True,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador"))
+):
+    """
+    Ativa/desativa o modo portaria do evento: os ingressos passam a ser
+    validados a partir do índice em memória (carregado e mantido atualizado
+    por notificações do banco em todas as instâncias).
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    evento.modo_portaria = ativo
+    db.commit()
+    
+    # As demais instâncias recebem a notificação; esta já carrega
+    if indice_portaria.pronto:
+        indice_portaria.carregar_evento(db, evento_id)
+    
+    return {
+        "evento_id": str(evento_id),
+        "modo_portaria": ativo,
+        "carregado": evento_id in indice_portaria.eventos
+    }
+
+
+@app.get("/portaria/estado")
+def estado_portaria(
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
+):
+    """
+    Estado do índice da portaria nesta instância.
+    
+    REQUER: API Key + JWT + Role (administrador OU atendente)
+    """
+    return {
+        "pronto": indice_portaria.pronto,
+        "eventos": [str(e) for e in indice_portaria.eventos],
+        "ingressos": len(indice_portaria)
+    }
+
+
 @app.get("/validar/{token_qr}")
 def validar_ingresso(
     token_qr: str,
@@ -110,30 +349,64 @@ def validar_ingresso(
     Endpoint PÚBLICO usado por leitores de QR Code na entrada do evento.
     Não requer autenticação para permitir validação rápida na portaria.
     
-    REQUER: Nada (público para validação na entrada)
-    """
-    ingresso = db.query(Ingresso).filter(Ingresso.token_qr == token_qr).first()
+    Aceita os dois formatos de token: hash (só verificável no banco) e
+    assinado, cuja assinatura e validade são conferidas antes de qualquer
+    consulta (tokens forjados não chegam ao banco).
     
-    if not ingresso:
-        raise HTTPException(
-            status_code=404,
-            detail="Ingresso inválido ou não encontrado"
-        )
+    Ingressos de eventos em modo portaria são validados pelo índice em
+    memória; os demais (ou com o índice indisponível), pelo banco.
     
-    if ingresso.status == "usado":
+    REQUER: Nada (público para validação na entrada)
+    """
+    if token_assinado(token_qr):
+        try:
+            verificar_token_assinado(token_qr)
+        except TokenIngressoExpirado:
+            raise HTTPException(status_code=400, detail="Ingresso expirado")
+        except TokenIngressoInvalido:
+            raise HTTPException(status_code=404, detail="Ingresso inválido ou não encontrado")
+    
+    entrada = indice_portaria.obter(token_qr)
+    
+    if entrada:
+        ingresso_id, inscricao_id, evento_id, codigo, status_ingresso, emitido_em, checkin = entrada
+    else:
+        linha = db.query(
+            Ingresso.id,
+            Ingresso.inscricao_id,
+            Ingresso.evento_id,
+            Ingresso.codigo_ingresso,
+            Ingresso.status,
+            Ingresso.emitido_em,
+            exists().where(Checkin.inscricao_id == Ingresso.inscricao_id)
+        ).filter(Ingresso.token_qr == token_qr).first()
+        
+        if not linha:
+            raise HTTPException(
+                status_code=404,
+                detail="Ingresso inválido ou não encontrado"
+            )
+        
+        ingresso_id, inscricao_id, evento_id, codigo, status_ingresso, emitido_em, checkin = linha
+    
+    if status_ingresso == "usado":
         raise HTTPException(
             status_code=400,
             detail="Ingresso já foi utilizado"
         )
     
+    if status_ingresso == "cancelado":
+        raise HTTPException(status_code=400, detail="Ingresso cancelado")
+    
     return {
         "mensagem": "Ingresso válido",
-        "ingresso_id": str(ingresso.id),
-        "evento_id": str(ingresso.evento_id),
-        "inscricao_id": str(ingresso.inscricao_id),
-        "codigo": ingresso.codigo_ingresso,
-        "status": ingresso.status,
-        "emitido_em": ingresso.emitido_em
+        "ingresso_id": str(ingresso_id),
+        "evento_id": str(evento_id),
+        "inscricao_id": str(inscricao_id),
+        "codigo": codigo,
+        "status": status_ingresso,
+        "emitido_em": emitido_em,
+        "checkin_realizado": checkin
     }
 
 
@@ -149,28 +422,332 @@ def marcar_ingresso_usado(
     
     REQUER: API Key + JWT + Role (administrador OU atendente)
     """
-    ingresso = db.query(Ingresso).filter(Ingresso.id == ingresso_id).first()
+    t = transicionar(
+        db, Ingresso.status, INGRESSO_USAR, Ingresso.id == ingresso_id,
+        retornar=(Ingresso.codigo_ingresso, Ingresso.token_qr)
+    )
     
-    if not ingresso:
+    if not t.existe:
         raise HTTPException(status_code=404, detail="Ingresso não encontrado")
     
-    if ingresso.status == "usado":
-        raise HTTPException(
-            status_code=400,
-            detail="Ingresso já foi utilizado anteriormente"
-        )
+    if not t.aplicada:
+        if t.estado == "usado":
+            raise HTTPException(
+                status_code=400,
+                detail="Ingresso já foi utilizado anteriormente"
+            )
+        raise HTTPException(status_code=400, detail="Ingresso cancelado")
     
-    ingresso.status = "usado"
     db.commit()
-    db.refresh(ingresso)
+    
+    # Write-through: a notificação do banco também chega, mas a portaria
+    # deste processo já passa a recusar o ingresso
+    indice_portaria.atualizar_status(t.linha.token_qr, "usado")
     
     return {
         "mensagem": "Check-in realizado com sucesso",
-        "ingresso": ingresso.codigo_ingresso,
+        "ingresso": t.linha.codigo_ingresso,
         "horario": datetime.datetime.utcnow()
     }
 
 
+def _revogar_token(db: Session, ingresso_id: UUID, evento_id: UUID, token_qr: str):
+    """
+    Revoga a versão do token assinado (e as anteriores) para a portaria.
+    Um ingresso reemitido já está na lista com uma versão anterior.
+    """
+    stmt = insert(IngressoRevogado).values(
+        ingresso_id=ingresso_id,
+        evento_id=evento_id,
+        versao=ler_token_assinado(token_qr).versao,
+        revogado_em=datetime.datetime.utcnow()
+    )
+    db.execute(stmt.on_conflict_do_update(
+        index_elements=[IngressoRevogado.ingresso_id],
+        set_={
+            "versao": func.greatest(IngressoRevogado.versao, stmt.excluded.versao),
+            "revogado_em": stmt.excluded.revogado_em
+        }
+    ))
+
+
+@app.post("/{ingresso_id}/cancelar")
+def cancelar_ingresso(
+    ingresso_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador"))
+):
+    """
+    Cancela um ingresso. Se o token for assinado, a versão atual do token
+    entra na lista de revogação distribuída aos dispositivos da portaria.
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    t = transicionar(
+        db, Ingresso.status, INGRESSO_CANCELAR, Ingresso.id == ingresso_id,
+        retornar=(Ingresso.evento_id, Ingresso.codigo_ingresso, Ingresso.token_qr)
+    )
+    
+    if not t.existe:
+        raise HTTPException(status_code=404, detail="Ingresso não encontrado")
+    
+    if not t.aplicada:
+        raise HTTPException(status_code=400, detail="Ingresso já está cancelado")
+    
+    ingresso = t.linha
+    if ingresso.token_qr and token_assinado(ingresso.token_qr):
+        _revogar_token(db, ingresso_id, ingresso.evento_id, ingresso.token_qr)
+    
+    db.commit()
+    indice_portaria.atualizar_status(ingresso.token_qr, "cancelado")
+    
+    return {"mensagem": "Ingresso cancelado", "ingresso": ingresso.codigo_ingresso}
+
+
+@app.post("/{ingresso_id}/reemitir")
+def reemitir_ingresso(
+    ingresso_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador"))
+):
+    """
+    Reemite um ingresso emitido ou cancelado: gera um código e um token
+    novos e volta o status para emitido. O token anterior deixa de valer
+    (ex.: QR vazado): o hash é trocado; o assinado ganha a versão seguinte,
+    e a anterior entra na lista de revogação da portaria.
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    atual = db.query(
+        Ingresso.inscricao_id,
+        Ingresso.evento_id,
+        Ingresso.token_qr,
+        Evento.fim_em
+    ).join(Evento, Evento.id == Ingresso.evento_id).filter(Ingresso.id == ingresso_id).first()
+    
+    if not atual:
+        raise HTTPException(status_code=404, detail="Ingresso não encontrado")
+    
+    codigo = gerar_codigo_ingresso()
+    assinado = bool(atual.token_qr) and token_assinado(atual.token_qr)
+    if assinado:
+        versao = ler_token_assinado(atual.token_qr).versao + 1
+        token = gerar_token_assinado(ingresso_id, atual.evento_id, expiracao_token(atual.fim_em), versao)
+    else:
+        token = gerar_token_qr(codigo, atual.inscricao_id)
+    
+    # O token lido também entra no WHERE: de duas reemissões simultâneas,
+    # só uma encontra o token antigo
+    t = transicionar(
+        db, Ingresso.status, INGRESSO_REEMITIR,
+        Ingresso.id == ingresso_id,
+        Ingresso.token_qr.is_not_distinct_from(atual.token_qr),
+        valores={"codigo_ingresso": codigo, "token_qr": token, "emitido_em": datetime.datetime.utcnow()},
+        retornar=(Ingresso.codigo_ingresso, Ingresso.token_qr)
+    )
+    
+    if not t.aplicada:
+        if t.estado == "usado":
+            raise HTTPException(status_code=400, detail="Ingresso já utilizado não pode ser reemitido")
+        raise HTTPException(status_code=409, detail="Ingresso alterado por outra operação, tente novamente")
+    
+    if assinado:
+        _revogar_token(db, ingresso_id, atual.evento_id, atual.token_qr)
+    db.commit()
+    
+    if atual.token_qr:
+        indice_portaria.atualizar_status(atual.token_qr, "cancelado")
+    
+    return {
+        "mensagem": "Ingresso reemitido",
+        "ingresso": t.linha.codigo_ingresso,
+        "token_qr": t.linha.token_qr
+    }
+
+
+@app.get("/evento/{evento_id}/chave-portaria")
+def obter_chave_portaria(
+    evento_id: UUID,
+    desde: Optional[datetime.datetime] = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
+):
+    """
+    Material para validar offline os tokens assinados do evento: a chave
+    HMAC do evento e a lista de ingressos revogados.
+    
+    Verificação no dispositivo: token = "T1." + base64url(payload + assinatura),
+    payload = ingresso_id (16 bytes) + evento_id (16 bytes) + expiração
+    (uint32 big-endian, epoch UTC) + versão (uint32 big-endian);
+    assinatura = HMAC-SHA256(chave, payload) truncado em 16 bytes. O token é
+    recusado se o ingresso está em revogados com versão maior ou igual à
+    do token.
+    
+    Um ingresso reemitido continua na lista, com a versão anterior: o token
+    novo (versão maior) é aceito e os antigos não.
+    
+    Query params:
+    - desde: só as revogações posteriores (atualização incremental; o
+      dispositivo fica com a maior versão de cada ingresso)
+    
+    REQUER: API Key + JWT + Role (administrador OU atendente)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    agora = datetime.datetime.utcnow()
+    revogados = db.query(IngressoRevogado.ingresso_id, IngressoRevogado.versao).filter(
+        IngressoRevogado.evento_id == evento_id
+    )
+    if desde:
+        revogados = revogados.filter(IngressoRevogado.revogado_em > desde)
+    
+    return {
+        "evento_id": str(evento_id),
+        "algoritmo": "HMAC-SHA256-128",
+        "chave": base64.urlsafe_b64encode(chave_evento(evento_id)).decode(),
+        "revogados": [{"ingresso_id": str(i), "versao": v} for i, v in revogados.all()],
+        "gerado_em": agora
+    }
+
+
+# QR CODES
+
+QR_CACHE_MAX = int(os.getenv("INGRESSOS_QR_CACHE_MAX", "2000"))
+QR_ZIP_PAGINA = int(os.getenv("INGRESSOS_QR_ZIP_PAGINA", "500"))
+
+# Imagens renderizadas, por (token, formato). Um ingresso reemitido tem token
+# novo (chave nova), então o TTL só serve para liberar memória.
+_cache_qr = CacheTTL(ttl=3600, max_itens=QR_CACHE_MAX)
+
+
+@app.get("/{ingresso_id}/qr.{formato}")
+def obter_qr_ingresso(
+    ingresso_id: UUID,
+    formato: Literal["png", "svg"],
+    request: Request,
+    db: Session = Depends(get_db),
+    api_key: None = Depends(require_service_api_key("ingressos"))
+):
+    """
+    Imagem do QR code do ingresso (qr.png ou qr.svg).
+    
+    A reemissão troca o token, então o cliente sempre revalida (no-cache,
+    privado: o QR é a credencial de entrada). O ETag é calculado a partir
+    do token, e If-None-Match devolve 304 sem renderizar.
+    
+    REQUER: API Key
+    """
+    token = db.query(Ingresso.token_qr).filter(Ingresso.id == ingresso_id).scalar()
+    
+    if not token:
+        raise HTTPException(status_code=404, detail="Ingresso não encontrado")
+    
+    etag = etag_qr(token, formato)
+    cache_headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers)
+    
+    imagem = _cache_qr.obter((token, formato))
+    if imagem is AUSENTE:
+        imagem = renderizar_qr(token, formato)
+        _cache_qr.guardar((token, formato), imagem)
+    
+    return Response(content=imagem, media_type=MEDIA_TYPES[formato], headers=cache_headers)
+
+
+def _entradas_zip_qr(evento_id: UUID, formato: str) -> Iterator[tuple[str, bytes]]:
+    """
+    Entradas do ZIP de QR codes do evento: ({codigo}.{formato}, imagem).
+    Lê os ingressos (não cancelados) em páginas, com sessão própria, e
+    renderiza cada página no pool de processos.
+    """
+    renderizar = renderizar_qr_svg if formato == "svg" else renderizar_qr_png
+    db = SessionLocal()
+    ultimo_id = None
+    
+    try:
+        while True:
+            query = db.query(Ingresso.id, Ingresso.codigo_ingresso, Ingresso.token_qr).filter(
+                Ingresso.evento_id == evento_id,
+                Ingresso.status != "cancelado",
+                Ingresso.token_qr.isnot(None)
+            )
+            if ultimo_id:
+                query = query.filter(Ingresso.id > ultimo_id)
+            
+            pagina = query.order_by(Ingresso.id).limit(QR_ZIP_PAGINA).all()
+            db.commit()  # não mantém transação aberta durante o envio
+            
+            imagens = get_qr_executor().map(renderizar, [i.token_qr for i in pagina], chunksize=32)
+            for ingresso, imagem in zip(pagina, imagens):
+                yield f"{ingresso.codigo_ingresso}.{formato}", imagem
+            
+            if len(pagina) < QR_ZIP_PAGINA:
+                break
+            ultimo_id = pagina[-1].id
+    except Exception as e:
+        logger.error(f"Erro ao gerar ZIP de QR codes do evento {evento_id}: {e}")
+        raise
+    finally:
+        db.close()
+
+
+@app.get("/evento/{evento_id}/qr.zip")
+def exportar_qr_evento(
+    evento_id: UUID,
+    formato: Literal["png", "svg"] = "png",
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
+):
+    """
+    ZIP com os QR codes de todos os ingressos do evento (para crachás).
+    
+    As imagens são renderizadas no pool de processos, página a página, e o
+    ZIP é enviado em streaming conforme fica pronto. Um arquivo por
+    ingresso, nomeado pelo código (ING-XXXXXXXX).
+    
+    REQUER: API Key + JWT + Role (administrador OU atendente)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    return StreamingResponse(
+        stream_zip(_entradas_zip_qr(evento_id, formato)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="qr-{evento_id}.zip"'}
+    )
+
+
+@app.get("/codigo/{codigo}", response_model=IngressoSchema)
+def obter_ingresso_por_codigo(
+    codigo: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("ingressos", "administrador", "atendente"))
+):
+    """
+    Busca um ingresso pelo código impresso (digitação manual na portaria).
+    O dígito verificador é conferido antes da consulta: erros de digitação
+    retornam 400 sem ir ao banco.
+    
+    REQUER: API Key + JWT + Role (administrador OU atendente)
+    """
+    if not codigo_ingresso_valido(codigo):
+        raise HTTPException(status_code=400, detail="Código de ingresso inválido")
+    
+    ingresso = db.query(Ingresso).filter(
+        Ingresso.codigo_ingresso == normalizar_codigo_ingresso(codigo)
+    ).first()
+    
+    if not ingresso:
+        raise HTTPException(status_code=404, detail="Ingresso não encontrado")
+    
+    return ingresso
+
+
 @app.get("/{ingresso_id}", response_model=IngressoSchema)
 def obter_ingresso(
     ingresso_id: UUID,
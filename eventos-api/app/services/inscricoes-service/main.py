@@ -1,9 +1,15 @@
+import base64
+import csv
+import io
+import json
 import logging
-from fastapi import FastAPI, Depends, HTTPException, status
+import re
+from fastapi import FastAPI, BackgroundTasks, Depends, File, HTTPException, Query, Request, UploadFile, status
+from sqlalchemy import func, select, text, tuple_, union_all
 from sqlalchemy.orm import Session
 from uuid import UUID, uuid4
-from secrets import token_urlsafe
 import datetime
+from typing import Optional
 
 from app.shared.core.database import get_db
 from app.shared.models.inscricao import Inscricao
@@ -12,10 +18,14 @@ from app.shared.models.usuario import Usuario
 from app.shared import schemas
 from app.shared.middlewares.add import add_common_middlewares
 from app.shared.core.security import (
+    gerar_token_cadastro,
     require_jwt_and_service_key,
     require_service_api_key
 )
-from app.shared.helpers.email_helper import enviar_email_sync
+from app.shared.helpers.email_helper import enviar_email_sync, enviar_emails_lote_sync
+from app.shared.helpers.transicao_helper import INSCRICAO_CANCELAR, INSCRICAO_REATIVAR, transicionar
+from app.shared.helpers.json_helper import colunas, resposta_lista, RespostaJSON
+from app.shared.helpers.versao_helper import cabecalhos_versao, nao_modificado, resposta_304, versao_recurso_evento
 
 logger = logging.getLogger(__name__)
 
@@ -49,17 +59,18 @@ def criar_inscricao_normal(
     ).first()
     
     if existente:
+        # Se está cancelada, reativa (condicional: só uma requisição reativa)
+        t = transicionar(
+            db, Inscricao.status, INSCRICAO_REATIVAR, Inscricao.id == existente.id,
+            valores={"cancelado_em": None, "sincronizado": False}
+        )
+        
         # Se está ativa, retorna erro
-        if existente.status == "ativa":
+        if t.estado == "ativa" and not t.aplicada:
             raise HTTPException(status_code=400, detail="Usuário já inscrito neste evento")
         
-        # Se está cancelada, reativa
-        if existente.status == "cancelada":
-            existente.status = "ativa"
-            existente.cancelado_em = None
-            existente.sincronizado = False
+        if t.aplicada:
             db.commit()
-            db.refresh(existente)
             
             # Enviar email de confirmação
             try:
@@ -114,7 +125,8 @@ def criar_inscricao_rapida(
 ):
     """
     Cria uma inscrição rápida com criação automática de usuário temporário.
-    Útil para eventos onde o participante não tem cadastro prévio.
+    Útil para eventos onde o participante não tem cadastro prévio. O link
+    de cadastro da senha vai só no email informado, não na resposta.
     
     REQUER: API Key + JWT + Role (administrador OU atendente)
     """
@@ -130,7 +142,7 @@ def criar_inscricao_rapida(
         nome=payload.nome_rapido,
         email=email,
         cpf=payload.cpf_rapido,
-        senha_hash=token_urlsafe(16),  # senha temporária
+        senha_hash=None,  # sem senha até o cadastro (token de cadastro)
         papel="rapido",
         email_verificado=False
     )
@@ -153,7 +165,7 @@ def criar_inscricao_rapida(
     db.commit()
     db.refresh(inscr)
     
-    # Enviar email de confirmação
+    # Enviar email de confirmação (com o link de cadastro da senha)
     try:
         if payload.email_rapido and "@" in payload.email_rapido:
             enviar_email_sync(
@@ -161,7 +173,8 @@ def criar_inscricao_rapida(
                 template="inscricao",
                 data={
                     "nome": payload.nome_rapido,
-                    "evento": evento.titulo
+                    "evento": evento.titulo,
+                    "token_cadastro": gerar_token_cadastro(usuario_rapido.id)
                 }
             )
     except Exception as email_error:
@@ -174,6 +187,274 @@ def criar_inscricao_rapida(
     }
 
 
+# IMPORTAÇÃO EM MASSA (CSV)
+
+IMPORTACAO_LOTE_COPY = 5000
+IMPORTACAO_MAX_ERROS = 1000
+
+
+def _validar_linha_importacao(nome: str, email: str | None, cpf: str | None) -> str | None:
+    """Retorna a mensagem de erro da linha, ou None se for válida"""
+    if not nome:
+        return "Nome é obrigatório"
+    if len(nome) > 200:
+        return "Nome excede 200 caracteres"
+    if email and ("@" not in email or len(email) > 255):
+        return "Email inválido"
+    if cpf and (len(re.sub(r"\D", "", cpf)) != 11 or len(cpf) > 20):
+        return "CPF inválido"
+    return None
+
+
+def _copiar_para_staging(cursor, buffer: io.StringIO):
+    """Envia o buffer de linhas para a tabela temporária via COPY"""
+    buffer.seek(0)
+    cursor.copy_expert(
+        "COPY importacao_inscricoes (linha, nome, email, cpf) FROM STDIN WITH (FORMAT csv)",
+        buffer
+    )
+    buffer.seek(0)
+    buffer.truncate()
+
+
+@app.post("/evento/{evento_id}/importar")
+def importar_inscricoes_csv(
+    evento_id: UUID,
+    background_tasks: BackgroundTasks,
+    arquivo: UploadFile = File(...),
+    encoding: str = "utf-8-sig",
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("inscricoes", "administrador"))
+):
+    """
+    Importa inscrições de um evento a partir de uma planilha CSV.
+    
+    Colunas: nome (obrigatória), email, cpf. Separador "," ou ";".
+    
+    O arquivo é lido linha a linha e enviado ao banco em blocos via COPY para
+    uma tabela temporária. A deduplicação (por email/CPF, no arquivo e contra
+    usuarios) e a criação de usuários e inscrições são feitas em comandos
+    SQL em conjunto, numa única transação. O CPF é comparado só pelos
+    dígitos (com ou sem pontuação). Os emails de confirmação são enviados
+    em lote após a resposta; os usuários criados recebem o link de cadastro
+    da senha.
+    
+    Query params:
+    - encoding: codificação do arquivo (padrão utf-8-sig; ex.: latin-1)
+    
+    REQUER: API Key + JWT + Role (administrador)
+    """
+    evento = db.query(Evento).filter(Evento.id == evento_id).first()
+    if not evento:
+        raise HTTPException(status_code=404, detail="Evento não encontrado")
+    
+    try:
+        texto = io.TextIOWrapper(arquivo.file, encoding=encoding, newline="")
+    except LookupError:
+        raise HTTPException(status_code=400, detail=f"Codificação desconhecida: {encoding}")
+    
+    erros = []
+    total_linhas = 0
+    
+    try:
+        cabecalho_bruto = texto.readline()
+        delimitador = ";" if cabecalho_bruto.count(";") > cabecalho_bruto.count(",") else ","
+        cabecalho = [c.strip().lower() for c in next(csv.reader([cabecalho_bruto], delimiter=delimitador), [])]
+        
+        if "nome" not in cabecalho:
+            raise HTTPException(status_code=400, detail="O arquivo deve ter a coluna 'nome'")
+        
+        col_nome = cabecalho.index("nome")
+        col_email = cabecalho.index("email") if "email" in cabecalho else None
+        col_cpf = cabecalho.index("cpf") if "cpf" in cabecalho else None
+        
+        db.execute(text("""
+            CREATE TEMP TABLE importacao_inscricoes (
+                linha integer PRIMARY KEY,
+                nome text NOT NULL,
+                email text,
+                cpf text,
+                usuario_id uuid,
+                novo_usuario boolean NOT NULL DEFAULT false,
+                inscricao_id uuid,
+                ja_inscrito boolean NOT NULL DEFAULT false
+            ) ON COMMIT DROP
+        """))
+        cursor = db.connection().connection.cursor()
+        
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        pendentes = 0
+        
+        def campo(valores, coluna):
+            if coluna is None or coluna >= len(valores):
+                return None
+            return valores[coluna].strip() or None
+        
+        for numero, valores in enumerate(csv.reader(texto, delimiter=delimitador), start=2):
+            if not any(v.strip() for v in valores):
+                continue
+            total_linhas += 1
+            
+            nome = campo(valores, col_nome)
+            email = campo(valores, col_email)
+            cpf = campo(valores, col_cpf)
+            
+            erro = _validar_linha_importacao(nome, email, cpf)
+            if erro:
+                erros.append({"linha": numero, "erro": erro})
+                continue
+            
+            # CPF só com dígitos, para deduplicar e comparar independente da pontuação
+            escritor.writerow([numero, nome, email, re.sub(r"\D", "", cpf) if cpf else None])
+            pendentes += 1
+            
+            if pendentes >= IMPORTACAO_LOTE_COPY:
+                _copiar_para_staging(cursor, buffer)
+                pendentes = 0
+        
+        if pendentes:
+            _copiar_para_staging(cursor, buffer)
+        
+        # 1. Duplicados dentro do próprio arquivo: mantém a primeira ocorrência
+        for coluna, rotulo in (("email", "Email"), ("cpf", "CPF")):
+            duplicados = db.execute(text(f"""
+                DELETE FROM importacao_inscricoes t
+                USING importacao_inscricoes o
+                WHERE t.{coluna} = o.{coluna} AND t.linha > o.linha
+                RETURNING t.linha, o.linha
+            """)).all()
+            
+            primeira = {}
+            for linha, original in duplicados:
+                primeira[linha] = min(original, primeira.get(linha, original))
+            erros.extend(
+                {"linha": linha, "erro": f"{rotulo} duplicado no arquivo (linha {original})"}
+                for linha, original in primeira.items()
+            )
+        
+        # 2. Usuários existentes: por email e, na falta, por CPF
+        db.execute(text("""
+            UPDATE importacao_inscricoes t SET usuario_id = u.id
+            FROM usuarios u
+            WHERE t.email IS NOT NULL AND u.email = t.email
+        """))
+        db.execute(text("""
+            UPDATE importacao_inscricoes t SET usuario_id = u.id
+            FROM usuarios u
+            WHERE t.usuario_id IS NULL AND t.cpf IS NOT NULL
+              AND cpf_normalizado(u.cpf) = t.cpf  -- ix_usuarios_cpf_normalizado
+        """))
+        
+        # 3. Usuários novos (papel "rapido", como na inscrição rápida)
+        db.execute(text("""
+            UPDATE importacao_inscricoes
+            SET usuario_id = gen_random_uuid(), novo_usuario = true
+            WHERE usuario_id IS NULL
+        """))
+        conflitos = db.execute(text("""
+            WITH criados AS (
+                INSERT INTO usuarios (id, nome, email, cpf, papel, email_verificado, criado_em, atualizado_em)
+                SELECT usuario_id, nome,
+                       COALESCE(email, 'temp_' || usuario_id || '@rapido.local'),
+                       cpf, 'rapido', false,
+                       now() AT TIME ZONE 'utc', now() AT TIME ZONE 'utc'
+                FROM importacao_inscricoes
+                WHERE novo_usuario
+                ON CONFLICT DO NOTHING
+                RETURNING id
+            )
+            DELETE FROM importacao_inscricoes t
+            WHERE t.novo_usuario AND NOT EXISTS (SELECT 1 FROM criados c WHERE c.id = t.usuario_id)
+            RETURNING t.linha
+        """)).scalars().all()
+        erros.extend({"linha": linha, "erro": "Email ou CPF cadastrado simultaneamente por outro usuário"} for linha in conflitos)
+        
+        # 4. Inscrições existentes: só as canceladas são reativadas; as demais
+        # (ativa, confirmada) já contam como inscrito
+        db.execute(text("""
+            UPDATE importacao_inscricoes t
+            SET inscricao_id = i.id, ja_inscrito = (i.status IS DISTINCT FROM 'cancelada')
+            FROM inscricoes i
+            WHERE i.evento_id = :evento_id AND i.usuario_id = t.usuario_id
+        """), {"evento_id": evento_id})
+        reativadas = db.execute(text("""
+            UPDATE inscricoes i
+            SET status = 'ativa', cancelado_em = NULL, sincronizado = false
+            FROM importacao_inscricoes t
+            WHERE i.id = t.inscricao_id AND NOT t.ja_inscrito
+        """)).rowcount
+        
+        # 5. Inscrições novas
+        criadas = db.execute(text("""
+            INSERT INTO inscricoes (id, evento_id, usuario_id, inscricao_rapida, nome_rapido,
+                                    cpf_rapido, email_rapido, status, sincronizado)
+            SELECT gen_random_uuid(), :evento_id, usuario_id, novo_usuario, nome,
+                   cpf, email, 'ativa', false
+            FROM importacao_inscricoes
+            WHERE inscricao_id IS NULL
+        """), {"evento_id": evento_id}).rowcount
+        
+        resumo = db.execute(text("""
+            SELECT COUNT(*) FILTER (WHERE novo_usuario) AS usuarios_criados,
+                   COUNT(*) FILTER (WHERE ja_inscrito) AS ja_inscritos
+            FROM importacao_inscricoes
+        """)).one()
+        
+        destinatarios = db.execute(text("""
+            SELECT email, nome, usuario_id, novo_usuario FROM importacao_inscricoes
+            WHERE NOT ja_inscrito AND email IS NOT NULL
+        """)).all()
+        
+        db.commit()
+    except HTTPException:
+        db.rollback()
+        raise
+    except UnicodeDecodeError:
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail=f"Não foi possível ler o arquivo como {encoding}. Informe o parâmetro encoding (ex.: latin-1)"
+        )
+    except csv.Error as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=f"CSV inválido: {e}")
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erro ao importar inscrições: {e}")
+    finally:
+        texto.detach()
+    
+    if destinatarios:
+        # Gerador: os tokens de cadastro são gerados na tarefa, não na resposta
+        background_tasks.add_task(
+            enviar_emails_lote_sync,
+            (
+                (d.email, {
+                    "nome": d.nome,
+                    "evento": evento.titulo,
+                    "token_cadastro": gerar_token_cadastro(d.usuario_id) if d.novo_usuario else None
+                })
+                for d in destinatarios
+            ),
+            "inscricao"
+        )
+    
+    erros.sort(key=lambda e: e["linha"])
+    
+    return {
+        "evento_id": str(evento_id),
+        "total_linhas": total_linhas,
+        "inscricoes_criadas": criadas,
+        "inscricoes_reativadas": reativadas,
+        "ja_inscritos": resumo.ja_inscritos,
+        "usuarios_criados": resumo.usuarios_criados,
+        "emails_enfileirados": len(destinatarios),
+        "total_erros": len(erros),
+        "erros": erros[:IMPORTACAO_MAX_ERROS]
+    }
+
+
 @app.patch("/{inscricao_id}/cancelar", status_code=status.HTTP_200_OK)
 def cancelar_inscricao(
     inscricao_id: UUID,
@@ -183,29 +464,36 @@ def cancelar_inscricao(
     """
     Cancela uma inscrição existente.
     """
-    inscr = db.query(Inscricao).filter(Inscricao.id == inscricao_id).first()
-    if not inscr:
+    t = transicionar(
+        db, Inscricao.status, INSCRICAO_CANCELAR, Inscricao.id == inscricao_id,
+        valores={"sincronizado": False},
+        retornar=(
+            Inscricao.evento_id,
+            Inscricao.usuario_id,
+            Inscricao.inscricao_rapida,
+            Inscricao.email_rapido,
+            Inscricao.nome_rapido
+        )
+    )
+    if not t.existe:
         raise HTTPException(status_code=404, detail="Inscrição não encontrada")
     
-    if inscr.status == "cancelada":
+    if not t.aplicada:
         raise HTTPException(status_code=400, detail="Inscrição já está cancelada")
     
-    # Buscar evento para pegar o nome
-    evento = db.query(Evento).filter(Evento.id == inscr.evento_id).first()
+    db.commit()
+    inscr = t.linha
+    
+    # Dados para o email: evento e, se não for rápida, o usuário (uma consulta)
+    destino = db.query(Evento.titulo, Usuario.email, Usuario.nome).outerjoin(
+        Usuario, Usuario.id == inscr.usuario_id
+    ).filter(Evento.id == inscr.evento_id).first()
     
-    # Buscar dados do usuário para email
+    titulo = destino.titulo if destino else None
     if inscr.inscricao_rapida:
-        email = inscr.email_rapido
-        nome = inscr.nome_rapido
+        email, nome = inscr.email_rapido, inscr.nome_rapido
     else:
-        usuario = db.query(Usuario).filter(Usuario.id == inscr.usuario_id).first()
-        email = usuario.email if usuario else None
-        nome = usuario.nome if usuario else None
-    
-    # Atualizar status
-    inscr.status = "cancelada"
-    inscr.sincronizado = False
-    db.commit()
+        email, nome = (destino.email, destino.nome) if destino else (None, None)
     
     # Enviar email de cancelamento
     try:
@@ -215,7 +503,7 @@ def cancelar_inscricao(
                 template="cancelamento",
                 data={
                     "nome": nome,
-                    "evento": evento.titulo if evento else "Evento"
+                    "evento": titulo or "Evento"
                 }
             )
     except Exception as email_error:
@@ -239,12 +527,12 @@ def listar_inscricoes_por_evento(
     
     REQUER: API Key (sem JWT - permite consulta para sistemas de gestão)
     """
-    query = db.query(Inscricao).filter(Inscricao.evento_id == evento_id)
+    query = db.query(*colunas(schemas.InscricaoOut, Inscricao)).filter(Inscricao.evento_id == evento_id)
     
     if apenas_ativas:
         query = query.filter(Inscricao.status == "ativa")
     
-    return query.all()
+    return resposta_lista(schemas.InscricaoOut, query)
 
 
 @app.get("/usuario/{usuario_id}", response_model=list[schemas.InscricaoOut])
@@ -259,7 +547,147 @@ def listar_inscricoes_por_usuario(
     
     REQUER: API Key (sem JWT - permite consulta por ID de usuário)
     """
-    return db.query(Inscricao).filter(Inscricao.usuario_id == usuario_id).all()
+    return resposta_lista(
+        schemas.InscricaoOut,
+        db.query(*colunas(schemas.InscricaoOut, Inscricao)).filter(Inscricao.usuario_id == usuario_id)
+    )
+
+
+# BUSCA DE PARTICIPANTES
+
+def _escapar_like(termo: str) -> str:
+    return termo.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _chave_nome(col_nome):
+    """Chave de ordenação da busca: lower(nome) em collation "C" (índices ix_*_nome_lower)"""
+    return func.lower(col_nome).collate("C")
+
+
+def _cursor_busca(linha) -> str:
+    return base64.urlsafe_b64encode(json.dumps([linha["chave"], str(linha["inscricao_id"])]).encode()).decode()
+
+
+def _ler_cursor_busca(apos: str) -> tuple:
+    try:
+        chave, inscricao_id = json.loads(base64.urlsafe_b64decode(apos.encode()))
+        return str(chave), UUID(inscricao_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+
+def _ramos_participante(consulta, col_nome, col_cpf, col_email, col_id, nome, cpf, email, apos, limite) -> list:
+    """
+    Consultas de uma das origens, cada uma ordenada por (nome, inscrição),
+    a partir do cursor e limitada. Com nome, o início do nome percorre
+    ix_*_nome_lower já na ordem; o sobrenome (prefixo de outra palavra) é
+    um ramo à parte, então nenhum ramo ordena mais que `limite` linhas.
+    """
+    chave = _chave_nome(col_nome)
+    consulta = consulta.add_columns(chave.label("chave"))
+    if cpf:
+        consulta = consulta.where(func.cpf_normalizado(col_cpf) == cpf)
+    if email:
+        consulta = consulta.where(func.lower(col_email) == email)
+    if apos:
+        consulta = consulta.where(chave >= apos[0], tuple_(chave, col_id) > tuple_(*apos))
+
+    if nome:
+        termo = _escapar_like(nome)
+        inicio = chave.like(f"{termo.lower()}%", escape="\\")
+        ramos = [
+            consulta.where(inicio),
+            consulta.where(col_nome.ilike(f"% {termo}%", escape="\\"), ~inicio)
+        ]
+    else:
+        ramos = [consulta]
+    return [r.order_by(chave, col_id).limit(limite) for r in ramos]
+
+
+@app.get("/buscar", response_model=schemas.ParticipantesPagina)
+def buscar_participantes(
+    nome: Optional[str] = Query(None, min_length=3, max_length=200),
+    cpf: Optional[str] = Query(None, max_length=20),
+    email: Optional[str] = Query(None, max_length=255),
+    apos: Optional[str] = Query(None, max_length=500),
+    tamanho: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(require_jwt_and_service_key("inscricoes", "atendente", "administrador"))
+):
+    """
+    Busca participantes em todos os eventos, por CPF (com ou sem
+    pontuação), prefixo do nome (ou de um sobrenome) e/ou email. Critérios
+    informados juntos precisam ser todos atendidos. Cada resultado é uma
+    inscrição, com os dados do usuário (inscrição normal) ou os informados
+    na inscrição rápida.
+
+    Ordenado por nome (sem distinção de maiúsculas) e paginado por cursor:
+    a resposta traz em `proximo` o valor de `apos` da página seguinte (nulo
+    na última). Nem o total nem as páginas anteriores são percorridos, então
+    prefixos curtos com muitos participantes continuam baratos.
+
+    REQUER: API Key + JWT + Role (atendente OU administrador)
+    """
+    if cpf is not None:
+        cpf = re.sub(r"\D", "", cpf)
+        if len(cpf) != 11:
+            raise HTTPException(status_code=400, detail="CPF deve ter 11 dígitos")
+    if email is not None:
+        email = email.strip().lower()
+    if nome is not None:
+        nome = nome.strip()
+    if not (nome or cpf or email):
+        raise HTTPException(status_code=400, detail="Informe nome, cpf ou email")
+    if apos is not None:
+        apos = _ler_cursor_busca(apos)
+
+    # Inscrições rápidas: dados na própria inscrição (índices em inscricoes)
+    rapidas = select(
+        Inscricao.id.label("inscricao_id"),
+        Inscricao.evento_id,
+        Inscricao.usuario_id,
+        Inscricao.status,
+        Inscricao.inscricao_rapida,
+        Inscricao.nome_rapido.label("nome"),
+        Inscricao.cpf_rapido.label("cpf"),
+        Inscricao.email_rapido.label("email")
+    ).where(Inscricao.inscricao_rapida.is_(True))
+    # Inscrições normais: dados do usuário (índices em usuarios, depois ix_inscricoes_usuario_id)
+    normais = select(
+        Inscricao.id,
+        Inscricao.evento_id,
+        Inscricao.usuario_id,
+        Inscricao.status,
+        Inscricao.inscricao_rapida,
+        Usuario.nome,
+        Usuario.cpf,
+        Usuario.email
+    ).join(Usuario, Usuario.id == Inscricao.usuario_id).where(Inscricao.inscricao_rapida.is_not(True))
+
+    # Cada ramo traz no máximo uma página (+1): a união é ordenada em memória
+    ramos = _ramos_participante(
+        rapidas, Inscricao.nome_rapido, Inscricao.cpf_rapido, Inscricao.email_rapido, Inscricao.id,
+        nome, cpf, email, apos, tamanho + 1
+    ) + _ramos_participante(
+        normais, Usuario.nome, Usuario.cpf, Usuario.email, Inscricao.id,
+        nome, cpf, email, apos, tamanho + 1
+    )
+    encontrados = union_all(*ramos).subquery()
+    linhas = db.execute(
+        select(encontrados, Evento.titulo.label("evento_titulo"))
+        .join(Evento, Evento.id == encontrados.c.evento_id)
+        .order_by(encontrados.c.chave.collate("C"), encontrados.c.inscricao_id)
+        .limit(tamanho + 1)
+    ).mappings().all()
+
+    tem_mais = len(linhas) > tamanho
+    linhas = linhas[:tamanho]
+    return {
+        "tamanho": tamanho,
+        "tem_mais": tem_mais,
+        "proximo": _cursor_busca(linhas[-1]) if tem_mais else None,
+        "resultados": linhas
+    }
 
 
 @app.get("/{inscricao_id}", response_model=schemas.InscricaoOut)
@@ -330,6 +758,7 @@ def estatisticas_inscricoes(
 @app.get("/evento/{evento_id}/inscritos")
 def listar_inscritos_evento(
     evento_id: UUID,
+    request: Request,
     incluir_canceladas: bool = False,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_jwt_and_service_key("inscricoes", "atendente", "administrador"))
@@ -342,7 +771,16 @@ def listar_inscritos_evento(
     
     Query params:
     - incluir_canceladas: se True, inclui inscrições canceladas (default: False)
+
+    Envia ETag; If-None-Match atual devolve 304.
     """
+    v = versao_recurso_evento(db, evento_id, "inscricoes", incluir_canceladas)
+    if v is None:
+        return []
+    cabecalhos = cabecalhos_versao(v)
+    if nao_modificado(request, v):
+        return resposta_304(cabecalhos)
+
     query = db.query(Inscricao).filter(Inscricao.evento_id == evento_id)
     
     # Por padrão, filtra apenas ativas
@@ -350,9 +788,6 @@ def listar_inscritos_evento(
         query = query.filter(Inscricao.status == "ativa")
     
     inscricoes = query.all()
-    
-    if not inscricoes:
-        return []
 
     inscritos = []
     for i in inscricoes:
@@ -378,7 +813,7 @@ def listar_inscritos_evento(
         
         inscritos.append(inscrito_data)
 
-    return inscritos
+    return RespostaJSON(inscritos, headers=cabecalhos)
 
 
 if __name__ == "__main__":
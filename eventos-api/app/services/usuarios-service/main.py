@@ -5,22 +5,20 @@ Porta: 8003
 from fastapi import FastAPI, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from uuid import UUID
-from passlib.context import CryptContext
 
 from app.shared.core.database import get_db
 from app.shared.models.usuario import Usuario
 from app.shared import schemas
 from app.shared.middlewares.add import add_common_middlewares
 from app.shared.core.security import require_roles
+from app.shared.helpers.senha_helper import servico_senhas
+from app.shared.helpers.json_helper import colunas, resposta_lista
 
 app = FastAPI(title="Usuarios Service", version="1.0.0")
 add_common_middlewares(app, audit=True)
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-
 def hash_password(password: str):
-    return pwd_context.hash(password.strip())
+    return servico_senhas.hash(password.strip())
 
 
 @app.post("/", response_model=schemas.UsuarioOut, status_code=status.HTTP_201_CREATED)
@@ -54,7 +52,7 @@ def listar_usuarios(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_roles("administrador"))
 ):
-    return db.query(Usuario).all()
+    return resposta_lista(schemas.UsuarioOut, db.query(*colunas(schemas.UsuarioOut, Usuario)))
 
 
 @app.get("/{usuario_id}", response_model=schemas.UsuarioOut)
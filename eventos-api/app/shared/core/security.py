@@ -1,6 +1,9 @@
 from fastapi import Depends, HTTPException, status, Header, Request
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
+import datetime
+import hashlib
+import hmac
 import os
 from dotenv import load_dotenv
 
@@ -8,6 +11,7 @@ load_dotenv()
 
 from app.shared.core.config import settings
 from app.shared.core.database import get_db
+from app.shared.helpers.revogacao_helper import filtro_revogacao
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = settings.ALGORITHM
@@ -31,12 +35,20 @@ def verificar_token_middleware(authorization: str = Header(...)):
     
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        return payload
     except JWTError as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token inválido ou expirado: {str(e)}"
         )
+    
+    # Revogações ficam em memória (ver revogacao_helper): sem consulta ao banco
+    if filtro_revogacao.revogado(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revogado"
+        )
+    
+    return payload
 
 
 def require_roles(*roles: str):
@@ -147,6 +159,31 @@ def require_service_api_key(service_name: str):
     return wrapper
 
 
+def autenticar_jwt_e_service_key(service_name: str, x_api_key: str, authorization: str, *roles: str) -> dict:
+    """
+    Valida API Key do serviço, JWT e papel, fora do sistema de dependências
+    (ex.: mensagem de autenticação de um WebSocket). Retorna o payload do token.
+    """
+    service_key = os.getenv(f"{service_name.upper()}_API_KEY", API_KEY)
+    if x_api_key != service_key:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail=f"API Key inválida para o serviço {service_name}"
+        )
+    
+    payload = verificar_token_middleware(authorization)
+    
+    if roles:
+        user_role = payload.get("role")
+        if user_role not in roles:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail=f"Acesso negado. Papéis permitidos: {', '.join(roles)}"
+            )
+    
+    return payload
+
+
 def require_jwt_and_service_key(service_name: str, *roles: str):
     """
     Valida TANTO JWT quanto API Key do serviço.
@@ -157,25 +194,47 @@ def require_jwt_and_service_key(service_name: str, *roles: str):
         x_api_key: str = Header(...),
         authorization: str = Header(...)
     ):
-        service_key = os.getenv(f"{service_name.upper()}_API_KEY", API_KEY)
-        if x_api_key != service_key:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail=f"API Key inválida para o serviço {service_name}"
-            )
-        
-        payload = verificar_token_middleware(authorization)
-        
-        if roles:
-            user_role = payload.get("role")
-            if user_role not in roles:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail=f"Acesso negado. Papéis permitidos: {', '.join(roles)}"
-                )
-        
+        payload = autenticar_jwt_e_service_key(service_name, x_api_key, authorization, *roles)
         request.state.user = payload
 
         return payload
     
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+
+# TOKENS COM CHAVE DERIVADA
+
+def chave_derivada(finalidade: str) -> str:
+    """
+    Chave para tokens que não são de acesso (cadastro, refresh): assinados
+    com ela, não passam em verificar_token_middleware.
+    """
+    return hmac.new(SECRET_KEY.encode(), finalidade.encode(), hashlib.sha256).hexdigest()
+
+
+# TOKEN DE CADASTRO (USUÁRIO RÁPIDO)
+
+# Usuários rápidos são criados sem senha; o token de cadastro permite
+# definir a senha depois (auth: /cadastrar-senha-rapido).
+_CHAVE_CADASTRO = chave_derivada("cadastro-rapido")
+CADASTRO_TOKEN_DIAS = int(os.getenv("CADASTRO_RAPIDO_TOKEN_DIAS", "30"))
+# Transição: aceita o cadastro sem token (só pelo email), como antes do
+# token existir, enquanto houver clientes que não o enviam
+CADASTRO_ACEITA_SEM_TOKEN = os.getenv("CADASTRO_RAPIDO_ACEITA_SEM_TOKEN", "false").lower() in ("1", "true")
+
+
+def gerar_token_cadastro(usuario_id) -> str:
+    """Token para o usuário rápido cadastrar a senha (sem acesso ao banco)"""
+    expira = datetime.datetime.utcnow() + datetime.timedelta(days=CADASTRO_TOKEN_DIAS)
+    return jwt.encode({"sub": str(usuario_id), "exp": expira}, _CHAVE_CADASTRO, algorithm=ALGORITHM)
+
+
+def verificar_token_cadastro(token: str) -> str:
+    """ID do usuário do token de cadastro (401 se inválido ou expirado)"""
+    try:
+        return jwt.decode(token, _CHAVE_CADASTRO, algorithms=[ALGORITHM])["sub"]
+    except (JWTError, KeyError):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de cadastro inválido ou expirado"
+        )
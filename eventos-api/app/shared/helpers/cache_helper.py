@@ -0,0 +1,58 @@
+"""
+Cache em memória (por processo) com expiração e limite de itens.
+
+Cada worker tem o seu próprio cache: invalidações só valem para o processo
+que as fez, então o TTL também limita por quanto tempo outro worker pode
+servir um valor desatualizado.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Retornado por CacheTTL.obter quando a chave não está no cache
+# (permite guardar None como resultado negativo)
+AUSENTE = object()
+
+
+class CacheTTL:
+    """Cache LRU com TTL por entrada, seguro para uso entre threads"""
+
+    def __init__(self, ttl: float, max_itens: int = 10000):
+        self.ttl = ttl
+        self.max_itens = max_itens
+        self._itens: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obter(self, chave: Hashable) -> Any:
+        """Valor da chave, ou AUSENTE se não existir/expirou"""
+        with self._lock:
+            item = self._itens.get(chave)
+            if item is None:
+                return AUSENTE
+
+            expira_em, valor = item
+            if expira_em <= time.monotonic():
+                del self._itens[chave]
+                return AUSENTE
+
+            self._itens.move_to_end(chave)
+            return valor
+
+    def guardar(self, chave: Hashable, valor: Any, ttl: Optional[float] = None):
+        """Guarda o valor; ttl sobrescreve o padrão (ex.: resultados negativos)"""
+        expira_em = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._itens[chave] = (expira_em, valor)
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def invalidar(self, *chaves: Hashable):
+        with self._lock:
+            for chave in chaves:
+                self._itens.pop(chave, None)
+
+    def limpar(self):
+        with self._lock:
+            self._itens.clear()
@@ -0,0 +1,153 @@
+"""
+Catálogo público de eventos pré-renderizado em memória.
+
+GET /eventos/publicos/ativos é público e igual para todos. O catálogo é
+gerado uma vez, já serializado e comprimido (gzip e brotli), e servido
+direto da memória: uma requisição não consulta o banco nem serializa nada.
+
+Ele é gerado de novo quando:
+- um evento muda (trigger do canal "catalogo", migração 0010), na thread
+  da escuta, então as requisições seguem servindo o anterior enquanto isso;
+- o fim_em de um evento listado passa (expira_em), na primeira requisição
+  depois disso.
+
+Enquanto a escuta não está ativa não dá para saber se houve mudança: cada
+requisição gera o catálogo na hora, sem compressão.
+"""
+import datetime
+import gzip
+import hashlib
+import logging
+import threading
+from typing import NamedTuple, Optional
+
+import brotli
+import orjson
+
+from app.shared import schemas
+from app.shared.core.database import SessionLocal
+from app.shared.helpers.json_helper import OPCOES_ORJSON, colunas, serializador
+from app.shared.helpers.notificacao_helper import EscutaNotificacoes
+from app.shared.helpers.versao_helper import Versao
+from app.shared.models.evento import Evento
+
+CANAL = "catalogo"
+GZIP_NIVEL = 9
+BROTLI_QUALIDADE = 11  # gerado raramente: vale a compressão máxima
+
+logger = logging.getLogger(__name__)
+
+
+class Snapshot(NamedTuple):
+    corpos: dict[str, bytes]  # codificação ("identity", "gzip", "br") -> corpo
+    versao: Versao
+    expira_em: Optional[datetime.datetime]  # menor fim_em listado: depois dele a lista muda
+
+
+def escolher_codificacao(accept_encoding: str, disponiveis) -> str:
+    """Melhor codificação disponível aceita pelo cliente (Accept-Encoding)"""
+    aceitas = {}
+    for parte in accept_encoding.split(","):
+        nome, _, parametros = parte.partition(";")
+        qualidade = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                qualidade = float(parametros[2:])
+            except ValueError:
+                qualidade = 0.0
+        aceitas[nome.strip().lower()] = qualidade
+
+    for codificacao in ("br", "gzip"):
+        if codificacao in disponiveis and aceitas.get(codificacao, aceitas.get("*", 0.0)) > 0:
+            return codificacao
+    return "identity"
+
+
+class CatalogoPublico:
+    """Snapshot do catálogo, regenerado por LISTEN/NOTIFY e pela passagem de fim_em"""
+
+    def __init__(self, intervalo_reconexao: float = 5.0):
+        self._snapshot: Optional[Snapshot] = None
+        self._lock = threading.Lock()
+        self._escuta = EscutaNotificacoes(
+            CANAL,
+            lambda _: self._regenerar(),
+            ao_conectar=self._regenerar,
+            intervalo_reconexao=intervalo_reconexao
+        )
+
+    @property
+    def pronto(self) -> bool:
+        return self._escuta.conectado
+
+    def iniciar(self):
+        self._escuta.iniciar()
+
+    def parar(self):
+        self._escuta.parar()
+
+    def atual(self) -> Snapshot:
+        self.iniciar()
+        if not self.pronto:
+            return self._gerar(comprimir=False, anterior=None)
+
+        snapshot = self._snapshot
+        if self._vencido(snapshot):
+            with self._lock:
+                snapshot = self._snapshot
+                if self._vencido(snapshot):
+                    snapshot = self._regenerar_com_lock()
+        return snapshot
+
+    @staticmethod
+    def _vencido(snapshot: Optional[Snapshot]) -> bool:
+        return snapshot is None or (
+            snapshot.expira_em is not None and datetime.datetime.utcnow() > snapshot.expira_em
+        )
+
+    def _regenerar(self):
+        with self._lock:
+            self._regenerar_com_lock()
+
+    def _regenerar_com_lock(self) -> Snapshot:
+        self._snapshot = self._gerar(comprimir=True, anterior=self._snapshot)
+        return self._snapshot
+
+    def _gerar(self, comprimir: bool, anterior: Optional[Snapshot]) -> Snapshot:
+        agora = datetime.datetime.utcnow()
+        db = SessionLocal()
+        try:
+            linhas = (
+                db.query(*colunas(schemas.EventoOut, Evento))
+                .filter(Evento.fim_em >= agora)
+                .order_by(Evento.inicio_em)
+                .all()
+            )
+        finally:
+            db.close()
+
+        serializar = serializador(schemas.EventoOut)
+        corpo = orjson.dumps([serializar(linha) for linha in linhas], option=OPCOES_ORJSON)
+        corpos = {"identity": corpo}
+        if comprimir:
+            corpos["br"] = brotli.compress(corpo, quality=BROTLI_QUALIDADE)
+            corpos["gzip"] = gzip.compress(corpo, compresslevel=GZIP_NIVEL, mtime=0)
+
+        # ETag fraco: o mesmo para todas as codificações do mesmo conteúdo
+        etag = f'W/"{hashlib.sha256(corpo).hexdigest()[:16]}"'
+        if anterior is not None and anterior.versao.etag == etag:
+            modificado_em = anterior.versao.modificado_em
+        else:
+            modificado_em = agora
+
+        if comprimir:
+            logger.info(
+                f"Catálogo público gerado: {len(linhas)} eventos, "
+                f"{len(corpo)} bytes (br {len(corpos['br'])}, gzip {len(corpos['gzip'])})"
+            )
+        return Snapshot(
+            corpos,
+            Versao(etag, modificado_em),
+            min((linha.fim_em for linha in linhas), default=None)
+        )
@@ -0,0 +1,181 @@
+"""
+Renderização dos PDFs de certificado e armazenamento endereçado por conteúdo.
+
+O PDF é gerado sem dependências externas (fontes Type1 padrão, Helvetica)
+e de forma determinística: os mesmos dados geram os mesmos bytes, então o
+hash SHA256 do arquivo serve de nome, de ETag e evita arquivos duplicados.
+
+A renderização é CPU-bound e roda em um pool de processos (ver get_pdf_executor).
+"""
+import datetime
+import hashlib
+import os
+import tempfile
+import unicodedata
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+PDF_DIR = os.getenv("CERTIFICADOS_PDF_DIR", "storage/certificados")
+PDF_WORKERS = int(os.getenv("CERTIFICADOS_PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# A4 paisagem
+LARGURA, ALTURA = 842, 595
+
+# Larguras da Helvetica (AFM, unidades de 1/1000) para os caracteres 32..126.
+# Letras acentuadas usam a largura da letra base.
+_LARGURAS_HELVETICA = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+]
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_executor() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado para renderização (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+    return _executor
+
+
+def _largura_texto(texto: str, tamanho: float, negrito: bool = False) -> float:
+    total = 0
+    for ch in texto:
+        base = unicodedata.normalize("NFD", ch)[0]
+        codigo = ord(base)
+        total += _LARGURAS_HELVETICA[codigo - 32] if 32 <= codigo <= 126 else 556
+    # Helvetica-Bold é ligeiramente mais larga
+    return total * tamanho / 1000 * (1.05 if negrito else 1)
+
+
+def _quebrar_linhas(texto: str, tamanho: float, largura_max: float, negrito: bool = False) -> list[str]:
+    linhas, atual = [], ""
+    for palavra in texto.split():
+        candidata = f"{atual} {palavra}".strip()
+        if atual and _largura_texto(candidata, tamanho, negrito) > largura_max:
+            linhas.append(atual)
+            atual = palavra
+        else:
+            atual = candidata
+    if atual:
+        linhas.append(atual)
+    return linhas or [""]
+
+
+def _escapar(texto: str) -> bytes:
+    dados = texto.encode("cp1252", errors="replace")
+    return dados.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _texto_centralizado(texto: str, y: float, tamanho: float, negrito: bool = False) -> bytes:
+    x = (LARGURA - _largura_texto(texto, tamanho, negrito)) / 2
+    fonte = b"/F2" if negrito else b"/F1"
+    return b"BT %s %.1f Tf %.1f %.1f Td (%s) Tj ET\n" % (fonte, tamanho, x, y, _escapar(texto))
+
+
+def _formatar_data(valor: Optional[datetime.datetime]) -> Optional[str]:
+    return valor.strftime("%d/%m/%Y") if valor else None
+
+
+def renderizar_certificado_pdf(dados: dict) -> bytes:
+    """
+    Gera o PDF de um certificado.
+
+    dados: codigo, participante, evento, inicio_em, fim_em, emitido_em
+    """
+    conteudo = bytearray()
+
+    # Moldura
+    conteudo += b"0.15 0.25 0.45 RG 4 w 30 30 782 535 re S\n"
+    conteudo += b"1 w 40 40 762 515 re S\n0 0 0 rg\n"
+
+    conteudo += _texto_centralizado("CERTIFICADO", 470, 40, negrito=True)
+    conteudo += _texto_centralizado("Certificamos que", 410, 16)
+
+    y = 365
+    for linha in _quebrar_linhas(dados.get("participante") or "Participante", 28, 700, negrito=True):
+        conteudo += _texto_centralizado(linha, y, 28, negrito=True)
+        y -= 34
+
+    conteudo += _texto_centralizado("participou do evento", y - 6, 16)
+    y -= 50
+    for linha in _quebrar_linhas(dados.get("evento") or "", 22, 700, negrito=True):
+        conteudo += _texto_centralizado(linha, y, 22, negrito=True)
+        y -= 28
+
+    inicio = _formatar_data(dados.get("inicio_em"))
+    fim = _formatar_data(dados.get("fim_em"))
+    if inicio and fim and inicio != fim:
+        conteudo += _texto_centralizado(f"realizado de {inicio} a {fim}", y - 8, 14)
+    elif inicio:
+        conteudo += _texto_centralizado(f"realizado em {inicio}", y - 8, 14)
+
+    emitido = _formatar_data(dados.get("emitido_em"))
+    rodape = f"Código de verificação: {dados['codigo']}"
+    if emitido:
+        rodape += f"  -  Emitido em {emitido}"
+    conteudo += _texto_centralizado(rodape, 60, 10)
+
+    stream = zlib.compress(bytes(conteudo), 9)
+
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+        b"/Resources << /Font << /F1 4 0 R /F2 5 0 R >> >> /Contents 6 0 R >>" % (LARGURA, ALTURA),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>",
+        b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream" % (len(stream), stream),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for numero, objeto in enumerate(objetos, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (numero, objeto)
+
+    inicio_xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+
+    return bytes(pdf)
+
+
+def caminho_absoluto(caminho_pdf: str) -> str:
+    """Converte o caminho relativo salvo em Certificado.caminho_pdf em absoluto"""
+    return os.path.join(PDF_DIR, caminho_pdf)
+
+
+def etag_pdf(caminho_pdf: str) -> str:
+    """ETag do PDF: o próprio hash do conteúdo (nome do arquivo)"""
+    return f'"{os.path.splitext(os.path.basename(caminho_pdf))[0]}"'
+
+
+def salvar_certificado_pdf(dados: dict) -> str:
+    """
+    Renderiza o certificado e grava no armazenamento endereçado por conteúdo.
+    Roda dentro do pool de processos. Retorna o caminho relativo
+    (valor de Certificado.caminho_pdf).
+    """
+    pdf = renderizar_certificado_pdf(dados)
+    digest = hashlib.sha256(pdf).hexdigest()
+    caminho = os.path.join(digest[:2], f"{digest}.pdf")
+    destino = caminho_absoluto(caminho)
+
+    if not os.path.exists(destino):
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        # Escrita atômica: outro processo pode estar gerando o mesmo arquivo
+        fd, temporario = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(pdf)
+        os.replace(temporario, destino)
+
+    return caminho
@@ -0,0 +1,92 @@
+"""
+Códigos legíveis sem colisão, alocados em blocos de uma sequência do banco.
+
+Cada processo reserva um bloco de números com um único nextval (a
+sequência anda TAMANHO_BLOCO por chamada) e distribui os números do bloco
+localmente, então gerar um código não custa ida ao banco e dois processos
+nunca recebem o mesmo número. Números de um bloco não usado (ex.: processo
+reiniciado) são apenas pulados.
+
+O número vira texto em Base32 Crockford (sem I, L, O, U; leitura tolerante
+a minúsculas e a I/L -> 1, O -> 0) seguido de um dígito verificador Luhn
+mod 32, que detecta qualquer caractere trocado e a maioria das
+transposições de vizinhos — dá para recusar um código digitado errado sem
+consultar o banco (ver codigo_valido).
+"""
+import os
+import threading
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.shared.core.database import engine
+
+ALFABETO = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_VALOR = {c: i for i, c in enumerate(ALFABETO)}
+_VALOR.update({"I": 1, "L": 1, "O": 0})
+
+# Igual ao INCREMENT BY das sequências (migração 0005): não alterar
+TAMANHO_BLOCO = 1000
+
+
+def _luhn32(digitos: str) -> str:
+    """Dígito verificador Luhn mod 32 dos caracteres (já normalizados)"""
+    soma, fator = 0, 2
+    for c in reversed(digitos):
+        v = _VALOR[c] * fator
+        soma += v // 32 + v % 32
+        fator = 3 - fator
+    return ALFABETO[-soma % 32]
+
+
+def codificar(numero: int, tamanho: int) -> str:
+    """Número em Base32 com `tamanho` caracteres, mais o dígito verificador"""
+    if not 0 <= numero < 32 ** tamanho:
+        raise ValueError("Número fora do intervalo do código")
+    digitos = ""
+    for _ in range(tamanho):
+        numero, resto = divmod(numero, 32)
+        digitos = ALFABETO[resto] + digitos
+    return digitos + _luhn32(digitos)
+
+
+def normalizar(codigo: str) -> Optional[str]:
+    """Forma canônica (maiúsculas, sem hífens, I/L/O trocados), ou None se houver caractere inválido"""
+    codigo = codigo.replace("-", "").upper()
+    if any(c not in _VALOR for c in codigo):
+        return None
+    return "".join(ALFABETO[_VALOR[c]] for c in codigo)
+
+
+def codigo_valido(codigo: str) -> bool:
+    """Confere o dígito verificador (sem acessar o banco)"""
+    codigo = normalizar(codigo)
+    return bool(codigo) and len(codigo) > 1 and _luhn32(codigo[:-1]) == codigo[-1]
+
+
+class AlocadorSequencia:
+    """
+    Entrega números únicos de uma sequência do Postgres, reservando
+    TAMANHO_BLOCO por vez. Thread-safe; após um fork o bloco herdado é
+    descartado, então cada worker reserva o seu.
+    """
+
+    def __init__(self, sequencia: str):
+        self.sequencia = sequencia
+        self._lock = threading.Lock()
+        self._proximo = 0
+        self._fim = 0
+        self._pid = None
+
+    def _reservar(self):
+        with engine.connect() as conn:
+            inicio = conn.execute(text(f"SELECT nextval('{self.sequencia}')")).scalar_one()
+        self._proximo, self._fim, self._pid = inicio, inicio + TAMANHO_BLOCO, os.getpid()
+
+    def proximo(self) -> int:
+        with self._lock:
+            if self._proximo >= self._fim or self._pid != os.getpid():
+                self._reservar()
+            numero = self._proximo
+            self._proximo += 1
+            return numero
@@ -1,6 +1,6 @@
 import os
 import httpx
-from typing import Dict, Any, Literal
+from typing import Dict, Any, Literal, Iterable, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -8,7 +8,14 @@ logger = logging.getLogger(__name__)
 EMAIL_SERVICE_URL = os.getenv("EMAIL_SERVICE_URL")
 EMAIL_API_KEY = os.getenv("EMAIL_API_KEY", "")
 
-TemplateType = Literal["inscricao", "cancelamento", "checkin"]
+TemplateType = Literal["inscricao", "cancelamento", "checkin", "cadastro_rapido"]
+
+SUBJECTS = {
+    "inscricao": "Inscrição confirmada",
+    "cancelamento": "Inscrição cancelada",
+    "checkin": "Presença registrada",
+    "cadastro_rapido": "Complete seu cadastro"
+}
 
 
 def enviar_email_sync(
@@ -20,13 +27,7 @@ def enviar_email_sync(
     Versão síncrona do envio de email.
     """
     
-    subjects = {
-        "inscricao": "Inscrição confirmada",
-        "cancelamento": "Inscrição cancelada",
-        "checkin": "Presença registrada"
-    }
-    
-    subject = subjects.get(template, "Notificação")
+    subject = SUBJECTS.get(template, "Notificação")
     
     payload = {
         "to": to,
@@ -65,4 +66,44 @@ def enviar_email_sync(
         return False
     except Exception as e:
         logger.error(f"Erro ao enviar email para {to}: {str(e)}")
-        return False
\ No newline at end of file
+        return False
+
+
+def enviar_emails_lote_sync(
+    destinatarios: Iterable[Tuple[str, Dict[str, Any]]],
+    template: TemplateType
+) -> int:
+    """
+    Envia vários emails do mesmo template reaproveitando uma única conexão
+    HTTP com o serviço de email. Pensado para rodar em background
+    (ex.: importação de inscrições). Falhas individuais são apenas logadas.
+    
+    Retorna quantos emails foram enviados com sucesso.
+    """
+    subject = SUBJECTS.get(template, "Notificação")
+    headers = {
+        "x-api-key": EMAIL_API_KEY,
+        "Content-Type": "application/json"
+    }
+    
+    enviados = 0
+    with httpx.Client(base_url=EMAIL_SERVICE_URL or "", headers=headers, timeout=10.0) as client:
+        for to, data in destinatarios:
+            try:
+                response = client.post(
+                    "/email/send",
+                    json={"to": to, "subject": subject, "template": template, "data": data}
+                )
+                if response.status_code == 200:
+                    enviados += 1
+                else:
+                    logger.error(
+                        f"Falha ao enviar email para {to}. "
+                        f"Status: {response.status_code}, "
+                        f"Response: {response.text}"
+                    )
+            except Exception as e:
+                logger.error(f"Erro ao enviar email para {to}: {str(e)}")
+    
+    logger.info(f"Lote de emails ({template}): {enviados} enviados")
+    return enviados
@@ -0,0 +1,210 @@
+import base64
+import datetime
+import hashlib
+import hmac
+import os
+import re
+import struct
+from typing import NamedTuple, Optional
+from uuid import UUID, uuid4
+
+from app.shared.core.config import settings
+from app.shared.helpers.codigo_helper import AlocadorSequencia, codificar, codigo_valido, normalizar
+
+# Token assinado: "T1." + base64url(ingresso_id | evento_id | expira_em | versao | assinatura)
+# Verificável sem banco por quem tem a chave do evento (ver chave_evento).
+# A versão muda a cada emissão do ingresso: as anteriores são revogadas.
+PREFIXO_TOKEN_ASSINADO = "T1."
+_FORMATO_PAYLOAD = ">16s16sII"  # ingresso_id, evento_id, expiração (epoch, segundos), versão
+_TAMANHO_PAYLOAD = struct.calcsize(_FORMATO_PAYLOAD)
+_TAMANHO_ASSINATURA = 16  # HMAC-SHA256 truncado em 128 bits
+
+TOKEN_CHAVE_MESTRA = os.getenv("INGRESSOS_TOKEN_CHAVE", settings.SECRET_KEY).encode()
+TOKEN_ASSINADO_PADRAO = os.getenv("INGRESSOS_TOKEN_ASSINADO", "false").lower() in ("1", "true")
+# Validade do token após o fim do evento (ou após a emissão, se o evento não tem fim)
+TOKEN_MARGEM_FIM = datetime.timedelta(days=1)
+TOKEN_VALIDADE_SEM_FIM = datetime.timedelta(days=365)
+
+
+PREFIXO_CODIGO = "ING-"
+TAMANHO_CODIGO = 8  # caracteres Base32, sem o dígito verificador
+_MASCARA_CODIGO = (1 << 5 * TAMANHO_CODIGO) - 1
+_CODIGO_ANTIGO = re.compile(r"[0-9A-Fa-f]{8}")
+_alocador_codigos = AlocadorSequencia("ingressos_codigo_seq")
+
+
+class TokenIngressoInvalido(ValueError):
+    """Token assinado malformado ou com assinatura inválida"""
+
+
+class TokenIngressoExpirado(TokenIngressoInvalido):
+    """Token assinado válido, mas fora da validade"""
+
+
+class TokenIngresso(NamedTuple):
+    ingresso_id: UUID
+    evento_id: UUID
+    expira_em: datetime.datetime
+    versao: int
+
+
+def _embaralhar(numero: int) -> int:
+    """
+    Bijeção em 40 bits: números consecutivos viram códigos sem ordem
+    aparente (continuam únicos; não é segredo, o token QR é a credencial)
+    """
+    x = (numero * 0x9E3779B97F) & _MASCARA_CODIGO
+    x ^= x >> 20
+    return (x * 0xC2B2AE3D27) & _MASCARA_CODIGO
+
+
+def gerar_codigo_ingresso() -> str:
+    """
+    Código do ingresso no formato ING-XXXXXXXXC: 8 caracteres Base32
+    (40 bits, de uma sequência alocada em blocos, ver codigo_helper) e o
+    dígito verificador C. Códigos antigos (ING- + 8 hex) continuam válidos.
+    """
+    return PREFIXO_CODIGO + codificar(_embaralhar(_alocador_codigos.proximo()), TAMANHO_CODIGO)
+
+
+def codigo_ingresso_valido(codigo: str) -> bool:
+    """
+    Confere o formato e o dígito verificador do código, sem acessar o banco.
+    Códigos antigos (sem dígito verificador) só têm o formato conferido.
+    """
+    if not codigo.upper().startswith(PREFIXO_CODIGO):
+        return False
+    corpo = codigo[len(PREFIXO_CODIGO):]
+    if _CODIGO_ANTIGO.fullmatch(corpo):
+        return True
+    return len(corpo.replace("-", "")) == TAMANHO_CODIGO + 1 and codigo_valido(corpo)
+
+
+def normalizar_codigo_ingresso(codigo: str) -> str:
+    """Forma gravada no banco (aceita minúsculas e I/L/O digitados no lugar de 1/0)"""
+    corpo = codigo[len(PREFIXO_CODIGO):]
+    if _CODIGO_ANTIGO.fullmatch(corpo):
+        return PREFIXO_CODIGO + corpo.upper()
+    return PREFIXO_CODIGO + (normalizar(corpo) or corpo)
+
+
+def gerar_token_qr(codigo: str, inscricao_id: UUID) -> str:
+    """Token QR do ingresso (hash SHA256 do código + inscrição)"""
+    return hashlib.sha256(f"{codigo}-{inscricao_id}".encode()).hexdigest()
+
+
+def chave_evento(evento_id: UUID) -> bytes:
+    """
+    Chave HMAC dos tokens de um evento, derivada da chave mestra.
+    Pode ser entregue aos dispositivos da portaria do evento sem expor
+    a chave mestra nem a de outros eventos.
+    """
+    return hmac.new(TOKEN_CHAVE_MESTRA, b"ingresso-evento:" + evento_id.bytes, hashlib.sha256).digest()
+
+
+def _assinar(chave: bytes, payload: bytes) -> bytes:
+    return hmac.new(chave, payload, hashlib.sha256).digest()[:_TAMANHO_ASSINATURA]
+
+
+def gerar_token_assinado(
+    ingresso_id: UUID,
+    evento_id: UUID,
+    expira_em: datetime.datetime,
+    versao: int = 1
+) -> str:
+    """Token QR assinado com a chave do evento (expira_em em UTC)"""
+    expira = int(expira_em.replace(tzinfo=datetime.timezone.utc).timestamp())
+    payload = struct.pack(_FORMATO_PAYLOAD, ingresso_id.bytes, evento_id.bytes, expira, versao)
+    dados = payload + _assinar(chave_evento(evento_id), payload)
+    return PREFIXO_TOKEN_ASSINADO + base64.urlsafe_b64encode(dados).decode().rstrip("=")
+
+
+def token_assinado(token_qr: str) -> bool:
+    return token_qr.startswith(PREFIXO_TOKEN_ASSINADO)
+
+
+def ler_token_assinado(token_qr: str, chave: Optional[bytes] = None) -> TokenIngresso:
+    """
+    Verifica a assinatura de um token assinado e retorna seus campos, sem
+    conferir a validade (ex.: a versão do token gravado, para revogá-lo).
+    chave: chave do evento (padrão: derivada da chave mestra).
+
+    Lança TokenIngressoInvalido.
+    """
+    if not token_assinado(token_qr):
+        raise TokenIngressoInvalido("Formato de token desconhecido")
+
+    corpo = token_qr[len(PREFIXO_TOKEN_ASSINADO):]
+    try:
+        dados = base64.urlsafe_b64decode(corpo + "=" * (-len(corpo) % 4))
+    except ValueError:
+        raise TokenIngressoInvalido("Token malformado")
+
+    if len(dados) != _TAMANHO_PAYLOAD + _TAMANHO_ASSINATURA:
+        raise TokenIngressoInvalido("Token malformado")
+
+    payload, assinatura = dados[:_TAMANHO_PAYLOAD], dados[_TAMANHO_PAYLOAD:]
+    ingresso_id, evento_id, expira, versao = struct.unpack(_FORMATO_PAYLOAD, payload)
+    evento_id = UUID(bytes=evento_id)
+
+    if not hmac.compare_digest(assinatura, _assinar(chave or chave_evento(evento_id), payload)):
+        raise TokenIngressoInvalido("Assinatura inválida")
+
+    return TokenIngresso(UUID(bytes=ingresso_id), evento_id, datetime.datetime.utcfromtimestamp(expira), versao)
+
+
+def verificar_token_assinado(token_qr: str, chave: Optional[bytes] = None) -> TokenIngresso:
+    """
+    Verifica assinatura e validade de um token assinado, sem acessar o banco.
+    chave: chave do evento (padrão: derivada da chave mestra).
+
+    Só a versão atual do token (a gravada no ingresso) é aceita: quem tem o
+    banco compara o token inteiro; a portaria offline, a versão com a lista
+    de revogação.
+
+    Lança TokenIngressoInvalido / TokenIngressoExpirado.
+    """
+    token = ler_token_assinado(token_qr, chave)
+    if token.expira_em < datetime.datetime.utcnow():
+        raise TokenIngressoExpirado("Token expirado")
+    return token
+
+
+def expiracao_token(fim_evento: Optional[datetime.datetime]) -> datetime.datetime:
+    """Validade do token assinado de um ingresso do evento"""
+    if fim_evento:
+        return fim_evento + TOKEN_MARGEM_FIM
+    return datetime.datetime.utcnow() + TOKEN_VALIDADE_SEM_FIM
+
+
+def dados_novo_ingresso(
+    inscricao_id: UUID,
+    evento_id: UUID,
+    fim_evento: Optional[datetime.datetime] = None,
+    assinado: Optional[bool] = None
+) -> dict:
+    """
+    Gera os campos de um novo ingresso.
+    Usado tanto para Ingresso(**dados) quanto para inserts em lote.
+
+    assinado: token QR assinado (verificável offline) em vez do hash;
+    padrão definido por INGRESSOS_TOKEN_ASSINADO.
+    """
+    if assinado is None:
+        assinado = TOKEN_ASSINADO_PADRAO
+
+    ingresso_id = uuid4()
+    codigo = gerar_codigo_ingresso()
+    token = (
+        gerar_token_assinado(ingresso_id, evento_id, expiracao_token(fim_evento))
+        if assinado else gerar_token_qr(codigo, inscricao_id)
+    )
+    return {
+        "id": ingresso_id,
+        "inscricao_id": inscricao_id,
+        "evento_id": evento_id,
+        "codigo_ingresso": codigo,
+        "token_qr": token,
+        "status": "emitido",
+        "emitido_em": datetime.datetime.utcnow()
+    }
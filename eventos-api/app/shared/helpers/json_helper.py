@@ -0,0 +1,55 @@
+"""
+Serialização JSON das respostas com orjson.
+
+RespostaJSON é a classe de resposta padrão dos serviços (ver
+add_common_middlewares): orjson serializa UUID e datetime nativamente e é
+bem mais rápido que o json da biblioteca padrão.
+
+Nas listagens grandes, o caminho padrão do FastAPI valida cada objeto
+contra o response_model e depois o converte de novo para JSON. Para
+linhas vindas do banco (já confiáveis) isso é trabalho repetido: aqui cada
+schema vira, uma única vez, um serializador que só lê os atributos dos
+campos do schema, e a rota devolve a resposta pronta. O response_model
+continua na rota para a documentação.
+"""
+from functools import lru_cache
+from operator import attrgetter
+from typing import Callable, Iterable, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+OPCOES_ORJSON = orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z
+
+
+class RespostaJSON(JSONResponse):
+    """JSONResponse serializada com orjson"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=OPCOES_ORJSON)
+
+
+@lru_cache(maxsize=None)
+def serializador(schema: type[BaseModel]) -> Callable[[object], dict]:
+    """Função objeto -> dict com os campos do schema, sem validação (compilada uma vez por schema)"""
+    campos = tuple(schema.model_fields)
+    ler = attrgetter(*campos)
+    if len(campos) == 1:
+        return lambda linha: {campos[0]: ler(linha)}
+    return lambda linha: dict(zip(campos, ler(linha)))
+
+
+def colunas(schema: type[BaseModel], modelo) -> list:
+    """Colunas do modelo correspondentes aos campos do schema, para db.query(*colunas(...))"""
+    return [getattr(modelo, campo) for campo in schema.model_fields]
+
+
+def resposta_lista(schema: type[BaseModel], linhas: Iterable, headers: Optional[dict] = None) -> RespostaJSON:
+    """
+    Resposta com a lista de linhas serializadas pelo schema. As linhas
+    (objetos ORM ou Rows de db.query(*colunas(...))) não são validadas:
+    usar só com dados do banco.
+    """
+    serializar = serializador(schema)
+    return RespostaJSON([serializar(linha) for linha in linhas], headers=headers)
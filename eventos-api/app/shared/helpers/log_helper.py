@@ -0,0 +1,27 @@
+"""
+Logging amostrado para caminhos de alto volume.
+
+Registros de WARNING para cima passam sempre; DEBUG/INFO passam apenas
+em uma fração das requisições, para não custar I/O em cada chamada.
+"""
+import logging
+import random
+
+
+class FiltroAmostragem(logging.Filter):
+    """Deixa passar só uma fração (taxa, 0..1) dos registros abaixo de WARNING"""
+
+    def __init__(self, taxa: float):
+        super().__init__()
+        self.taxa = taxa
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.taxa
+
+
+def get_logger_amostrado(nome: str, taxa: float) -> logging.Logger:
+    """Logger com FiltroAmostragem (o filtro é adicionado uma única vez)"""
+    logger = logging.getLogger(nome)
+    if not any(isinstance(f, FiltroAmostragem) for f in logger.filters):
+        logger.addFilter(FiltroAmostragem(taxa))
+    return logger
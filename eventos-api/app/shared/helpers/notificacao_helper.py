@@ -0,0 +1,84 @@
+"""
+Escuta de canais do Postgres (LISTEN/NOTIFY) em uma thread.
+
+Usada para manter estado em memória (índices, conexões da portaria)
+atualizado com alterações feitas por outros serviços/instâncias.
+"""
+import logging
+import select
+import threading
+from typing import Callable, Optional
+
+from app.shared.core.database import engine
+
+logger = logging.getLogger(__name__)
+
+
+class EscutaNotificacoes:
+    """
+    Escuta um canal e entrega os payloads recebidos, agrupados (sem
+    repetição), para ao_receber. ao_conectar roda a cada (re)conexão,
+    logo após o LISTEN: como notificações perdidas durante a queda não são
+    reenviadas, é o ponto para recarregar o estado.
+    """
+
+    def __init__(
+        self,
+        canal: str,
+        ao_receber: Callable[[set[str]], None],
+        ao_conectar: Optional[Callable[[], None]] = None,
+        intervalo_reconexao: float = 5.0
+    ):
+        self.canal = canal
+        self.ao_receber = ao_receber
+        self.ao_conectar = ao_conectar
+        self.intervalo_reconexao = intervalo_reconexao
+        self.conectado = False
+        self._parar = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def iniciar(self):
+        if self._thread is None:
+            self._parar.clear()
+            self._thread = threading.Thread(target=self._executar, name=f"escuta-{self.canal}", daemon=True)
+            self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+        self.conectado = False
+        self._thread = None
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self._escutar()
+            except Exception as e:
+                logger.warning(f"Escuta do canal {self.canal} desconectada: {e}")
+            self.conectado = False
+            self._parar.wait(self.intervalo_reconexao)
+
+    def _escutar(self):
+        conexao = engine.raw_connection()
+        conexao.detach()  # LISTEN/autocommit: a conexão não volta para o pool
+
+        try:
+            pg = conexao.dbapi_connection
+            pg.autocommit = True
+            with pg.cursor() as cursor:
+                cursor.execute(f"LISTEN {self.canal}")
+
+            if self.ao_conectar:
+                self.ao_conectar()
+            self.conectado = True
+
+            while not self._parar.is_set():
+                if select.select([pg], [], [], self.intervalo_reconexao) == ([], [], []):
+                    continue
+
+                pg.poll()
+                payloads = {n.payload for n in pg.notifies}
+                pg.notifies.clear()
+                if payloads:
+                    self.ao_receber(payloads)
+        finally:
+            conexao.close()
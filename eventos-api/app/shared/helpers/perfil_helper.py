@@ -0,0 +1,134 @@
+"""
+Dados de perfil no token de acesso (nome, email, papel + versão).
+
+O CPF não entra no token nem na versão: o payload do JWT é legível por
+quem vê o token, e um hash de poucos campos conhecidos mais um CPF se
+reverte por força bruta. /me lê o CPF do banco quando ele é pedido.
+
+A versão (pv) é um hash dos campos do perfil: serve de ETag e indica se os
+dados do token ainda são os atuais. Para saber isso sem consultar o banco,
+VersoesPerfil guarda a versão atual dos usuários alterados recentemente,
+avisada pelo trigger do canal "perfil" (migração 0008). Só alterações mais
+novas que a validade de um token de acesso importam: tokens anteriores a
+elas já expiraram.
+"""
+import datetime
+import hashlib
+import logging
+import threading
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app.shared.core.database import SessionLocal
+from app.shared.helpers.notificacao_helper import EscutaNotificacoes
+from app.shared.models.usuario import Usuario
+
+CANAL = "perfil"
+
+logger = logging.getLogger(__name__)
+
+
+def versao_perfil(usuario_id, nome, email, papel) -> str:
+    dados = f"{usuario_id}|{nome}|{email}|{papel or ''}"
+    return hashlib.sha256(dados.encode()).hexdigest()[:16]
+
+
+def versao_com_cpf(versao: str, cpf: Optional[str]) -> str:
+    """Versão de uma resposta de /me que inclui o CPF (só vai para o próprio usuário)"""
+    return f"{versao}-{hashlib.sha256((cpf or '').encode()).hexdigest()[:8]}"
+
+
+def perfil(usuario) -> dict:
+    """Resposta de /me (sem CPF) a partir de um Usuario (ou linha com os mesmos campos)"""
+    return {
+        "id": str(usuario.id),
+        "nome": usuario.nome,
+        "email": usuario.email,
+        "papel": usuario.papel
+    }
+
+
+def claims_perfil(usuario) -> dict:
+    """Claims de perfil para o token de acesso"""
+    return {
+        "nome": usuario.nome,
+        "email": usuario.email,
+        "pv": versao_perfil(usuario.id, usuario.nome, usuario.email, usuario.papel)
+    }
+
+
+def perfil_dos_claims(payload: dict) -> Optional[dict]:
+    """Resposta de /me montada só com o token (None se ele não tem os claims)"""
+    if "pv" not in payload:
+        return None
+    return {
+        "id": payload["sub"],
+        "nome": payload.get("nome"),
+        "email": payload.get("email"),
+        "papel": payload.get("role")
+    }
+
+
+class VersoesPerfil:
+    """Versão atual dos perfis alterados na janela de validade dos tokens"""
+
+    def __init__(self, janela: datetime.timedelta, intervalo_reconexao: float = 5.0):
+        self.janela = janela
+        self._versoes: dict[str, tuple[str, datetime.datetime]] = {}
+        self._lock = threading.Lock()
+        self._escuta = EscutaNotificacoes(
+            CANAL,
+            self._aplicar,
+            ao_conectar=self._recarregar,
+            intervalo_reconexao=intervalo_reconexao
+        )
+
+    @property
+    def pronto(self) -> bool:
+        return self._escuta.conectado
+
+    def iniciar(self):
+        self._escuta.iniciar()
+
+    def parar(self):
+        self._escuta.parar()
+
+    def atual(self, payload: dict) -> bool:
+        """A versão de perfil do token é a atual? (False se não dá para saber sem o banco)"""
+        self.iniciar()
+        if not self.pronto or "pv" not in payload:
+            return False
+        registro = self._versoes.get(payload["sub"])
+        return registro is None or registro[0] == payload["pv"]
+
+    def _ler(self, db: Session, *filtros) -> dict[str, tuple[str, datetime.datetime]]:
+        agora = datetime.datetime.utcnow()
+        linhas = db.query(
+            Usuario.id, Usuario.nome, Usuario.email, Usuario.papel
+        ).filter(*filtros).all()
+        return {str(u.id): (versao_perfil(*u), agora) for u in linhas}
+
+    def _podar(self, versoes: dict) -> dict:
+        limite = datetime.datetime.utcnow() - self.janela
+        return {k: v for k, v in versoes.items() if v[1] > limite}
+
+    def _recarregar(self):
+        db = SessionLocal()
+        try:
+            desde = datetime.datetime.utcnow() - self.janela
+            versoes = self._ler(db, Usuario.atualizado_em > desde)
+        finally:
+            db.close()
+        with self._lock:
+            self._versoes = versoes
+
+    def _aplicar(self, payloads: set[str]):
+        db = SessionLocal()
+        try:
+            versoes = self._ler(db, Usuario.id.in_([UUID(p) for p in payloads]))
+        finally:
+            db.close()
+        with self._lock:
+            self._versoes = {**self._podar(self._versoes), **versoes}
@@ -0,0 +1,189 @@
+"""
+Índice em memória dos ingressos de eventos em modo portaria.
+
+Eventos com modo_portaria ativo (e ainda não encerrados) têm todos os seus
+ingressos carregados em um dicionário token_qr -> EntradaPortaria, para a
+validação na entrada ser respondida sem ir ao banco.
+
+O índice se mantém atualizado pelo canal "portaria" (LISTEN/NOTIFY, ver
+migração 0003): os triggers avisam quais inscrições tiveram o ingresso ou
+o check-in alterado, e o índice relê só essas linhas (ver
+notificacao_helper). Enquanto a escuta não está ativa (pronto=False), o
+índice não responde e a validação usa o banco.
+"""
+import datetime
+import logging
+import threading
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+from sqlalchemy import exists, or_
+from sqlalchemy.orm import Session
+
+from app.shared.core.database import SessionLocal
+from app.shared.helpers.notificacao_helper import EscutaNotificacoes
+from app.shared.models.checkin import Checkin
+from app.shared.models.evento import Evento
+from app.shared.models.ingresso import Ingresso
+
+CANAL = "portaria"
+TAMANHO_LOTE = 1000
+
+logger = logging.getLogger(__name__)
+
+
+class EntradaPortaria(NamedTuple):
+    ingresso_id: UUID
+    inscricao_id: UUID
+    evento_id: UUID
+    codigo: str
+    status: str
+    emitido_em: datetime.datetime
+    checkin: bool
+
+
+def _evento_ativo():
+    """Filtro dos eventos cujos ingressos ficam no índice"""
+    return (
+        Evento.modo_portaria.is_(True),
+        or_(Evento.fim_em.is_(None), Evento.fim_em > datetime.datetime.utcnow())
+    )
+
+
+def _consultar(db: Session, *filtros) -> Iterable[tuple[str, EntradaPortaria]]:
+    linhas = (
+        db.query(
+            Ingresso.token_qr,
+            Ingresso.id,
+            Ingresso.inscricao_id,
+            Ingresso.evento_id,
+            Ingresso.codigo_ingresso,
+            Ingresso.status,
+            Ingresso.emitido_em,
+            exists().where(Checkin.inscricao_id == Ingresso.inscricao_id)
+        )
+        .join(Evento, Evento.id == Ingresso.evento_id)
+        .filter(*_evento_ativo(), Ingresso.token_qr.isnot(None), *filtros)
+        .yield_per(TAMANHO_LOTE)
+    )
+    for token, *campos in linhas:
+        yield token, EntradaPortaria(*campos)
+
+
+class IndicePortaria:
+    """Índice token_qr -> ingresso, atualizado por LISTEN/NOTIFY em uma thread"""
+
+    def __init__(self, intervalo_reconexao: float = 5.0):
+        self.eventos: set[UUID] = set()
+        self._por_token: dict[str, EntradaPortaria] = {}
+        self._token_por_inscricao: dict[UUID, str] = {}
+        self._lock = threading.Lock()
+        self._escuta = EscutaNotificacoes(
+            CANAL,
+            self._aplicar,
+            ao_conectar=self._recarregar,
+            intervalo_reconexao=intervalo_reconexao
+        )
+
+    def __len__(self) -> int:
+        return len(self._por_token)
+
+    def obter(self, token_qr: str) -> Optional[EntradaPortaria]:
+        """Entrada do token, ou None se não estiver no índice (ou ele não estiver pronto)"""
+        if not self.pronto:
+            return None
+        return self._por_token.get(token_qr)
+
+    # ESCRITA
+
+    def _adicionar(self, token: str, entrada: EntradaPortaria):
+        self._por_token[token] = entrada
+        self._token_por_inscricao[entrada.inscricao_id] = token
+
+    def _remover_inscricao(self, inscricao_id: UUID):
+        token = self._token_por_inscricao.pop(inscricao_id, None)
+        if token is not None:
+            self._por_token.pop(token, None)
+
+    def carregar(self, db: Session):
+        """Recarrega o índice inteiro (troca os dicionários de uma vez)"""
+        por_token, token_por_inscricao = {}, {}
+        for token, entrada in _consultar(db):
+            por_token[token] = entrada
+            token_por_inscricao[entrada.inscricao_id] = token
+        eventos = {id_ for (id_,) in db.query(Evento.id).filter(*_evento_ativo())}
+
+        with self._lock:
+            self._por_token = por_token
+            self._token_por_inscricao = token_por_inscricao
+            self.eventos = eventos
+
+        logger.info(f"Índice da portaria carregado: {len(eventos)} eventos, {len(por_token)} ingressos")
+
+    def carregar_evento(self, db: Session, evento_id: UUID):
+        """Carrega (ou remove, se não estiver mais ativo) os ingressos de um evento"""
+        ativo = db.query(Evento.id).filter(Evento.id == evento_id, *_evento_ativo()).first() is not None
+        entradas = list(_consultar(db, Ingresso.evento_id == evento_id)) if ativo else []
+
+        with self._lock:
+            for inscricao_id in [e.inscricao_id for e in self._por_token.values() if e.evento_id == evento_id]:
+                self._remover_inscricao(inscricao_id)
+            for token, entrada in entradas:
+                self._adicionar(token, entrada)
+            if ativo:
+                self.eventos.add(evento_id)
+            else:
+                self.eventos.discard(evento_id)
+
+    def atualizar_inscricoes(self, db: Session, inscricoes_ids: list[UUID]):
+        """Relê do banco os ingressos das inscrições informadas"""
+        for i in range(0, len(inscricoes_ids), TAMANHO_LOTE):
+            lote = inscricoes_ids[i:i + TAMANHO_LOTE]
+            entradas = list(_consultar(db, Ingresso.inscricao_id.in_(lote)))
+
+            with self._lock:
+                for inscricao_id in lote:
+                    self._remover_inscricao(inscricao_id)
+                for token, entrada in entradas:
+                    self._adicionar(token, entrada)
+
+    def atualizar_status(self, token_qr: str, status: str):
+        """Write-through de uma mudança de status feita por este processo"""
+        with self._lock:
+            entrada = self._por_token.get(token_qr)
+            if entrada is not None:
+                self._por_token[token_qr] = entrada._replace(status=status)
+
+    # ESCUTA (LISTEN/NOTIFY)
+
+    @property
+    def pronto(self) -> bool:
+        return self._escuta.conectado
+
+    def iniciar(self):
+        """Inicia a thread que carrega o índice e escuta as notificações"""
+        self._escuta.iniciar()
+
+    def parar(self):
+        self._escuta.parar()
+
+    def _recarregar(self):
+        # Roda logo após o LISTEN: o que mudar durante a carga chega como notificação
+        db = SessionLocal()
+        try:
+            self.carregar(db)
+        finally:
+            db.close()
+
+    def _aplicar(self, payloads: set[str]):
+        eventos = [UUID(p[2:]) for p in payloads if p.startswith("e:")]
+        inscricoes = [UUID(p[2:]) for p in payloads if p.startswith("i:")]
+
+        db = SessionLocal()
+        try:
+            for evento_id in eventos:
+                self.carregar_evento(db, evento_id)
+            if inscricoes:
+                self.atualizar_inscricoes(db, inscricoes)
+        finally:
+            db.close()
@@ -0,0 +1,61 @@
+"""
+Renderização dos QR codes dos ingressos (PNG e SVG), com segno.
+
+A imagem depende apenas do token e dos parâmetros abaixo, então o ETag é
+calculado sem renderizar. A renderização em lote roda em um pool de
+processos (ver get_qr_executor).
+"""
+import hashlib
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import segno
+
+QR_WORKERS = int(os.getenv("INGRESSOS_QR_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# Alterar estes parâmetros muda as imagens: incremente QR_VERSAO para invalidar os ETags
+QR_VERSAO = 1
+QR_ESCALA = 8
+QR_BORDA = 4
+QR_CORRECAO = "m"
+
+MEDIA_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_qr_executor() -> ProcessPoolExecutor:
+    """Pool de processos compartilhado para renderização (criado sob demanda)"""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=QR_WORKERS)
+    return _executor
+
+
+def renderizar_qr(token: str, formato: str = "png") -> bytes:
+    """Imagem do QR code do token ("png" ou "svg")"""
+    qr = segno.make(token, error=QR_CORRECAO, micro=False)
+    saida = io.BytesIO()
+    if formato == "svg":
+        qr.save(saida, kind="svg", scale=QR_ESCALA, border=QR_BORDA, xmldecl=False)
+    else:
+        qr.save(saida, kind="png", scale=QR_ESCALA, border=QR_BORDA)
+    return saida.getvalue()
+
+
+def renderizar_qr_png(token: str) -> bytes:
+    """renderizar_qr em PNG (função de módulo, para o pool de processos)"""
+    return renderizar_qr(token, "png")
+
+
+def renderizar_qr_svg(token: str) -> bytes:
+    """renderizar_qr em SVG (função de módulo, para o pool de processos)"""
+    return renderizar_qr(token, "svg")
+
+
+def etag_qr(token: str, formato: str) -> str:
+    """ETag da imagem, sem precisar renderizá-la"""
+    digest = hashlib.sha256(f"{QR_VERSAO}|{formato}|{token}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
@@ -0,0 +1,180 @@
+"""
+Filtro em memória das revogações de tokens de acesso.
+
+Cada processo mantém em dicionários as linhas ainda válidas de
+tokens_revogados: jti -> expiração e usuario_id -> instante da revogação
+(tokens emitidos até ali ficam inválidos). As linhas valem só enquanto os
+tokens que cobrem não expiraram, então a tabela e os dicionários ficam
+pequenos (menores ainda com tokens de acesso curtos).
+
+A carga completa roda a cada (re)conexão da escuta do canal "revogacao"
+(migração 0007); cada notificação dispara uma leitura incremental, só das
+linhas revogadas desde a última leitura. Verificar um token não consulta o
+banco; só enquanto a escuta não está ativa a verificação vai ao banco.
+"""
+import datetime
+import logging
+import threading
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.shared.core.database import SessionLocal
+from app.shared.helpers.notificacao_helper import EscutaNotificacoes
+from app.shared.models.token_revogado import TokenRevogado
+
+CANAL = "revogacao"
+# Leitura incremental relê este intervalo: revogações cuja transação
+# terminou depois de outras mais novas não se perdem
+MARGEM_INCREMENTAL = datetime.timedelta(seconds=60)
+
+logger = logging.getLogger(__name__)
+
+
+def _emitido_em(payload: dict) -> datetime.datetime:
+    # Tokens sem iat (anteriores à revogação) são tratados como antigos
+    return datetime.datetime.utcfromtimestamp(payload.get("iat", 0))
+
+
+class FiltroRevogacao:
+    """Conjunto de revogações vigentes, atualizado por LISTEN/NOTIFY em uma thread"""
+
+    def __init__(self, intervalo_reconexao: float = 5.0):
+        self._jtis: dict[str, datetime.datetime] = {}
+        self._usuarios: dict[str, tuple[datetime.datetime, datetime.datetime]] = {}
+        self._ultima_revogacao: Optional[datetime.datetime] = None
+        self._lock = threading.Lock()
+        self._escuta = EscutaNotificacoes(
+            CANAL,
+            lambda _: self._atualizar(),
+            ao_conectar=self._recarregar,
+            intervalo_reconexao=intervalo_reconexao
+        )
+
+    @property
+    def pronto(self) -> bool:
+        return self._escuta.conectado
+
+    def iniciar(self):
+        """Inicia a escuta (idempotente; chamado no primeiro uso)"""
+        self._escuta.iniciar()
+
+    def parar(self):
+        self._escuta.parar()
+
+    def revogado(self, payload: dict) -> bool:
+        """O token (payload já decodificado) foi revogado?"""
+        self.iniciar()
+        if not self.pronto:
+            return self._revogado_no_banco(payload)
+
+        agora = datetime.datetime.utcnow()
+        jti = payload.get("jti")
+        if jti is not None:
+            expira = self._jtis.get(jti)
+            if expira is not None and expira > agora:
+                return True
+
+        revogacao = self._usuarios.get(payload.get("sub"))
+        if revogacao is not None:
+            revogado_em, expira = revogacao
+            return expira > agora and _emitido_em(payload) <= revogado_em
+        return False
+
+    # CARGA
+
+    def _ler(self, db: Session, desde: Optional[datetime.datetime]):
+        agora = datetime.datetime.utcnow()
+        consulta = db.query(
+            TokenRevogado.jti,
+            TokenRevogado.usuario_id,
+            TokenRevogado.revogado_em,
+            TokenRevogado.expira_em
+        ).filter(TokenRevogado.expira_em > agora)
+        if desde is not None:
+            consulta = consulta.filter(TokenRevogado.revogado_em >= desde - MARGEM_INCREMENTAL)
+        return consulta.all()
+
+    def _aplicar(self, linhas, substituir: bool):
+        agora = datetime.datetime.utcnow()
+        with self._lock:
+            jtis = {} if substituir else {j: e for j, e in self._jtis.items() if e > agora}
+            usuarios = {} if substituir else {u: r for u, r in self._usuarios.items() if r[1] > agora}
+            ultima = None if substituir else self._ultima_revogacao
+
+            for jti, usuario_id, revogado_em, expira_em in linhas:
+                if jti is not None:
+                    jtis[str(jti)] = expira_em
+                if usuario_id is not None:
+                    chave = str(usuario_id)
+                    anterior = usuarios.get(chave)
+                    if anterior is None or revogado_em > anterior[0]:
+                        usuarios[chave] = (revogado_em, expira_em)
+                if ultima is None or revogado_em > ultima:
+                    ultima = revogado_em
+
+            self._jtis, self._usuarios, self._ultima_revogacao = jtis, usuarios, ultima
+
+    def _recarregar(self):
+        db = SessionLocal()
+        try:
+            self._aplicar(self._ler(db, None), substituir=True)
+        finally:
+            db.close()
+        logger.info(f"Revogações carregadas: {len(self._jtis)} tokens, {len(self._usuarios)} usuários")
+
+    def _atualizar(self):
+        db = SessionLocal()
+        try:
+            self._aplicar(self._ler(db, self._ultima_revogacao), substituir=False)
+        finally:
+            db.close()
+
+    def _revogado_no_banco(self, payload: dict) -> bool:
+        condicoes = []
+        if payload.get("jti"):
+            condicoes.append(TokenRevogado.jti == UUID(payload["jti"]))
+        if payload.get("sub"):
+            condicoes.append(and_(
+                TokenRevogado.usuario_id == UUID(payload["sub"]),
+                TokenRevogado.revogado_em >= _emitido_em(payload)
+            ))
+        if not condicoes:
+            return False
+
+        db = SessionLocal()
+        try:
+            return db.query(TokenRevogado.id).filter(
+                TokenRevogado.expira_em > datetime.datetime.utcnow(),
+                or_(*condicoes)
+            ).first() is not None
+        finally:
+            db.close()
+
+
+def revogar_token(db: Session, jti: str, expira_em: datetime.datetime):
+    """Revoga um token de acesso até a sua expiração. Não faz commit."""
+    db.add(TokenRevogado(jti=UUID(jti), expira_em=expira_em))
+
+
+def revogar_usuario(db: Session, usuario_id: UUID, duracao_token: datetime.timedelta):
+    """
+    Revoga os tokens de acesso do usuário emitidos até agora. A linha vale
+    pela duração de um token de acesso. Não faz commit.
+    """
+    db.add(TokenRevogado(
+        usuario_id=usuario_id,
+        expira_em=datetime.datetime.utcnow() + duracao_token
+    ))
+
+
+def limpar_revogacoes_expiradas(db: Session) -> int:
+    """Remove linhas que não têm mais efeito. Não faz commit."""
+    return db.query(TokenRevogado).filter(
+        TokenRevogado.expira_em <= datetime.datetime.utcnow()
+    ).delete(synchronize_session=False)
+
+
+filtro_revogacao = FiltroRevogacao()
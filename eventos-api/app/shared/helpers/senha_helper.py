@@ -0,0 +1,192 @@
+"""
+Hash e verificação de senhas (bcrypt) em um pool de processos dedicado.
+
+O bcrypt é propositalmente lento (dezenas a centenas de ms de CPU por
+chamada). Rodando nas threads da API, um pico de logins na abertura de um
+evento ocupa todas elas. Aqui o trabalho vai para um pool de processos
+próprio, com limite de operações em andamento (executando + na fila):
+acima dele a requisição é recusada na hora com 503 e Retry-After, em vez
+de esperar e segurar uma thread. As demais rotas não disputam esse CPU.
+
+Os processos do pool são criados com forkserver (ou spawn), não com fork:
+a API tem várias threads, e um fork copiaria locks em qualquer estado. Se
+um processo do pool morrer (ex.: OOM killer), o pool fica quebrado; ele é
+recriado e a operação é repetida uma vez.
+
+Latências (fila + execução) e recusas ficam em metricas().
+"""
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+SENHA_WORKERS = int(os.getenv("SENHA_HASH_WORKERS", str(min(2, os.cpu_count() or 1))))
+SENHA_FILA_MAX = int(os.getenv("SENHA_HASH_FILA_MAX", str(SENHA_WORKERS * 8)))
+SENHA_RETRY_AFTER = os.getenv("SENHA_HASH_RETRY_AFTER", "1")
+SENHA_MP_CONTEXT = os.getenv(
+    "SENHA_HASH_MP_CONTEXT",
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+AMOSTRAS_LATENCIA = 1000
+
+logger = logging.getLogger(__name__)
+
+# Contexto usado dentro dos processos do pool
+_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _hash(senha: str) -> str:
+    return _pwd.hash(senha)
+
+
+def _verificar(senha: str, senha_hash: str) -> bool:
+    try:
+        return _pwd.verify(senha, senha_hash)
+    except ValueError:
+        # Hash que não é bcrypt (ex.: senha temporária sem hash)
+        return False
+
+
+class ServicoSenhas:
+    """Pool de processos com limite de operações em andamento e métricas"""
+
+    def __init__(self, workers: int = SENHA_WORKERS, fila_max: int = SENHA_FILA_MAX):
+        self.workers = workers
+        self.fila_max = fila_max
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._em_andamento = 0
+        self._concluidas = 0
+        self._recusadas = 0
+        self._latencias: deque[float] = deque(maxlen=AMOSTRAS_LATENCIA)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context(SENHA_MP_CONTEXT)
+            )
+        return self._executor
+
+    def _recriar_executor(self, quebrado: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        """Troca o pool quebrado por um novo (se outra thread ainda não trocou)"""
+        with self._lock:
+            if self._executor is quebrado:
+                logger.warning("Pool de senhas quebrado (processo encerrado), recriando")
+                self._executor = None
+            executor = self._get_executor()
+        quebrado.shutdown(wait=False, cancel_futures=True)
+        return executor
+
+    def _submeter(self, funcao, *args) -> Future:
+        """Submete ao pool ou recusa com 503 se o limite foi atingido"""
+        with self._lock:
+            if self._em_andamento >= self.fila_max:
+                self._recusadas += 1
+                recusar = True
+            else:
+                self._em_andamento += 1
+                recusar = False
+                executor = self._get_executor()
+
+        if recusar:
+            logger.warning(f"Pool de senhas saturado ({self.fila_max} operações em andamento)")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Serviço sobrecarregado, tente novamente em instantes",
+                headers={"Retry-After": SENHA_RETRY_AFTER}
+            )
+
+        inicio = time.perf_counter()
+        try:
+            try:
+                futuro = executor.submit(funcao, *args)
+            except BrokenProcessPool:
+                futuro = self._recriar_executor(executor).submit(funcao, *args)
+        except Exception:
+            with self._lock:
+                self._em_andamento -= 1
+            raise
+        futuro.add_done_callback(lambda _: self._concluir(inicio))
+        return futuro
+
+    def _concluir(self, inicio: float):
+        with self._lock:
+            self._em_andamento -= 1
+            self._concluidas += 1
+            self._latencias.append(time.perf_counter() - inicio)
+
+    # O pool pode quebrar com a operação já submetida: ela falha com
+    # BrokenProcessPool e é submetida de novo, uma vez (_submeter recria o pool)
+
+    def _executar(self, funcao, *args):
+        try:
+            return self._submeter(funcao, *args).result()
+        except BrokenProcessPool:
+            return self._submeter(funcao, *args).result()
+
+    async def _executar_async(self, funcao, *args):
+        try:
+            return await asyncio.wrap_future(self._submeter(funcao, *args))
+        except BrokenProcessPool:
+            return await asyncio.wrap_future(self._submeter(funcao, *args))
+
+    # API síncrona (rotas def, que já rodam no threadpool)
+
+    def hash(self, senha: str) -> str:
+        return self._executar(_hash, senha)
+
+    def verificar(self, senha: str, senha_hash: str) -> bool:
+        return self._executar(_verificar, senha, senha_hash)
+
+    # API assíncrona (rotas async def: não bloqueia o event loop)
+
+    async def hash_async(self, senha: str) -> str:
+        return await self._executar_async(_hash, senha)
+
+    async def verificar_async(self, senha: str, senha_hash: str) -> bool:
+        return await self._executar_async(_verificar, senha, senha_hash)
+
+    def metricas(self) -> dict:
+        """Estado do pool e latência (fila + execução) das últimas operações, em ms"""
+        with self._lock:
+            latencias = sorted(self._latencias)
+            dados = {
+                "workers": self.workers,
+                "fila_max": self.fila_max,
+                "em_andamento": self._em_andamento,
+                "concluidas": self._concluidas,
+                "recusadas": self._recusadas,
+            }
+
+        def percentil(p: float) -> Optional[float]:
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(p * len(latencias)))] * 1000, 1)
+
+        dados["latencia_ms"] = {
+            "amostras": len(latencias),
+            "p50": percentil(0.50),
+            "p95": percentil(0.95),
+            "p99": percentil(0.99),
+            "max": round(latencias[-1] * 1000, 1) if latencias else None,
+        }
+        return dados
+
+    def encerrar(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+servico_senhas = ServicoSenhas()
@@ -0,0 +1,67 @@
+"""
+Tarefas em background com estado consultável, uma por chave (ex.: evento).
+
+Usado pelas emissões em massa (ingressos, certificados): o POST inicia a
+tarefa, ou só devolve o estado da que já está em andamento para a mesma
+chave, e o GET consulta o estado. O estado fica em memória, por processo;
+o progresso "real" vem sempre do banco (as emissões são retomáveis).
+"""
+import datetime
+import logging
+import threading
+from typing import Callable, Hashable, Optional
+
+from fastapi import BackgroundTasks
+
+logger = logging.getLogger(__name__)
+
+
+class TarefasPorChave:
+    """Estado das tarefas deste processo; no máximo uma em andamento por chave"""
+
+    def __init__(self, descricao: str):
+        self.descricao = descricao  # usada no log de erro
+        self._estados: dict[Hashable, dict] = {}
+        self._lock = threading.Lock()
+
+    def estado(self, chave: Hashable) -> Optional[dict]:
+        return self._estados.get(chave)
+
+    def iniciar(
+        self,
+        chave: Hashable,
+        background_tasks: BackgroundTasks,
+        funcao: Callable[..., None],
+        *args,
+        **campos
+    ) -> dict:
+        """
+        Agenda funcao(estado, *args) se não houver tarefa em andamento para a
+        chave, e retorna o estado (o novo ou o da tarefa em andamento).
+        campos são os valores iniciais do estado (contadores, parâmetros),
+        que a função atualiza enquanto roda.
+        """
+        with self._lock:
+            estado = self._estados.get(chave)
+            if not estado or estado["status"] != "em_andamento":
+                estado = {
+                    "status": "em_andamento",
+                    **campos,
+                    "iniciado_em": datetime.datetime.utcnow(),
+                    "finalizado_em": None,
+                    "erro": None
+                }
+                self._estados[chave] = estado
+                background_tasks.add_task(self._executar, chave, estado, funcao, *args)
+        return estado
+
+    def _executar(self, chave: Hashable, estado: dict, funcao: Callable[..., None], *args):
+        try:
+            funcao(estado, *args)
+            estado["status"] = "concluida"
+        except Exception as e:
+            logger.error(f"Erro na {self.descricao} {chave}: {e}")
+            estado["status"] = "erro"
+            estado["erro"] = str(e)
+        finally:
+            estado["finalizado_em"] = datetime.datetime.utcnow()
@@ -0,0 +1,110 @@
+"""
+Transições de estado condicionais.
+
+A transição é um único UPDATE ... WHERE <estado> IN (<origens>) RETURNING:
+a checagem do estado atual e a escrita acontecem na mesma instrução, então
+duas requisições concorrentes nunca aplicam a mesma transição (a segunda
+espera o lock da linha, reavalia o WHERE e não atualiza nada).
+
+O estado atual só é lido quando a transição não ocorre, para a chamada
+escolher o erro (não existe, já está no estado de destino, etc.).
+"""
+from typing import Any, Iterable, NamedTuple, Optional
+
+from sqlalchemy import or_, select, update
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+# Transições de Ingresso.status: (origens, destino)
+INGRESSO_USAR = (("emitido",), "usado")
+INGRESSO_CANCELAR = (("emitido", "usado"), "cancelado")
+INGRESSO_REEMITIR = (("emitido", "cancelado"), "emitido")
+
+# Inscricao.status: estados em que a inscrição vale (confirmada: padrão do modelo)
+INSCRICAO_ATIVOS = ("ativa", "confirmada")
+INSCRICAO_CANCELAR = (INSCRICAO_ATIVOS, "cancelada")
+INSCRICAO_REATIVAR = (("cancelada",), "ativa")
+
+# Usuario.papel: usuário rápido define a senha e vira participante
+USUARIO_CADASTRAR = (("rapido",), "participante")
+
+# Certificado.revogado (nulo = não revogado)
+CERTIFICADO_REVOGAR = ((False, None), True)
+
+
+class Transicao(NamedTuple):
+    linha: Optional[Row]  # colunas de RETURNING, se a transição ocorreu
+    existe: bool
+    estado: Any  # estado após a transição, ou o encontrado se ela não ocorreu
+
+    @property
+    def aplicada(self) -> bool:
+        return self.linha is not None
+
+
+def condicao_estado(coluna, origens: Iterable):
+    """WHERE coluna IN (origens), tratando None como IS NULL"""
+    origens = list(origens)
+    valores = [v for v in origens if v is not None]
+    condicao = coluna.in_(valores)
+    if len(valores) != len(origens):
+        condicao = or_(condicao, coluna.is_(None))
+    return condicao
+
+
+def _update(coluna, transicao, filtros, valores, retornar):
+    origens, destino = transicao
+    tabela = coluna.class_
+    return (
+        update(tabela)
+        .where(*filtros, condicao_estado(coluna, origens))
+        .values({coluna.key: destino, **(valores or {})})
+        .returning(*(retornar or tabela.__mapper__.primary_key))
+    )
+
+
+def transicionar(
+    db: Session,
+    coluna,
+    transicao: tuple[Iterable, Any],
+    *filtros,
+    valores: Optional[dict] = None,
+    retornar: Iterable = ()
+) -> Transicao:
+    """
+    Aplica a transição à linha selecionada pelos filtros.
+
+    coluna: coluna de estado do modelo (ex.: Ingresso.status)
+    transicao: (estados de origem, estado de destino)
+    valores: outras colunas atualizadas junto com o estado
+    retornar: colunas devolvidas em Transicao.linha (padrão: chave primária)
+
+    Não faz commit.
+    """
+    linha = db.execute(
+        _update(coluna, transicao, filtros, valores, retornar),
+        execution_options={"synchronize_session": False}
+    ).first()
+    if linha is not None:
+        return Transicao(linha, True, transicao[1])
+
+    atual = db.execute(select(coluna).where(*filtros)).first()
+    return Transicao(None, atual is not None, atual[0] if atual else None)
+
+
+def transicionar_varios(
+    db: Session,
+    coluna,
+    transicao: tuple[Iterable, Any],
+    *filtros,
+    valores: Optional[dict] = None,
+    retornar: Iterable = ()
+) -> list[Row]:
+    """
+    Aplica a transição a todas as linhas filtradas que estão em um estado
+    de origem. Retorna as linhas alteradas. Não faz commit.
+    """
+    return db.execute(
+        _update(coluna, transicao, filtros, valores, retornar),
+        execution_options={"synchronize_session": False}
+    ).all()
@@ -0,0 +1,110 @@
+"""
+GET condicional (ETag / Last-Modified) a partir das versões por evento.
+
+eventos.atualizado_em muda a cada alteração dos dados do evento;
+inscrições e ingressos de cada evento têm contadores em versoes_eventos
+(migração 0009). Ler a versão é uma consulta pela chave
+primária: a rota compara a versão com If-None-Match / If-Modified-Since e
+responde 304 antes da consulta principal e da serialização.
+
+O ETag é o preferido; Last-Modified tem resolução de segundos (duas
+alterações no mesmo segundo não são distinguidas), e If-Modified-Since só
+é considerado sem If-None-Match. As versões por contador não têm
+Last-Modified: os contadores não são travados em ordem de commit, então
+não há um instante confiável da última alteração.
+"""
+import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import NamedTuple, Optional
+from uuid import UUID
+
+from fastapi import Request, Response, status
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.shared.models.evento import Evento
+from app.shared.models.versao_evento import VersaoEvento
+
+_EPOCA = datetime.datetime(1970, 1, 1)
+
+
+class Versao(NamedTuple):
+    etag: str
+    modificado_em: Optional[datetime.datetime]  # UTC, sem fuso (como as colunas); None: só ETag
+
+
+def versao(modificado_em: Optional[datetime.datetime], *extras) -> Versao:
+    """
+    Versão a partir do instante da última alteração. extras entram no ETag
+    (ex.: contagens, parâmetros que mudam a resposta).
+    """
+    modificado_em = modificado_em or _EPOCA
+    micros = (modificado_em - _EPOCA) // datetime.timedelta(microseconds=1)
+    partes = [format(micros, "x"), *(str(e) for e in extras)]
+    return Versao(f'"{"-".join(partes)}"', modificado_em)
+
+
+def versao_evento(db: Session, evento_id: UUID) -> Optional[Versao]:
+    """Versão dos dados do evento, ou None se o evento não existe"""
+    modificado_em = db.query(Evento.atualizado_em).filter(Evento.id == evento_id).scalar()
+    return versao(modificado_em) if modificado_em is not None else None
+
+
+def versao_recurso_evento(db: Session, evento_id: UUID, recurso: str, *extras) -> Optional[Versao]:
+    """
+    Versão das inscrições ou dos ingressos (recurso) do evento: a soma dos
+    contadores, que muda a cada commit que altera o recurso. None se o
+    evento não existe.
+    """
+    linha = (
+        db.query(Evento.id, func.coalesce(func.sum(VersaoEvento.contador), 0))
+        .outerjoin(
+            VersaoEvento,
+            (VersaoEvento.evento_id == Evento.id) & (VersaoEvento.recurso == recurso)
+        )
+        .filter(Evento.id == evento_id)
+        .group_by(Evento.id)
+        .first()
+    )
+    if linha is None:
+        return None
+    partes = [format(int(linha[1]), "x"), *(str(e) for e in extras)]  # sum() vem como Decimal
+    return Versao(f'"c{"-".join(partes)}"', None)
+
+
+def cabecalhos_versao(v: Versao, privado: bool = True) -> dict:
+    cabecalhos = {
+        "ETag": v.etag,
+        "Cache-Control": "private, no-cache" if privado else "no-cache",
+    }
+    if v.modificado_em is not None:
+        cabecalhos["Last-Modified"] = format_datetime(v.modificado_em.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+    return cabecalhos
+
+
+def _ler_data_http(valor: str) -> Optional[datetime.datetime]:
+    try:
+        data = parsedate_to_datetime(valor)
+    except (TypeError, ValueError):
+        return None
+    if data.tzinfo is not None:
+        data = data.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return data
+
+
+def nao_modificado(request: Request, v: Versao) -> bool:
+    """O cliente já tem esta versão? (If-None-Match tem precedência)"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        etags = {e.strip().removeprefix("W/") for e in if_none_match.split(",")}
+        return "*" in etags or v.etag.removeprefix("W/") in etags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is not None and v.modificado_em is not None:
+        data = _ler_data_http(if_modified_since)
+        return data is not None and v.modificado_em.replace(microsecond=0) <= data
+    return False
+
+
+def resposta_304(cabecalhos: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
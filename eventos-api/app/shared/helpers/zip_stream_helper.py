@@ -0,0 +1,78 @@
+"""
+Geração de arquivos ZIP em streaming.
+
+O ZIP é montado conforme é enviado: cada entrada é escrita em um buffer que
+é drenado a cada bloco, então a memória usada não depende do tamanho do
+arquivo final nem da quantidade de entradas. Como a saída não é seekable,
+o zipfile grava os tamanhos/CRC em data descriptors após cada entrada.
+"""
+import os
+import time
+import zipfile
+from typing import Iterable, Iterator, Union
+
+TAMANHO_BLOCO = 64 * 1024
+
+
+class _SaidaStream:
+    """Destino do ZipFile: acumula o que foi escrito até ser drenado"""
+
+    def __init__(self):
+        self._partes: list[bytes] = []
+        self._posicao = 0
+
+    def write(self, dados) -> int:
+        self._partes.append(bytes(dados))
+        self._posicao += len(dados)
+        return len(dados)
+
+    def tell(self) -> int:
+        return self._posicao
+
+    def flush(self):
+        pass
+
+    def drenar(self) -> Iterator[bytes]:
+        """Entrega (e descarta) o que foi escrito desde a última drenagem"""
+        if self._partes:
+            dados = b"".join(self._partes)
+            self._partes.clear()
+            yield dados
+
+
+def stream_zip(
+    entradas: Iterable[tuple[str, Union[str, bytes]]],
+    compressao: int = zipfile.ZIP_STORED
+) -> Iterator[bytes]:
+    """
+    Gera os bytes de um ZIP a partir de (nome no arquivo, conteúdo).
+
+    O conteúdo pode ser o caminho de um arquivo em disco (lido em blocos)
+    ou os próprios bytes. As entradas são consumidas sob demanda, então
+    podem ser produzidas enquanto o ZIP é enviado.
+
+    Padrão ZIP_STORED: PDFs e PNGs já são comprimidos.
+    """
+    saida = _SaidaStream()
+    data_hora = time.localtime()[:6]
+
+    with zipfile.ZipFile(saida, "w", compression=compressao) as zf:
+        for nome, conteudo in entradas:
+            info = zipfile.ZipInfo(nome, date_time=data_hora)
+            info.compress_type = compressao
+
+            if isinstance(conteudo, bytes):
+                info.file_size = len(conteudo)
+                with zf.open(info, "w") as destino:
+                    destino.write(conteudo)
+                yield from saida.drenar()
+                continue
+
+            info.file_size = os.path.getsize(conteudo)
+            with open(conteudo, "rb") as origem, zf.open(info, "w") as destino:
+                while bloco := origem.read(TAMANHO_BLOCO):
+                    destino.write(bloco)
+                    yield from saida.drenar()
+            yield from saida.drenar()
+
+    yield from saida.drenar()
@@ -1,15 +1,26 @@
 from app.shared.middlewares.cors import add_cors_middleware
-from app.shared.middlewares.auditoria import auditoria_middleware
+from app.shared.middlewares.auditoria import auditoria_middleware, auditoria_middleware_ignorando
+from app.shared.helpers.json_helper import RespostaJSON
 from fastapi import FastAPI
+from typing import Iterable
 
-def add_common_middlewares(app: FastAPI, audit: bool = False):
+def add_common_middlewares(app: FastAPI, audit: bool = False, audit_ignorar: Iterable[str] = ()):
     """
     Adiciona middlewares de forma desacoplada.
     Ordem não importa mais! Cada middleware é independente.
+
+    Também define RespostaJSON (orjson) como classe de resposta padrão das
+    rotas declaradas depois desta chamada.
+
+    audit_ignorar: caminhos (com parâmetros como nas rotas) que não são
+    registrados na auditoria.
     """
+    app.router.default_response_class = RespostaJSON
     add_cors_middleware(app)
     
-    if audit:
+    if audit and audit_ignorar:
+        app.middleware("http")(auditoria_middleware_ignorando(audit_ignorar))
+    elif audit:
         app.middleware("http")(auditoria_middleware)
     
     return app
\ No newline at end of file
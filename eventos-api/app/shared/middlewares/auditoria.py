@@ -1,5 +1,6 @@
 from fastapi import Request, Response
 from starlette.responses import StreamingResponse
+from starlette.routing import compile_path
 from app.shared.helpers.auditoria_helper import AuditoriaService
 from app.shared.core.database import SessionLocal
 import traceback
@@ -8,18 +9,23 @@ import traceback
 async def auditoria_middleware(request: Request, call_next):
     # 1. CAPTURAR REQUEST BODY
     payload_requisicao = ""
-    try:
-        body_bytes = await request.body()
-        if body_bytes:
-            payload_requisicao = body_bytes.decode("utf-8", errors="ignore")
-        
-        # IMPORTANTE: Permitir que o body seja lido novamente pelos endpoints
-        async def receive():
-            return {"type": "http.request", "body": body_bytes}
-        request._receive = receive
-        
-    except Exception as e:
-        payload_requisicao = f"Erro ao capturar: {str(e)}"
+    if request.headers.get("content-type", "").startswith("multipart/form-data"):
+        # Uploads de arquivo não são lidos aqui: carregar o corpo inteiro em
+        # memória impediria o processamento incremental no endpoint
+        payload_requisicao = "(upload de arquivo não registrado)"
+    else:
+        try:
+            body_bytes = await request.body()
+            if body_bytes:
+                payload_requisicao = body_bytes.decode("utf-8", errors="ignore")
+            
+            # IMPORTANTE: Permitir que o body seja lido novamente pelos endpoints
+            async def receive():
+                return {"type": "http.request", "body": body_bytes}
+            request._receive = receive
+            
+        except Exception as e:
+            payload_requisicao = f"Erro ao capturar: {str(e)}"
     
     # 2. CAPTURAR METADADOS
     metodo = request.method
@@ -38,8 +44,15 @@ async def auditoria_middleware(request: Request, call_next):
     
     # 4. CAPTURAR RESPONSE BODY
     payload_resposta = ""
+    content_type = response.headers.get("content-type", "")
+    # Arquivos (PDF, ZIP, imagens...) seguem em streaming, sem cópia para o log
+    captura_resposta = content_type.startswith(("application/json", "text/")) or not content_type
     try:
-        if isinstance(response, StreamingResponse):
+        if response.headers.get("content-encoding"):
+            payload_resposta = f"(conteúdo {response.headers['content-encoding']} não registrado)"
+        elif not captura_resposta:
+            payload_resposta = f"(conteúdo {content_type} não registrado)"
+        elif isinstance(response, StreamingResponse):
             response_body = b""
             
             async for chunk in response.body_iterator:
@@ -78,4 +91,22 @@ async def auditoria_middleware(request: Request, call_next):
         print(f"[AUDITORIA] Falha ao registrar: {e}")
         traceback.print_exc()
     
-    return response
\ No newline at end of file
+    return response
+
+
+def auditoria_middleware_ignorando(caminhos):
+    """
+    auditoria_middleware que não registra os caminhos informados (ex.:
+    leituras públicas de alto volume, que gerariam uma linha por acesso, ou
+    downloads de arquivo, que passariam pelo middleware em vez de serem
+    enviados direto). Os caminhos seguem a sintaxe das rotas: "/codigo/{codigo}/pdf".
+    """
+    padroes = [compile_path(caminho)[0] for caminho in caminhos]
+
+    async def middleware(request: Request, call_next):
+        caminho = request.url.path
+        if any(padrao.match(caminho) for padrao in padroes):
+            return await call_next(request)
+        return await auditoria_middleware(request, call_next)
+
+    return middleware
\ No newline at end of file
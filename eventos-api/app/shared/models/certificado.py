@@ -1,10 +1,14 @@
-from sqlalchemy import Column, DateTime, String, ForeignKey, Boolean, Text
+from sqlalchemy import Column, DateTime, String, ForeignKey, Boolean, Text, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 import uuid, datetime
 from app.shared.core.database import Base
 
 class Certificado(Base):
     __tablename__ = "certificados"
+    __table_args__ = (
+        UniqueConstraint("inscricao_id", name="uq_certificados_inscricao_id"),
+        Index("ix_certificados_evento_id", "evento_id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     inscricao_id = Column(UUID(as_uuid=True), ForeignKey("inscricoes.id"), nullable=False)
     evento_id = Column(UUID(as_uuid=True), ForeignKey("eventos.id"), nullable=False)
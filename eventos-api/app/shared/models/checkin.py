@@ -1,10 +1,13 @@
-from sqlalchemy import Column, DateTime, String, ForeignKey
+from sqlalchemy import Column, DateTime, String, ForeignKey, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 import uuid, datetime
 from app.shared.core.database import Base
 
 class Checkin(Base):
     __tablename__ = "checkins"
+    __table_args__ = (
+        UniqueConstraint("inscricao_id", name="uq_checkins_inscricao_id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     inscricao_id = Column(UUID(as_uuid=True), ForeignKey("inscricoes.id"))
     ingresso_id = Column(UUID(as_uuid=True), ForeignKey("ingressos.id"))
@@ -1,13 +1,32 @@
-from sqlalchemy import Column, String, DateTime, Text
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Boolean, Column, Computed, String, DateTime, FetchedValue, Index, Text, false, text
+from sqlalchemy.dialects.postgresql import TSVECTOR, UUID
+from sqlalchemy.orm import deferred
 import uuid
 from app.shared.core.database import Base
 
+# Documento de busca textual (migração 0011): título pesa mais que a descrição
+DOCUMENTO_BUSCA = (
+    "setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'B')"
+)
+
 class Evento(Base):
     __tablename__ = "eventos"
+    __table_args__ = (
+        Index("ix_eventos_busca", "busca", postgresql_using="gin"),
+        Index("ix_eventos_titulo_trgm", "titulo", postgresql_using="gin", postgresql_ops={"titulo": "gin_trgm_ops"}),
+        Index("ix_eventos_descricao_trgm", "descricao", postgresql_using="gin", postgresql_ops={"descricao": "gin_trgm_ops"}),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     titulo = Column(String, nullable=False)
     descricao = Column(Text)
     inicio_em = Column(DateTime)
     fim_em = Column(DateTime)
+    # Ingressos do evento validados a partir do índice em memória (ingressos-service)
+    modo_portaria = Column(Boolean, nullable=False, default=False, server_default=false())
+    # Versão para GET condicional, mantida por trigger (migração 0009); as de
+    # inscrições e ingressos ficam em versoes_eventos
+    atualizado_em = Column(DateTime, nullable=False, server_default=text("timezone('utc', now())"), server_onupdate=FetchedValue())
+    # Gerada pelo banco; só usada em filtros, não carregada com o objeto
+    busca = deferred(Column(TSVECTOR, Computed(DOCUMENTO_BUSCA, persisted=True)))
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 import datetime
@@ -7,6 +7,10 @@ from app.shared.core.database import Base
 
 class Ingresso(Base):
     __tablename__ = "ingressos"
+    __table_args__ = (
+        UniqueConstraint("inscricao_id", name="uq_ingressos_inscricao_id"),
+        Index("ix_ingressos_evento_status", "evento_id", "status"),
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     inscricao_id = Column(UUID(as_uuid=True), ForeignKey("inscricoes.id"), nullable=False)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer
+from sqlalchemy.dialects.postgresql import UUID
+import datetime
+from app.shared.core.database import Base
+
+
+class IngressoRevogado(Base):
+    """
+    Lista de revogação dos ingressos com token assinado: como o token é
+    verificado sem banco, os dispositivos da portaria precisam desta lista.
+    """
+    __tablename__ = "ingressos_revogados"
+    __table_args__ = (
+        Index("ix_ingressos_revogados_evento_revogado_em", "evento_id", "revogado_em"),
+    )
+
+    ingresso_id = Column(UUID(as_uuid=True), ForeignKey("ingressos.id"), primary_key=True)
+    evento_id = Column(UUID(as_uuid=True), ForeignKey("eventos.id"), nullable=False)
+    versao = Column(Integer, nullable=False)  # tokens até esta versão estão revogados
+    revogado_em = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, DateTime, String, ForeignKey, Boolean
+from sqlalchemy import Column, DateTime, String, ForeignKey, Boolean, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid, datetime
 from app.shared.core.database import Base
 
 class Inscricao(Base):
     __tablename__ = "inscricoes"
+    __table_args__ = (
+        Index("ix_inscricoes_evento_status", "evento_id", "status"),
+        Index("ix_inscricoes_evento_usuario", "evento_id", "usuario_id"),
+        Index("ix_inscricoes_usuario_id", "usuario_id"),
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     evento_id = Column(UUID(as_uuid=True), ForeignKey("eventos.id"), nullable=False)
     usuario_id = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=True)
@@ -15,3 +20,10 @@ class Inscricao(Base):
     status = Column(String(50), default="confirmada")
     cancelado_em = Column(DateTime, nullable=True, default=None)
     sincronizado = Column(Boolean)
+
+
+# Busca de participantes (migração 0012)
+Index("ix_inscricoes_cpf_normalizado", func.cpf_normalizado(Inscricao.cpf_rapido))
+Index("ix_inscricoes_email_rapido_lower", func.lower(Inscricao.email_rapido))
+Index("ix_inscricoes_nome_rapido_trgm", Inscricao.nome_rapido, postgresql_using="gin", postgresql_ops={"nome_rapido": "gin_trgm_ops"})
+Index("ix_inscricoes_nome_rapido_lower", func.lower(Inscricao.nome_rapido).collate("C"))  # ordenação
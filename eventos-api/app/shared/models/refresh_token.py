@@ -0,0 +1,24 @@
+from sqlalchemy import Column, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+import datetime
+from app.shared.core.database import Base
+
+
+class RefreshToken(Base):
+    """
+    Refresh tokens emitidos pelo auth-service. Cada uso gera um novo token
+    da mesma família (rotação); reusar um token já trocado revoga a família.
+    """
+    __tablename__ = "refresh_tokens"
+    __table_args__ = (
+        Index("ix_refresh_tokens_usuario_id", "usuario_id"),
+        Index("ix_refresh_tokens_familia", "familia"),
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True)  # jti
+    usuario_id = Column(UUID(as_uuid=True), ForeignKey("usuarios.id"), nullable=False)
+    familia = Column(UUID(as_uuid=True), nullable=False)
+    criado_em = Column(DateTime, default=datetime.datetime.utcnow, nullable=False)
+    expira_em = Column(DateTime, nullable=False)
+    usado_em = Column(DateTime, nullable=True)
+    revogado_em = Column(DateTime, nullable=True)
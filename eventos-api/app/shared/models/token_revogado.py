@@ -0,0 +1,22 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from app.shared.core.database import Base
+
+
+class TokenRevogado(Base):
+    """
+    Revogações de tokens de acesso, carregadas em memória por todos os
+    serviços (ver revogacao_helper). Por jti (um token) ou por usuário
+    (tokens emitidos até revogado_em). Linhas com expira_em no passado não
+    têm mais efeito: os tokens que elas cobrem já expiraram.
+    """
+    __tablename__ = "tokens_revogados"
+    __table_args__ = (
+        Index("ix_tokens_revogados_revogado_em", "revogado_em"),
+    )
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    jti = Column(UUID(as_uuid=True), nullable=True)
+    usuario_id = Column(UUID(as_uuid=True), nullable=True)
+    revogado_em = Column(DateTime, nullable=False, server_default=text("timezone('utc', now())"))
+    expira_em = Column(DateTime, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Boolean, DateTime
+from sqlalchemy import Column, String, Boolean, DateTime, Index, func
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
 from app.shared.core.database import Base
@@ -9,9 +9,16 @@ class Usuario(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nome = Column(String(200), nullable=False)
     email = Column(String(255), unique=True, nullable=False, index=True)
-    senha_hash = Column(String(255), nullable=False)
+    senha_hash = Column(String(255), nullable=True)  # nulo: usuário rápido, sem senha
     cpf = Column(String(20), unique=True, index=True)
     email_verificado = Column(Boolean, default=False)
     papel = Column(String(50))
     criado_em = Column(DateTime, default=datetime.datetime.utcnow)
     atualizado_em = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
+# Busca de participantes (migração 0012)
+Index("ix_usuarios_cpf_normalizado", func.cpf_normalizado(Usuario.cpf))
+Index("ix_usuarios_email_lower", func.lower(Usuario.email))
+Index("ix_usuarios_nome_trgm", Usuario.nome, postgresql_using="gin", postgresql_ops={"nome": "gin_trgm_ops"})
+Index("ix_usuarios_nome_lower", func.lower(Usuario.nome).collate("C"))  # ordenação
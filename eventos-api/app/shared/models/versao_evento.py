@@ -0,0 +1,18 @@
+from sqlalchemy import BigInteger, Column, ForeignKey, SmallInteger, String
+from sqlalchemy.dialects.postgresql import UUID
+from app.shared.core.database import Base
+
+
+class VersaoEvento(Base):
+    """
+    Contadores de versão das inscrições/ingressos de um evento, mantidos por
+    triggers (migração 0009). Cada transação incrementa a fatia da sua
+    conexão, sem travar a linha do evento; a versão do recurso é a soma das
+    fatias (ver versao_helper).
+    """
+    __tablename__ = "versoes_eventos"
+
+    evento_id = Column(UUID(as_uuid=True), ForeignKey("eventos.id", ondelete="CASCADE"), primary_key=True)
+    recurso = Column(String, primary_key=True)  # "inscricoes" ou "ingressos"
+    fatia = Column(SmallInteger, primary_key=True)
+    contador = Column(BigInteger, nullable=False)
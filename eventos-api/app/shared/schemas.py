@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr
-from typing import Optional
+from typing import Optional, Literal
 from datetime import datetime
 from uuid import UUID
 
@@ -17,6 +17,7 @@ class CompletarCadastroIn(BaseModel):
     senha: Optional[str]
 
 class CadastrarSenhaRapidoIn(BaseModel):
+    token: Optional[str] = None  # token de cadastro (ver security.gerar_token_cadastro)
     email: EmailStr
     nome: str
     cpf: Optional[str]
@@ -52,6 +53,15 @@ class EventoOut(BaseModel):
     class Config:
         orm_mode = True
 
+class EventoBuscaOut(EventoOut):
+    relevancia: float
+
+class EventoBuscaPagina(BaseModel):
+    total: int
+    pagina: int
+    tamanho: int
+    resultados: list[EventoBuscaOut]
+
 # INSCRICOES
 class InscricaoCreateRapida(BaseModel):
     evento_id: UUID
@@ -74,6 +84,23 @@ class InscricaoOut(BaseModel):
     class Config:
         orm_mode = True
 
+class ParticipanteOut(BaseModel):
+    inscricao_id: UUID
+    evento_id: UUID
+    evento_titulo: str
+    usuario_id: Optional[UUID] = None
+    status: Optional[str] = None
+    inscricao_rapida: Optional[bool] = None
+    nome: Optional[str] = None
+    cpf: Optional[str] = None
+    email: Optional[str] = None
+
+class ParticipantesPagina(BaseModel):
+    tamanho: int
+    tem_mais: bool
+    proximo: Optional[str] = None  # cursor (parâmetro apos) da página seguinte
+    resultados: list[ParticipanteOut]
+
 # CHECKINS
 class CheckinCreate(BaseModel):
     inscricao_id: UUID
@@ -90,11 +117,45 @@ class CheckinOut(BaseModel):
     class Config:
         orm_mode = True
 
+class CheckinLoteItem(BaseModel):
+    """
+    Item do check-in em lote.
+    - tipo "normal": requer inscricao_id (ingresso_id/usuario_id opcionais)
+    - tipo "rapido": requer evento_id, nome e email (cpf opcional)
+    A validação é feita por item, para um item inválido não derrubar o lote.
+    """
+    tipo: Literal["normal", "rapido"] = "normal"
+    inscricao_id: Optional[UUID] = None
+    ingresso_id: Optional[UUID] = None
+    usuario_id: Optional[UUID] = None
+    evento_id: Optional[UUID] = None
+    nome: Optional[str] = None
+    cpf: Optional[str] = None
+    email: Optional[str] = None
+
+class CheckinLoteResultado(BaseModel):
+    indice: int
+    status: Literal["criado", "ja_registrado", "nao_encontrado", "invalido"]
+    inscricao_id: Optional[UUID] = None
+    checkin_id: Optional[UUID] = None
+    detalhe: Optional[str] = None
+
+class CheckinLoteOut(BaseModel):
+    total: int
+    criados: int
+    ja_registrados: int
+    nao_encontrados: int
+    invalidos: int
+    resultados: list[CheckinLoteResultado]
+
 # CERTIFICADOS
 class CertificadoCreate(BaseModel):
     inscricao_id: UUID
     evento_id: UUID
 
+class CertificadoRevogacaoLoteIn(BaseModel):
+    codigos: list[str]
+
 class CertificadoOut(BaseModel):
     id: UUID
     inscricao_id: UUID
@@ -124,6 +185,11 @@ class IngressoSchema(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # segundos
+
+class RefreshIn(BaseModel):
+    refresh_token: str
 
 class LoginIn(BaseModel):
     email: str
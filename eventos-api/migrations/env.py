@@ -0,0 +1,59 @@
+"""
+Ambiente do Alembic.
+Usa o mesmo engine/metadata dos microsserviços (app.shared.core.database).
+"""
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.shared.core.database import Base, engine, DATABASE_URL
+
+# Importar os modelos para registrar as tabelas no metadata
+from app.shared.models import (  # noqa: F401
+    certificado,
+    checkin,
+    evento,
+    ingresso,
+    ingresso_revogado,
+    inscricao,
+    log_auditoria,
+    refresh_token,
+    token_revogado,
+    usuario,
+    versao_evento,
+)
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations_offline():
+    """Gera o SQL das migrações sem conectar no banco (alembic upgrade --sql)."""
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    """Executa as migrações conectando no banco configurado em DATABASE_URL."""
+    with engine.connect() as connection:
+        context.configure(connection=connection, target_metadata=target_metadata)
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,84 @@
+"""Índices dos caminhos críticos e unicidade de check-in/ingresso por inscrição
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+Os índices são criados com CREATE INDEX CONCURRENTLY para não bloquear
+escritas em produção. Como CONCURRENTLY não pode rodar dentro de transação,
+cada comando é executado em um autocommit_block.
+
+As restrições de unicidade são criadas em duas etapas: primeiro o índice
+único (concorrente) e depois ADD CONSTRAINT ... USING INDEX, que é instantâneo.
+Se já existirem duplicados, a migração é abortada listando exemplos; nada
+é apagado automaticamente.
+"""
+from alembic import op
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# (nome, tabela, colunas)
+INDICES = [
+    ("ix_inscricoes_evento_status", "inscricoes", "evento_id, status"),
+    ("ix_inscricoes_evento_usuario", "inscricoes", "evento_id, usuario_id"),
+    ("ix_ingressos_evento_status", "ingressos", "evento_id, status"),
+    ("ix_certificados_inscricao_id", "certificados", "inscricao_id"),
+    ("ix_certificados_evento_id", "certificados", "evento_id"),
+]
+
+# (nome, tabela, coluna) - um check-in e um ingresso por inscrição
+UNICOS = [
+    ("uq_checkins_inscricao_id", "checkins", "inscricao_id"),
+    ("uq_ingressos_inscricao_id", "ingressos", "inscricao_id"),
+]
+
+
+def _verificar_duplicados(tabela: str, coluna: str):
+    """Aborta a migração se existirem linhas que violariam a unicidade."""
+    if op.get_context().as_sql:
+        return  # modo offline (--sql): não há conexão para consultar
+
+    conn = op.get_bind()
+    duplicados = conn.exec_driver_sql(
+        f"SELECT {coluna}, COUNT(*) FROM {tabela} "
+        f"WHERE {coluna} IS NOT NULL GROUP BY {coluna} HAVING COUNT(*) > 1 LIMIT 5"
+    ).fetchall()
+
+    if duplicados:
+        exemplos = ", ".join(str(d[0]) for d in duplicados)
+        raise RuntimeError(
+            f"Existem registros duplicados em {tabela}.{coluna} ({exemplos}). "
+            f"Corrija os dados antes de aplicar a restrição de unicidade."
+        )
+
+
+def upgrade():
+    # Duplicados não são removidos automaticamente (check-ins são dados de
+    # presença; ingressos podem estar referenciados por check-ins): a
+    # migração é abortada com exemplos para um operador decidir.
+    for _, tabela, coluna in UNICOS:
+        _verificar_duplicados(tabela, coluna)
+
+    with op.get_context().autocommit_block():
+        for nome, tabela, colunas in INDICES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nome} ON {tabela} ({colunas})")
+
+        for nome, tabela, coluna in UNICOS:
+            op.execute(f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {nome} ON {tabela} ({coluna})")
+
+    for nome, tabela, _ in UNICOS:
+        op.execute(f"ALTER TABLE {tabela} ADD CONSTRAINT {nome} UNIQUE USING INDEX {nome}")
+
+
+def downgrade():
+    for nome, tabela, _ in UNICOS:
+        op.execute(f"ALTER TABLE {tabela} DROP CONSTRAINT IF EXISTS {nome}")
+
+    with op.get_context().autocommit_block():
+        for nome, _, _ in INDICES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
@@ -0,0 +1,70 @@
+"""Unicidade de certificado por inscrição
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+A emissão em lote (INSERT ... SELECT ... ON CONFLICT (inscricao_id) DO
+NOTHING) e a emissão individual dependem de um certificado por inscrição
+garantido pelo banco: sem a restrição, duas emissões concorrentes passam
+pela verificação e gravam dois certificados.
+
+Como na 0001: se já existirem duplicados a migração é abortada listando
+exemplos; o índice único é criado com CONCURRENTLY e vira restrição com
+ADD CONSTRAINT ... USING INDEX. O índice simples ix_certificados_inscricao_id
+fica redundante e é removido.
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _verificar_duplicados():
+    """Aborta a migração se existirem inscrições com mais de um certificado."""
+    if op.get_context().as_sql:
+        return  # modo offline (--sql): não há conexão para consultar
+
+    conn = op.get_bind()
+    duplicados = conn.exec_driver_sql(
+        "SELECT inscricao_id, COUNT(*) FROM certificados "
+        "GROUP BY inscricao_id HAVING COUNT(*) > 1 LIMIT 5"
+    ).fetchall()
+
+    if duplicados:
+        exemplos = ", ".join(str(d[0]) for d in duplicados)
+        raise RuntimeError(
+            f"Existem certificados duplicados por inscrição ({exemplos}). "
+            f"Corrija os dados antes de aplicar a restrição de unicidade."
+        )
+
+
+def upgrade():
+    _verificar_duplicados()
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS uq_certificados_inscricao_id "
+            "ON certificados (inscricao_id)"
+        )
+
+    op.execute(
+        "ALTER TABLE certificados ADD CONSTRAINT uq_certificados_inscricao_id "
+        "UNIQUE USING INDEX uq_certificados_inscricao_id"
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_certificados_inscricao_id")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_certificados_inscricao_id "
+            "ON certificados (inscricao_id)"
+        )
+
+    op.execute("ALTER TABLE certificados DROP CONSTRAINT IF EXISTS uq_certificados_inscricao_id")
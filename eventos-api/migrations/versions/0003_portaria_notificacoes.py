@@ -0,0 +1,108 @@
+"""Modo portaria por evento e notificações de alteração de ingressos/check-ins
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+
+eventos.modo_portaria marca os eventos cujos ingressos ficam em um índice
+em memória no ingressos-service. Os triggers publicam no canal "portaria"
+(LISTEN/NOTIFY) as inscrições cujo ingresso ou check-in mudou, e os eventos
+que entraram/saíram do modo, para o índice se manter atualizado mesmo com
+alterações feitas por outros serviços.
+
+Payloads: "i:<inscricao_id>" ou "e:<evento_id>". A notificação só é enviada
+para eventos em modo portaria (exceto a do próprio evento).
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "eventos",
+        sa.Column("modo_portaria", sa.Boolean(), nullable=False, server_default=sa.false())
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_portaria_ingresso() RETURNS trigger AS $$
+        DECLARE
+            linha ingressos%ROWTYPE;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN linha := OLD; ELSE linha := NEW; END IF;
+            IF EXISTS (SELECT 1 FROM eventos WHERE id = linha.evento_id AND modo_portaria) THEN
+                PERFORM pg_notify('portaria', 'i:' || linha.inscricao_id);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_portaria_checkin() RETURNS trigger AS $$
+        DECLARE
+            inscricao uuid;
+        BEGIN
+            IF TG_OP = 'DELETE' THEN inscricao := OLD.inscricao_id; ELSE inscricao := NEW.inscricao_id; END IF;
+            IF EXISTS (
+                SELECT 1 FROM inscricoes i JOIN eventos e ON e.id = i.evento_id
+                WHERE i.id = inscricao AND e.modo_portaria
+            ) THEN
+                PERFORM pg_notify('portaria', 'i:' || inscricao);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_portaria_evento() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('portaria', 'e:' || NEW.id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+
+    op.execute(
+        """
+        CREATE TRIGGER trg_portaria_ingressos
+        AFTER INSERT OR UPDATE OR DELETE ON ingressos
+        FOR EACH ROW EXECUTE FUNCTION notificar_portaria_ingresso()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_portaria_checkins
+        AFTER INSERT OR DELETE ON checkins
+        FOR EACH ROW EXECUTE FUNCTION notificar_portaria_checkin()
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_portaria_eventos
+        AFTER UPDATE OF modo_portaria, fim_em ON eventos
+        FOR EACH ROW
+        WHEN (OLD.modo_portaria IS DISTINCT FROM NEW.modo_portaria OR OLD.fim_em IS DISTINCT FROM NEW.fim_em)
+        EXECUTE FUNCTION notificar_portaria_evento()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_portaria_eventos ON eventos")
+    op.execute("DROP TRIGGER IF EXISTS trg_portaria_checkins ON checkins")
+    op.execute("DROP TRIGGER IF EXISTS trg_portaria_ingressos ON ingressos")
+    op.execute("DROP FUNCTION IF EXISTS notificar_portaria_evento()")
+    op.execute("DROP FUNCTION IF EXISTS notificar_portaria_checkin()")
+    op.execute("DROP FUNCTION IF EXISTS notificar_portaria_ingresso()")
+    op.drop_column("eventos", "modo_portaria")
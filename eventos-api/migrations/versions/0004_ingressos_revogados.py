@@ -0,0 +1,38 @@
+"""Lista de revogação de ingressos (tokens assinados)
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+
+versao é a maior versão revogada do token do ingresso: a portaria recusa
+tokens com versão menor ou igual.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "ingressos_revogados",
+        sa.Column("ingresso_id", UUID(as_uuid=True), sa.ForeignKey("ingressos.id"), primary_key=True),
+        sa.Column("evento_id", UUID(as_uuid=True), sa.ForeignKey("eventos.id"), nullable=False),
+        sa.Column("versao", sa.Integer(), nullable=False),
+        sa.Column("revogado_em", sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        "ix_ingressos_revogados_evento_revogado_em",
+        "ingressos_revogados",
+        ["evento_id", "revogado_em"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_ingressos_revogados_evento_revogado_em", table_name="ingressos_revogados")
+    op.drop_table("ingressos_revogados")
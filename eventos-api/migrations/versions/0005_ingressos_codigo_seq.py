@@ -0,0 +1,26 @@
+"""Sequência dos códigos de ingresso (alocação em blocos)
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Cada nextval reserva um bloco de 1000 números (codigo_helper.TAMANHO_BLOCO).
+    # MAXVALUE: 2^40 - 1, o que cabe em 8 caracteres Base32.
+    op.execute(
+        "CREATE SEQUENCE ingressos_codigo_seq "
+        "INCREMENT BY 1000 MINVALUE 1 MAXVALUE 1099511627775 START WITH 1 NO CYCLE"
+    )
+
+
+def downgrade():
+    op.execute("DROP SEQUENCE ingressos_codigo_seq")
@@ -0,0 +1,25 @@
+"""Usuários rápidos sem senha (senha_hash opcional)
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.alter_column("usuarios", "senha_hash", existing_type=sa.String(255), nullable=True)
+    # Senhas temporárias de usuários rápidos nunca eram usadas (o login recusa o papel "rapido")
+    op.execute("UPDATE usuarios SET senha_hash = NULL WHERE papel = 'rapido'")
+
+
+def downgrade():
+    op.execute("UPDATE usuarios SET senha_hash = md5(random()::text || id::text) WHERE senha_hash IS NULL")
+    op.alter_column("usuarios", "senha_hash", existing_type=sa.String(255), nullable=False)
@@ -0,0 +1,75 @@
+"""Refresh tokens e revogação de tokens de acesso
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+
+tokens_revogados é pequena (só revogações ainda não expiradas importam) e
+fica em memória em todos os serviços; o trigger avisa no canal "revogacao"
+(LISTEN/NOTIFY) para a atualização incremental.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "refresh_tokens",
+        sa.Column("id", UUID(as_uuid=True), primary_key=True),
+        sa.Column("usuario_id", UUID(as_uuid=True), sa.ForeignKey("usuarios.id"), nullable=False),
+        sa.Column("familia", UUID(as_uuid=True), nullable=False),
+        sa.Column("criado_em", sa.DateTime(), nullable=False),
+        sa.Column("expira_em", sa.DateTime(), nullable=False),
+        sa.Column("usado_em", sa.DateTime(), nullable=True),
+        sa.Column("revogado_em", sa.DateTime(), nullable=True),
+    )
+    op.create_index("ix_refresh_tokens_usuario_id", "refresh_tokens", ["usuario_id"])
+    op.create_index("ix_refresh_tokens_familia", "refresh_tokens", ["familia"])
+
+    op.create_table(
+        "tokens_revogados",
+        sa.Column("id", sa.BigInteger(), primary_key=True, autoincrement=True),
+        sa.Column("jti", UUID(as_uuid=True), nullable=True),
+        sa.Column("usuario_id", UUID(as_uuid=True), nullable=True),
+        sa.Column(
+            "revogado_em", sa.DateTime(), nullable=False,
+            server_default=sa.text("timezone('utc', now())")
+        ),
+        sa.Column("expira_em", sa.DateTime(), nullable=False),
+    )
+    op.create_index("ix_tokens_revogados_revogado_em", "tokens_revogados", ["revogado_em"])
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_revogacao() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('revogacao', NEW.id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_tokens_revogados
+        AFTER INSERT ON tokens_revogados
+        FOR EACH ROW EXECUTE FUNCTION notificar_revogacao()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_tokens_revogados ON tokens_revogados")
+    op.execute("DROP FUNCTION IF EXISTS notificar_revogacao()")
+    op.drop_index("ix_tokens_revogados_revogado_em", table_name="tokens_revogados")
+    op.drop_table("tokens_revogados")
+    op.drop_index("ix_refresh_tokens_familia", table_name="refresh_tokens")
+    op.drop_index("ix_refresh_tokens_usuario_id", table_name="refresh_tokens")
+    op.drop_table("refresh_tokens")
@@ -0,0 +1,47 @@
+"""Notificação de alterações de perfil de usuário
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+
+Publica no canal "perfil" o id dos usuários cujo nome, email, CPF ou papel
+mudou, para o auth-service saber se os claims de perfil de um token ainda
+são os atuais (ver perfil_helper).
+"""
+from alembic import op
+
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_perfil() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('perfil', NEW.id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_perfil_usuarios
+        AFTER UPDATE OF nome, email, cpf, papel ON usuarios
+        FOR EACH ROW
+        WHEN (
+            OLD.nome IS DISTINCT FROM NEW.nome OR OLD.email IS DISTINCT FROM NEW.email
+            OR OLD.cpf IS DISTINCT FROM NEW.cpf OR OLD.papel IS DISTINCT FROM NEW.papel
+        )
+        EXECUTE FUNCTION notificar_perfil()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_perfil_usuarios ON usuarios")
+    op.execute("DROP FUNCTION IF EXISTS notificar_perfil()")
@@ -0,0 +1,225 @@
+"""Versões por evento para GET condicional (ETag / Last-Modified)
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+
+Os triggers mantêm duas formas de versão, que só crescem (ver versao_helper):
+- eventos.atualizado_em: os dados do próprio evento (titulo, descricao,
+  datas). O trigger é BEFORE UPDATE na linha que já está sendo alterada e
+  avança pelo menos 1 microssegundo por alteração;
+- versoes_eventos: contadores das inscrições do evento (e de nome/email/CPF
+  dos usuários inscritos, que aparecem na lista de inscritos) e dos
+  ingressos do evento.
+
+Por (evento, recurso) há até FATIAS linhas de contador, e cada transação
+incrementa a fatia da sua conexão (pg_backend_pid() % FATIAS). Transações
+concorrentes caem, em geral, em fatias diferentes e não esperam umas pelas
+outras, e a linha do evento não é travada: scans da portaria, check-ins em
+lote e importações do mesmo evento não ficam em fila entre si nem com as
+edições do evento. A versão é a soma dos contadores: muda a cada commit que
+alterou o recurso, qualquer que seja a ordem dos commits (um instante de
+alteração não serve: uma transação que começou antes e terminou depois não
+mudaria o máximo). Pelo mesmo motivo essas listas têm só ETag, sem
+Last-Modified.
+
+Nas tabelas filhas os triggers são por instrução, com tabelas de transição:
+uma importação em lote incrementa cada evento uma vez.
+
+Também cria ix_inscricoes_usuario_id (concorrente), usado pelo trigger de
+usuarios para achar os eventos do usuário.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+FATIAS = 16
+
+# (tabela, recurso em versoes_eventos)
+TABELAS_FILHAS = [
+    ("inscricoes", "inscricoes"),
+    ("ingressos", "ingressos"),
+]
+
+
+def upgrade():
+    op.add_column(
+        "eventos",
+        sa.Column(
+            "atualizado_em",
+            sa.DateTime(),
+            nullable=False,
+            server_default=sa.text("timezone('utc', now())")
+        )
+    )
+
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION proxima_versao(atual timestamp) RETURNS timestamp AS $$
+            SELECT GREATEST(timezone('utc', clock_timestamp()), atual + interval '1 microsecond')
+        $$ LANGUAGE sql VOLATILE
+        """
+    )
+
+    # Evento: BEFORE UPDATE, a própria linha recebe a nova versão
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION versionar_evento() RETURNS trigger AS $$
+        BEGIN
+            NEW.atualizado_em := proxima_versao(OLD.atualizado_em);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_versao_eventos
+        BEFORE UPDATE OF titulo, descricao, inicio_em, fim_em ON eventos
+        FOR EACH ROW
+        WHEN (
+            OLD.titulo IS DISTINCT FROM NEW.titulo OR OLD.descricao IS DISTINCT FROM NEW.descricao
+            OR OLD.inicio_em IS DISTINCT FROM NEW.inicio_em OR OLD.fim_em IS DISTINCT FROM NEW.fim_em
+        )
+        EXECUTE FUNCTION versionar_evento()
+        """
+    )
+
+    op.create_table(
+        "versoes_eventos",
+        sa.Column(
+            "evento_id",
+            postgresql.UUID(as_uuid=True),
+            sa.ForeignKey("eventos.id", ondelete="CASCADE"),
+            primary_key=True
+        ),
+        sa.Column("recurso", sa.String(), primary_key=True),
+        sa.Column("fatia", sa.SmallInteger(), primary_key=True),
+        sa.Column("contador", sa.BigInteger(), nullable=False),
+    )
+
+    # Um incremento por evento afetado na instrução, na fatia da conexão.
+    # As fatias são travadas em ordem de evento para instruções concorrentes
+    # com vários eventos não se travarem. Eventos removidos na mesma
+    # instrução (cascata) não entram.
+    op.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION incrementar_versoes_eventos(alterado text, ids uuid[])
+        RETURNS void AS $$
+            INSERT INTO versoes_eventos AS v (evento_id, recurso, fatia, contador)
+            SELECT e.id, alterado, pg_backend_pid() % {FATIAS}, 1
+            FROM eventos e WHERE e.id = ANY(ids)
+            ORDER BY e.id
+            ON CONFLICT (evento_id, recurso, fatia) DO UPDATE SET contador = v.contador + 1
+        $$ LANGUAGE sql VOLATILE
+        """
+    )
+
+    # Inscrições/ingressos: TG_ARGV[0] é o recurso
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION versionar_eventos_das_linhas() RETURNS trigger AS $$
+        DECLARE
+            origem text;
+            ids uuid[];
+        BEGIN
+            IF TG_OP = 'INSERT' THEN
+                origem := 'SELECT evento_id FROM novas';
+            ELSIF TG_OP = 'DELETE' THEN
+                origem := 'SELECT evento_id FROM antigas';
+            ELSE
+                origem := 'SELECT evento_id FROM novas UNION SELECT evento_id FROM antigas';
+            END IF;
+            EXECUTE format('SELECT array_agg(DISTINCT evento_id) FROM (%s) o', origem) INTO ids;
+            IF ids IS NOT NULL THEN
+                PERFORM incrementar_versoes_eventos(TG_ARGV[0], ids);
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    for tabela, recurso in TABELAS_FILHAS:
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_versao_{tabela}_insert
+            AFTER INSERT ON {tabela}
+            REFERENCING NEW TABLE AS novas
+            FOR EACH STATEMENT EXECUTE FUNCTION versionar_eventos_das_linhas('{recurso}')
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_versao_{tabela}_update
+            AFTER UPDATE ON {tabela}
+            REFERENCING OLD TABLE AS antigas NEW TABLE AS novas
+            FOR EACH STATEMENT EXECUTE FUNCTION versionar_eventos_das_linhas('{recurso}')
+            """
+        )
+        op.execute(
+            f"""
+            CREATE TRIGGER trg_versao_{tabela}_delete
+            AFTER DELETE ON {tabela}
+            REFERENCING OLD TABLE AS antigas
+            FOR EACH STATEMENT EXECUTE FUNCTION versionar_eventos_das_linhas('{recurso}')
+            """
+        )
+
+    # Usuários: nome/email/CPF aparecem na lista de inscritos dos seus eventos
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION versionar_eventos_do_usuario() RETURNS trigger AS $$
+        BEGIN
+            PERFORM incrementar_versoes_eventos(
+                'inscricoes',
+                ARRAY(SELECT DISTINCT evento_id FROM inscricoes WHERE usuario_id = NEW.id)
+            );
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_versao_usuarios
+        AFTER UPDATE OF nome, email, cpf ON usuarios
+        FOR EACH ROW
+        WHEN (
+            OLD.nome IS DISTINCT FROM NEW.nome OR OLD.email IS DISTINCT FROM NEW.email
+            OR OLD.cpf IS DISTINCT FROM NEW.cpf
+        )
+        EXECUTE FUNCTION versionar_eventos_do_usuario()
+        """
+    )
+
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_inscricoes_usuario_id "
+            "ON inscricoes (usuario_id)"
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_inscricoes_usuario_id")
+
+    op.execute("DROP TRIGGER IF EXISTS trg_versao_usuarios ON usuarios")
+    for tabela, _ in TABELAS_FILHAS:
+        for operacao in ("insert", "update", "delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS trg_versao_{tabela}_{operacao} ON {tabela}")
+    op.execute("DROP TRIGGER IF EXISTS trg_versao_eventos ON eventos")
+    op.execute("DROP FUNCTION IF EXISTS versionar_eventos_do_usuario()")
+    op.execute("DROP FUNCTION IF EXISTS versionar_eventos_das_linhas()")
+    op.execute("DROP FUNCTION IF EXISTS incrementar_versoes_eventos(text, uuid[])")
+    op.execute("DROP FUNCTION IF EXISTS versionar_evento()")
+    op.execute("DROP FUNCTION IF EXISTS proxima_versao(timestamp)")
+
+    op.drop_table("versoes_eventos")
+    op.drop_column("eventos", "atualizado_em")
@@ -0,0 +1,43 @@
+"""Notificação de alterações do catálogo público de eventos
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+
+Publica no canal "catalogo" quando eventos são inseridos, removidos ou têm
+titulo, descricao ou datas alterados, para o eventos-service gerar de novo
+o catálogo público em memória (ver catalogo_helper). O trigger é por
+instrução e o payload é vazio: o catálogo é sempre gerado por inteiro.
+"""
+from alembic import op
+
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute(
+        """
+        CREATE OR REPLACE FUNCTION notificar_catalogo() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('catalogo', '');
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql
+        """
+    )
+    op.execute(
+        """
+        CREATE TRIGGER trg_catalogo_eventos
+        AFTER INSERT OR DELETE OR UPDATE OF titulo, descricao, inicio_em, fim_em ON eventos
+        FOR EACH STATEMENT EXECUTE FUNCTION notificar_catalogo()
+        """
+    )
+
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS trg_catalogo_eventos ON eventos")
+    op.execute("DROP FUNCTION IF EXISTS notificar_catalogo()")
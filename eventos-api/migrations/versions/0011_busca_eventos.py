@@ -0,0 +1,57 @@
+"""Busca textual e aproximada de eventos
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+
+eventos.busca é uma coluna gerada (tsvector, configuração portuguese) com
+o título (peso A) e a descrição (peso B), mantida pelo próprio banco. O
+índice GIN atende websearch_to_tsquery; os índices de trigramas (pg_trgm)
+em titulo e descricao atendem a busca aproximada (erros de digitação,
+palavras parciais) com o operador <%. Não há normalização de acentos
+(unaccent).
+
+Adicionar a coluna gerada reescreve a tabela eventos (pequena). Os índices
+são criados com CONCURRENTLY, cada um em um autocommit_block.
+"""
+from alembic import op
+
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+DOCUMENTO_BUSCA = (
+    "setweight(to_tsvector('portuguese', coalesce(titulo, '')), 'A') || "
+    "setweight(to_tsvector('portuguese', coalesce(descricao, '')), 'B')"
+)
+
+# (nome, definição)
+INDICES = [
+    ("ix_eventos_busca", "eventos USING gin (busca)"),
+    ("ix_eventos_titulo_trgm", "eventos USING gin (titulo gin_trgm_ops)"),
+    ("ix_eventos_descricao_trgm", "eventos USING gin (descricao gin_trgm_ops)"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.execute(
+        f"ALTER TABLE eventos ADD COLUMN busca tsvector "
+        f"GENERATED ALWAYS AS ({DOCUMENTO_BUSCA}) STORED"
+    )
+
+    for nome, definicao in INDICES:
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nome} ON {definicao}")
+
+
+def downgrade():
+    for nome, _ in reversed(INDICES):
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+
+    op.execute("ALTER TABLE eventos DROP COLUMN IF EXISTS busca")
+    # A extensão pg_trgm fica: outros índices podem depender dela
@@ -0,0 +1,66 @@
+"""Índices da busca de participantes (CPF normalizado, nome, email)
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19
+
+CPFs são gravados como digitados (com ou sem pontuação). cpf_normalizado()
+deixa só os dígitos e é IMMUTABLE, então pode ser indexada: a busca compara
+cpf_normalizado(coluna) com o CPF informado já normalizado.
+
+- CPF: índices de expressão cpf_normalizado() em usuarios.cpf e
+  inscricoes.cpf_rapido;
+- email: índices em lower() de usuarios.email e inscricoes.email_rapido;
+- nome: índices de trigramas (pg_trgm, habilitado na 0011) em
+  usuarios.nome e inscricoes.nome_rapido, que atendem o ILIKE do
+  sobrenome (prefixo de outra palavra), e btree em lower(nome)
+  COLLATE "C". A busca ordena por lower(nome) e pagina por cursor: o
+  btree atende ao mesmo tempo o prefixo (LIKE 'ana%' vira um intervalo do
+  índice) e a ordenação, então cada página lê só as linhas dela. A
+  collation "C" é a que permite o intervalo por LIKE com a classe de
+  operadores padrão.
+
+Os índices são criados com CONCURRENTLY, cada um em um autocommit_block.
+"""
+from alembic import op
+
+
+revision = "0012"
+down_revision = "0011"
+branch_labels = None
+depends_on = None
+
+
+# (nome, definição)
+INDICES = [
+    ("ix_usuarios_cpf_normalizado", "usuarios (cpf_normalizado(cpf))"),
+    ("ix_inscricoes_cpf_normalizado", "inscricoes (cpf_normalizado(cpf_rapido))"),
+    ("ix_usuarios_email_lower", "usuarios (lower(email))"),
+    ("ix_inscricoes_email_rapido_lower", "inscricoes (lower(email_rapido))"),
+    ("ix_usuarios_nome_trgm", "usuarios USING gin (nome gin_trgm_ops)"),
+    ("ix_inscricoes_nome_rapido_trgm", "inscricoes USING gin (nome_rapido gin_trgm_ops)"),
+    ("ix_usuarios_nome_lower", 'usuarios ((lower(nome) COLLATE "C"))'),
+    ("ix_inscricoes_nome_rapido_lower", 'inscricoes ((lower(nome_rapido) COLLATE "C"))'),
+]
+
+
+def upgrade():
+    op.execute(
+        r"""
+        CREATE OR REPLACE FUNCTION cpf_normalizado(cpf text) RETURNS text AS $$
+            SELECT nullif(regexp_replace(cpf, '\D', '', 'g'), '')
+        $$ LANGUAGE sql IMMUTABLE PARALLEL SAFE
+        """
+    )
+
+    for nome, definicao in INDICES:
+        with op.get_context().autocommit_block():
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {nome} ON {definicao}")
+
+
+def downgrade():
+    for nome, _ in reversed(INDICES):
+        with op.get_context().autocommit_block():
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {nome}")
+
+    op.execute("DROP FUNCTION IF EXISTS cpf_normalizado(text)")
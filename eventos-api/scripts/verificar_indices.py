@@ -0,0 +1,102 @@
+"""
+Verifica, via EXPLAIN, se as consultas dos caminhos críticos usam índice.
+
+Uso (a partir de eventos-api/, depois de `alembic upgrade head`):
+    python -m scripts.verificar_indices
+
+Em bancos pequenos o planejador prefere seq scan mesmo com índice disponível,
+então a sessão roda com enable_seqscan = off: o objetivo é confirmar que existe
+um índice utilizável para cada consulta, não medir o plano de produção.
+
+Cada consulta lista os índices aceitos (o primeiro é o esperado; os demais,
+equivalentes que o planejador pode preferir). Sai com código 1 se alguma
+consulta não usar nenhum deles.
+"""
+import json
+import sys
+import uuid
+
+from sqlalchemy import text
+
+from app.shared.core.database import engine
+
+
+# (descrição, SQL, índices aceitos)
+CONSULTAS = [
+    (
+        "inscrições ativas do evento",
+        "SELECT * FROM inscricoes WHERE evento_id = :id AND status = 'ativa'",
+        ("ix_inscricoes_evento_status",),
+    ),
+    (
+        "inscrição do usuário no evento",
+        "SELECT * FROM inscricoes WHERE evento_id = :id AND usuario_id = :id",
+        # ix_inscricoes_usuario_id (0009) é igualmente seletivo
+        ("ix_inscricoes_evento_usuario", "ix_inscricoes_usuario_id"),
+    ),
+    (
+        "check-in da inscrição",
+        "SELECT * FROM checkins WHERE inscricao_id = :id",
+        ("uq_checkins_inscricao_id",),
+    ),
+    (
+        "ingresso da inscrição",
+        "SELECT * FROM ingressos WHERE inscricao_id = :id",
+        ("uq_ingressos_inscricao_id",),
+    ),
+    (
+        "ingressos do evento por status",
+        "SELECT COUNT(*) FROM ingressos WHERE evento_id = :id AND status = 'usado'",
+        ("ix_ingressos_evento_status",),
+    ),
+    (
+        "certificado da inscrição",
+        "SELECT * FROM certificados WHERE inscricao_id = :id",
+        ("uq_certificados_inscricao_id",),
+    ),
+    (
+        "certificados do evento",
+        "SELECT * FROM certificados WHERE evento_id = :id",
+        ("ix_certificados_evento_id",),
+    ),
+]
+
+TIPOS_INDEX_SCAN = {"Index Scan", "Index Only Scan", "Bitmap Index Scan"}
+
+
+def _indices_usados(plano: dict) -> set:
+    """Percorre a árvore do plano e retorna os índices usados em index scans."""
+    usados = set()
+    if plano.get("Node Type") in TIPOS_INDEX_SCAN and plano.get("Index Name"):
+        usados.add(plano["Index Name"])
+    for filho in plano.get("Plans", []):
+        usados |= _indices_usados(filho)
+    return usados
+
+
+def verificar() -> bool:
+    ok = True
+    parametro = {"id": str(uuid.uuid4())}
+
+    with engine.connect() as conn:
+        conn.execute(text("SET enable_seqscan = off"))
+
+        for descricao, sql, aceitos in CONSULTAS:
+            resultado = conn.execute(text(f"EXPLAIN (FORMAT JSON) {sql}"), parametro).scalar()
+            if isinstance(resultado, str):
+                resultado = json.loads(resultado)
+
+            usados = _indices_usados(resultado[0]["Plan"])
+
+            encontrados = usados.intersection(aceitos)
+            if encontrados:
+                print(f"✅ {descricao}: {', '.join(sorted(encontrados))}")
+            else:
+                ok = False
+                print(f"❌ {descricao}: esperado {' ou '.join(aceitos)}, usados {sorted(usados) or 'nenhum'}")
+
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if verificar() else 1)
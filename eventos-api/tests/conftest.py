@@ -0,0 +1,5 @@
+import os
+
+# Os helpers importam app.shared.core.database, que cria o engine no import
+# (sem conectar). Os testes daqui não acessam o banco.
+os.environ.setdefault("DATABASE_URL", "postgresql://testes@localhost/testes")
@@ -0,0 +1,28 @@
+import pytest
+
+from app.shared.helpers.catalogo_helper import escolher_codificacao
+
+TODAS = {"identity", "gzip", "br"}
+
+
+@pytest.mark.parametrize("accept_encoding, esperado", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("", "identity"),
+    ("identity", "identity"),
+    ("br;q=0, gzip", "gzip"),
+    ("br;q=0, gzip;q=0", "identity"),
+    ("*", "br"),
+    ("*;q=0, gzip", "gzip"),
+    ("BR", "br"),
+    ("gzip;q=abc, br;q=0.5", "br"),
+    ("gzip;q=abc", "identity"),
+])
+def test_escolher_codificacao(accept_encoding, esperado):
+    assert escolher_codificacao(accept_encoding, TODAS) == esperado
+
+
+def test_escolher_codificacao_so_disponiveis():
+    # Sem a escuta ativa o catálogo não é comprimido
+    assert escolher_codificacao("gzip, br", {"identity"}) == "identity"
+    assert escolher_codificacao("br, gzip", {"identity", "gzip"}) == "gzip"
@@ -0,0 +1,52 @@
+import pytest
+
+from app.shared.helpers.codigo_helper import ALFABETO, _luhn32, codificar, codigo_valido, normalizar
+
+
+def test_luhn32_detecta_qualquer_caractere_trocado():
+    codigo = codificar(123456789, 8)
+    for posicao in range(len(codigo)):
+        for c in ALFABETO:
+            if c != codigo[posicao]:
+                assert not codigo_valido(codigo[:posicao] + c + codigo[posicao + 1:])
+
+
+def test_luhn32_detecta_transposicao_de_vizinhos():
+    codigo = codificar(0x5A5A5A5A5A, 8)
+    for posicao in range(len(codigo) - 1):
+        a, b = codigo[posicao], codigo[posicao + 1]
+        if a != b:
+            trocado = codigo[:posicao] + b + a + codigo[posicao + 2:]
+            # A única troca de vizinhos que o Luhn mod 32 não detecta: 0 <-> Z (valores 0 e 31)
+            if {ALFABETO.index(a), ALFABETO.index(b)} != {0, 31}:
+                assert not codigo_valido(trocado)
+
+
+def test_luhn32_valor_conhecido():
+    assert _luhn32("0") == "0"
+    assert codificar(0, 4) == "00000"
+    assert codificar(1, 2) == "01" + _luhn32("01")
+
+
+def test_codificar_tamanho_e_intervalo():
+    assert len(codificar(32 ** 8 - 1, 8)) == 9
+    with pytest.raises(ValueError):
+        codificar(32 ** 8, 8)
+    with pytest.raises(ValueError):
+        codificar(-1, 8)
+
+
+def test_normalizar_crockford():
+    assert normalizar("abc-def") == "ABCDEF"
+    assert normalizar("iLo") == "110"
+    assert normalizar("U") is None
+    assert normalizar("A*B") is None
+
+
+def test_codigo_valido_tolera_digitacao():
+    codigo = codificar(987654321, 8)
+    digitado = codigo.lower().replace("1", "l").replace("0", "o")
+    assert codigo_valido(digitado)
+    assert codigo_valido(codigo[:4] + "-" + codigo[4:])
+    assert not codigo_valido("")
+    assert not codigo_valido("U" + codigo)
@@ -0,0 +1,96 @@
+import base64
+import datetime
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.shared.helpers.ingresso_helper import (
+    PREFIXO_TOKEN_ASSINADO,
+    TokenIngressoExpirado,
+    TokenIngressoInvalido,
+    _MASCARA_CODIGO,
+    _embaralhar,
+    chave_evento,
+    gerar_token_assinado,
+    ler_token_assinado,
+    token_assinado,
+    verificar_token_assinado,
+)
+
+MODULO = _MASCARA_CODIGO + 1  # 2^40
+
+
+def _desembaralhar(x: int) -> int:
+    """Inversa de _embaralhar: cada passo (multiplicação ímpar, xorshift) é invertível"""
+    x = (x * pow(0xC2B2AE3D27, -1, MODULO)) & _MASCARA_CODIGO
+    x ^= x >> 20  # com 40 bits, aplicar o xorshift de 20 duas vezes volta ao original
+    return (x * pow(0x9E3779B97F, -1, MODULO)) & _MASCARA_CODIGO
+
+
+def test_embaralhar_e_bijecao_em_40_bits():
+    amostra = [0, 1, 2, _MASCARA_CODIGO] + random.Random(41).sample(range(MODULO), 1000)
+    for numero in amostra:
+        codigo = _embaralhar(numero)
+        assert 0 <= codigo <= _MASCARA_CODIGO
+        assert _desembaralhar(codigo) == numero
+
+
+def test_embaralhar_sem_colisao_em_bloco_consecutivo():
+    assert len({_embaralhar(n) for n in range(100_000)}) == 100_000
+
+
+def _token(expira_em=None, evento_id=None, versao=1):
+    ingresso_id, evento_id = uuid4(), evento_id or uuid4()
+    expira_em = expira_em or datetime.datetime.utcnow() + datetime.timedelta(days=1)
+    return ingresso_id, evento_id, gerar_token_assinado(ingresso_id, evento_id, expira_em, versao)
+
+
+def test_token_assinado_verifica():
+    ingresso_id, evento_id, token = _token()
+    assert token_assinado(token)
+    verificado = verificar_token_assinado(token)
+    assert (verificado.ingresso_id, verificado.evento_id, verificado.versao) == (ingresso_id, evento_id, 1)
+    # O dispositivo da portaria só tem a chave do evento
+    assert verificar_token_assinado(token, chave_evento(evento_id)).ingresso_id == ingresso_id
+
+
+def test_token_assinado_nova_versao_muda_o_token():
+    ingresso_id, evento_id = uuid4(), uuid4()
+    expira_em = datetime.datetime.utcnow() + datetime.timedelta(days=1)
+    v1 = gerar_token_assinado(ingresso_id, evento_id, expira_em)
+    v2 = gerar_token_assinado(ingresso_id, evento_id, expira_em, versao=2)
+    assert v1 != v2
+    assert verificar_token_assinado(v2).versao == 2
+
+
+def test_token_assinado_adulterado():
+    _, _, token = _token()
+    dados = bytearray(base64.urlsafe_b64decode(token[len(PREFIXO_TOKEN_ASSINADO):] + "=="))
+    dados[0] ^= 1  # outro ingresso_id com a mesma assinatura
+    adulterado = PREFIXO_TOKEN_ASSINADO + base64.urlsafe_b64encode(bytes(dados)).decode().rstrip("=")
+    with pytest.raises(TokenIngressoInvalido):
+        verificar_token_assinado(adulterado)
+
+
+def test_token_assinado_chave_de_outro_evento():
+    _, _, token = _token()
+    with pytest.raises(TokenIngressoInvalido):
+        verificar_token_assinado(token, chave_evento(uuid4()))
+
+
+def test_token_assinado_expirado():
+    _, _, token = _token(expira_em=datetime.datetime.utcnow() - datetime.timedelta(minutes=1))
+    with pytest.raises(TokenIngressoExpirado):
+        verificar_token_assinado(token)
+
+
+def test_ler_token_assinado_ignora_validade():
+    _, _, token = _token(expira_em=datetime.datetime.utcnow() - datetime.timedelta(minutes=1), versao=3)
+    assert ler_token_assinado(token).versao == 3
+
+
+@pytest.mark.parametrize("token", ["T1.", "T1.!!!", "T1.AAAA", "abc123", _token()[2][:-2]])
+def test_token_assinado_malformado(token):
+    with pytest.raises(TokenIngressoInvalido):
+        verificar_token_assinado(token)
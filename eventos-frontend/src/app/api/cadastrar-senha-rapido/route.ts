@@ -7,7 +7,7 @@ const AUTH_API_KEY = process.env.NEXT_PUBLIC_AUTH_API_KEY;
 export async function POST(req: NextRequest) {
   console.log("=== INICIO CADASTRAR SENHA RAPIDO ===");
 
-  const { email, nome, cpf, senha } = await req.json();
+  const { email, nome, cpf, senha, token } = await req.json();
 
   if (!email || !nome || !senha) {
     return NextResponse.json(
@@ -30,7 +30,8 @@ export async function POST(req: NextRequest) {
         email,
         nome, 
         cpf, 
-        senha
+        senha,
+        token
       },
       { 
         headers: { 
@@ -18,7 +18,7 @@ export async function GET(req: NextRequest) {
     }
 
     const response = await axios.get(
-      `${AUTH_URL}/me?token=${token}`,
+      `${AUTH_URL}/me?token=${token}&incluir_cpf=true`,
       {
         headers: { "x-api-key": AUTH_API_KEY },
         timeout: 10000
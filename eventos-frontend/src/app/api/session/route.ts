@@ -1,6 +1,6 @@
 import { NextRequest, NextResponse } from "next/server";
 import axios from "axios";
-import cookie from "cookie";
+import { cookiesSessao, cookiesSessaoEncerrada } from "@/lib/sessao";
 
 const AUTH_URL = process.env.NEXT_PUBLIC_AUTH_URL;
 const SERVICE_API_KEY = process.env.NEXT_PUBLIC_AUTH_API_KEY;
@@ -71,17 +71,9 @@ export async function POST(req: NextRequest) {
         user: userData
       });
 
-      res.headers.set(
-        "Set-Cookie",
-        cookie.serialize("access_token", token, {
-          httpOnly: true,
-          secure: false,
-          maxAge: 60 * 60 * 24 * 45,
-          sameSite: "lax",
-          path: "/",
-          domain: undefined,
-        })
-      );
+      for (const c of cookiesSessao(r.data)) {
+        res.headers.append("Set-Cookie", c);
+      }
 
       console.log("=== LOGIN COMPLETO ===");
       return res;
@@ -94,17 +86,9 @@ export async function POST(req: NextRequest) {
         requiresCompletion: false
       });
 
-      res.headers.set(
-        "Set-Cookie",
-        cookie.serialize("access_token", token, {
-          httpOnly: true,
-          secure: false,
-          maxAge: 60 * 60 * 24 * 45,
-          sameSite: "lax",
-          path: "/",
-          domain: undefined,
-        })
-      );
+      for (const c of cookiesSessao(r.data)) {
+        res.headers.append("Set-Cookie", c);
+      }
 
       return res;
     }
@@ -133,18 +117,32 @@ export async function POST(req: NextRequest) {
   }
 }
 
-export async function DELETE() {
+export async function DELETE(req: NextRequest) {
+  const token = req.cookies.get("access_token")?.value;
+  const refreshToken = req.cookies.get("refresh_token")?.value;
+
+  // Revoga no servidor o token de acesso e a família do refresh token
+  if (token) {
+    try {
+      await axios.post(
+        `${AUTH_URL}/logout`,
+        refreshToken ? { refresh_token: refreshToken } : undefined,
+        {
+          headers: {
+            Authorization: `Bearer ${token}`,
+            "x-api-key": SERVICE_API_KEY,
+          },
+          timeout: 10000,
+        }
+      );
+    } catch (err: any) {
+      console.error("Erro ao encerrar sessão:", err.response?.data || err.message);
+    }
+  }
+
   const res = NextResponse.json({ ok: true });
-  res.headers.set(
-    "Set-Cookie",
-    cookie.serialize("access_token", "", {
-      httpOnly: true,
-      secure: false,
-      maxAge: 60 * 60 * 24 * 45,
-      sameSite: "lax",
-      path: "/",
-      domain: undefined,
-    })
-  );
+  for (const c of cookiesSessaoEncerrada()) {
+    res.headers.append("Set-Cookie", c);
+  }
   return res;
 }
@@ -0,0 +1,41 @@
+import { NextRequest, NextResponse } from "next/server";
+import axios from "axios";
+
+const AUTH_URL = process.env.NEXT_PUBLIC_AUTH_URL;
+const AUTH_API_KEY = process.env.NEXT_PUBLIC_AUTH_API_KEY;
+
+export async function POST(req: NextRequest) {
+  const { email } = await req.json();
+
+  if (!email) {
+    return NextResponse.json(
+      { message: "Email é obrigatório" },
+      { status: 400 }
+    );
+  }
+
+  try {
+    // O auth responde igual exista ou não o usuário
+    const response = await axios.post(
+      `${AUTH_URL}/solicitar-cadastro-rapido?email=${encodeURIComponent(email)}`,
+      null,
+      {
+        headers: { "x-api-key": AUTH_API_KEY },
+        timeout: 10000
+      }
+    );
+
+    return NextResponse.json({ ok: true, message: response.data?.message });
+  } catch (err: any) {
+    console.error("Erro ao solicitar link de cadastro:", err.response?.data || err.message);
+
+    const errorMessage = err.response?.data?.detail ||
+                        err.response?.data?.message ||
+                        "Erro ao enviar o link de cadastro";
+
+    return NextResponse.json(
+      { message: errorMessage },
+      { status: err.response?.status || 500 }
+    );
+  }
+}
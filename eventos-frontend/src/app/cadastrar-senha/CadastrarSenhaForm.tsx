@@ -7,6 +7,8 @@ function FormContent() {
   const router = useRouter();
   const searchParams = useSearchParams();
   const emailParam = searchParams.get("email") || "";
+  // Token de cadastro: vem no link do email (check-in/inscrição rápida)
+  const token = searchParams.get("token") || "";
 
   const [email, setEmail] = useState(emailParam);
   const [nome, setNome] = useState("");
@@ -17,6 +19,7 @@ function FormContent() {
   const [loading, setLoading] = useState(false);
   const [verificandoEmail, setVerificandoEmail] = useState(false);
   const [usuarioRapido, setUsuarioRapido] = useState<any>(null);
+  const [linkEnviado, setLinkEnviado] = useState(false);
 
   useEffect(() => {
     if (emailParam) {
@@ -48,6 +51,33 @@ function FormContent() {
     }
   }
 
+  async function solicitarLink() {
+    setError("");
+    if (!email.includes("@")) {
+      setError("Email inválido");
+      return;
+    }
+
+    setLoading(true);
+    try {
+      const response = await fetch("/api/solicitar-cadastro-rapido", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ email }),
+      });
+
+      if (!response.ok) {
+        const data = await response.json();
+        throw new Error(data.message || "Erro ao enviar o link de cadastro");
+      }
+      setLinkEnviado(true);
+    } catch (err: any) {
+      setError(err.message || "Erro ao conectar com o servidor");
+    } finally {
+      setLoading(false);
+    }
+  }
+
   function formatarCPF(valor: string) {
     const numeros = valor.replace(/\D/g, "");
     if (numeros.length <= 11) {
@@ -99,7 +129,8 @@ function FormContent() {
           email,
           nome: nome.trim(),
           cpf: cpfLimpo || undefined,
-          senha 
+          senha,
+          token: token || undefined
         }),
       });
 
@@ -150,6 +181,32 @@ function FormContent() {
           </div>
         )}
 
+        {usuarioRapido && !token && (
+          <div className="p-4 bg-yellow-50 border border-yellow-200 rounded-md">
+            {linkEnviado ? (
+              <p className="text-sm text-yellow-800">
+                Enviamos um link de cadastro para <strong>{email}</strong>. 
+                Abra o link do email para cadastrar sua senha.
+              </p>
+            ) : (
+              <>
+                <p className="text-sm text-yellow-800">
+                  Para cadastrar a senha, use o link enviado ao seu email no check-in ou na inscrição.
+                  Não encontrou o email?
+                </p>
+                <button
+                  type="button"
+                  onClick={solicitarLink}
+                  disabled={loading}
+                  className="mt-2 text-sm font-medium text-indigo-600 hover:text-indigo-500 disabled:opacity-50"
+                >
+                  Enviar novo link de cadastro
+                </button>
+              </>
+            )}
+          </div>
+        )}
+
         <form className="mt-8 space-y-6" onSubmit={handleSubmit}>
           <div className="rounded-md shadow-sm space-y-4">
             <div>
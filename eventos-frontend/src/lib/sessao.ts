@@ -0,0 +1,82 @@
+import axios from "axios";
+import cookie from "cookie";
+
+const AUTH_URL = process.env.NEXT_PUBLIC_AUTH_URL || "http://localhost:8001";
+const AUTH_API_KEY = process.env.NEXT_PUBLIC_AUTH_API_KEY || "";
+
+// O cookie access_token expira junto com o token de acesso (poucos minutos);
+// o refresh_token dura REFRESH_TOKEN_EXPIRE_DAYS do auth-service (30 dias).
+const REFRESH_MAX_AGE = 60 * 60 * 24 * 30;
+
+export type TokensSessao = {
+  access_token: string;
+  refresh_token: string;
+  expires_in: number;
+};
+
+const OPCOES_COOKIE = {
+  httpOnly: true,
+  secure: false,
+  sameSite: "lax" as const,
+  path: "/",
+  domain: undefined,
+};
+
+export function cookiesSessao(tokens: TokensSessao): string[] {
+  return [
+    cookie.serialize("access_token", tokens.access_token, {
+      ...OPCOES_COOKIE,
+      maxAge: tokens.expires_in,
+    }),
+    cookie.serialize("refresh_token", tokens.refresh_token, {
+      ...OPCOES_COOKIE,
+      maxAge: REFRESH_MAX_AGE,
+    }),
+  ];
+}
+
+export function cookiesSessaoEncerrada(): string[] {
+  return ["access_token", "refresh_token"].map((nome) =>
+    cookie.serialize(nome, "", { ...OPCOES_COOKIE, maxAge: 0 })
+  );
+}
+
+// Requisições paralelas do mesmo navegador chegam com o mesmo refresh token;
+// trocá-lo duas vezes conta como reuso e revoga a sessão. A troca em
+// andamento (e o resultado, por alguns segundos) é compartilhada.
+const renovacoes = new Map<string, Promise<TokensSessao | null>>();
+const RENOVACAO_RETIDA_MS = 30 * 1000;
+
+async function trocarRefreshToken(refreshToken: string): Promise<TokensSessao | null> {
+  const r = await axios.post(
+    `${AUTH_URL}/refresh`,
+    { refresh_token: refreshToken },
+    {
+      headers: { "x-api-key": AUTH_API_KEY },
+      timeout: 10000,
+      validateStatus: () => true,
+    }
+  );
+
+  if (r.status === 200) {
+    return r.data;
+  }
+  if (r.status === 401) {
+    return null;
+  }
+  throw new Error(`Erro ao renovar sessão: ${r.status}`);
+}
+
+// null: refresh token recusado (sessão encerrada). Falhas de rede lançam erro.
+export function renovarSessao(refreshToken: string): Promise<TokensSessao | null> {
+  let renovacao = renovacoes.get(refreshToken);
+
+  if (!renovacao) {
+    renovacao = trocarRefreshToken(refreshToken);
+    renovacoes.set(refreshToken, renovacao);
+    renovacao.catch(() => renovacoes.delete(refreshToken));
+    setTimeout(() => renovacoes.delete(refreshToken), RENOVACAO_RETIDA_MS);
+  }
+
+  return renovacao;
+}
@@ -0,0 +1,43 @@
+import { NextRequest, NextResponse } from "next/server";
+import { cookiesSessao, cookiesSessaoEncerrada, renovarSessao } from "@/lib/sessao";
+
+// Renova a sessão antes de páginas e rotas /api: sem access_token (o cookie
+// expira junto com o token) e com refresh_token, troca-o em /refresh e já
+// repassa o token novo nesta requisição.
+export async function proxy(req: NextRequest) {
+  const refreshToken = req.cookies.get("refresh_token")?.value;
+
+  if (req.cookies.get("access_token")?.value || !refreshToken) {
+    return NextResponse.next();
+  }
+
+  let tokens;
+  try {
+    tokens = await renovarSessao(refreshToken);
+  } catch (err: any) {
+    console.error("Erro ao renovar sessão:", err.message);
+    return NextResponse.next();
+  }
+
+  if (!tokens) {
+    req.cookies.delete("refresh_token");
+    const res = NextResponse.next({ request: { headers: req.headers } });
+    for (const c of cookiesSessaoEncerrada()) {
+      res.headers.append("Set-Cookie", c);
+    }
+    return res;
+  }
+
+  req.cookies.set("access_token", tokens.access_token);
+  req.cookies.set("refresh_token", tokens.refresh_token);
+
+  const res = NextResponse.next({ request: { headers: req.headers } });
+  for (const c of cookiesSessao(tokens)) {
+    res.headers.append("Set-Cookie", c);
+  }
+  return res;
+}
+
+export const config = {
+  matcher: ["/((?!_next/static|_next/image|favicon.ico).*)"],
+};